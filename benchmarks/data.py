@@ -0,0 +1,250 @@
+# -*- coding: utf8 -*-
+
+u"""
+Rule sets and path corpora shared by the benchmarks.
+
+The rule sets are excerpts of widely used ignore files (GitHub's `gitignore` templates for Python
+and Node.js). The path corpus is generated deterministically to look like a mid-sized repository
+with vendored dependencies and build outputs.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+import random
+
+
+PYTHON_GITIGNORE = u"""
+# Byte-compiled / optimized / DLL files
+__pycache__/
+*.py[cod]
+*$py.class
+
+# C extensions
+*.so
+
+# Distribution / packaging
+.Python
+build/
+develop-eggs/
+dist/
+downloads/
+eggs/
+.eggs/
+lib/
+lib64/
+parts/
+sdist/
+var/
+wheels/
+share/python-wheels/
+*.egg-info/
+.installed.cfg
+*.egg
+MANIFEST
+
+# PyInstaller
+*.manifest
+*.spec
+
+# Installer logs
+pip-log.txt
+pip-delete-this-directory.txt
+
+# Unit test / coverage reports
+htmlcov/
+.tox/
+.nox/
+.coverage
+.coverage.*
+.cache
+nosetests.xml
+coverage.xml
+*.cover
+*.py,cover
+.hypothesis/
+.pytest_cache/
+cover/
+
+# Translations
+*.mo
+*.pot
+
+# Django stuff:
+*.log
+local_settings.py
+db.sqlite3
+db.sqlite3-journal
+
+# Sphinx documentation
+docs/_build/
+
+# Jupyter Notebook
+.ipynb_checkpoints
+
+# Environments
+.env
+.venv
+env/
+venv/
+ENV/
+env.bak/
+venv.bak/
+
+# mypy
+.mypy_cache/
+.dmypy.json
+dmypy.json
+"""
+
+NODE_GITIGNORE = u"""
+# Logs
+logs
+*.log
+npm-debug.log*
+yarn-debug.log*
+yarn-error.log*
+lerna-debug.log*
+
+# Diagnostic reports (https://nodejs.org/api/report.html)
+report.[0-9]*.[0-9]*.[0-9]*.[0-9]*.json
+
+# Runtime data
+pids
+*.pid
+*.seed
+*.pid.lock
+
+# Coverage directory used by tools like istanbul
+coverage
+*.lcov
+.nyc_output
+
+# Dependency directories
+node_modules/
+jspm_packages/
+bower_components
+
+# TypeScript cache
+*.tsbuildinfo
+
+# Optional caches
+.npm
+.eslintcache
+.stylelintcache
+
+# Output of 'npm pack'
+*.tgz
+
+# dotenv environment variable files
+.env
+.env.development.local
+.env.test.local
+.env.production.local
+.env.local
+
+# Build outputs
+.next
+out
+dist
+.nuxt
+.cache
+.parcel-cache
+.vuepress/dist
+.docusaurus
+.serverless/
+.fusebox/
+.dynamodb/
+.tern-port
+.vscode-test
+.yarn/cache
+.yarn/unplugged
+.yarn/build-state.yml
+.yarn/install-state.gz
+.pnp.*
+"""
+
+RULE_SETS = {
+    u'python': PYTHON_GITIGNORE,
+    u'node': NODE_GITIGNORE,
+}
+
+_DIRECTORIES = [
+    u'src', u'lib', u'tests', u'docs', u'build', u'dist', u'node_modules', u'packages',
+    u'app', u'components', u'utils', u'__pycache__', u'vendor', u'scripts', u'assets',
+]
+_NAMES = [
+    u'index', u'main', u'utils', u'config', u'setup', u'test_api', u'README', u'report',
+    u'module', u'helpers', u'server', u'client', u'model', u'view', u'cache',
+]
+_EXTENSIONS = [
+    u'.py', u'.pyc', u'.js', u'.ts', u'.json', u'.md', u'.txt', u'.log', u'.so', u'.css',
+    u'.html', u'.egg', u'.lock', u'.cfg', u'.tsbuildinfo',
+]
+
+
+def iter_rules(text):
+    u"""
+    Yields `(pattern, negated)` pairs for the rules of an ignore file (comments and blank lines
+    are skipped).
+
+    :type text: six.text_type
+    :rtype: typing.Iterator[typing.Tuple[six.text_type, bool]]
+    """
+    for line in text.splitlines():
+        line = line.strip()
+        if len(line) == 0 or line.startswith(u'#'):
+            continue
+        if line.startswith(u'!'):
+            yield line[1:], True
+        else:
+            yield line, False
+
+
+def generate_paths(count, seed=0, max_depth=8):
+    u"""
+    Returns a deterministic list of `count` relative POSIX paths.
+
+    :type count: int
+    :type seed: int
+    :type max_depth: int
+    :rtype: typing.List[six.text_type]
+    """
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        depth = rng.randint(0, max_depth)
+        parts = [rng.choice(_DIRECTORIES) for _ in range(depth)]
+        parts.append(rng.choice(_NAMES) + rng.choice(_EXTENSIONS))
+        paths.append(u'/'.join(parts))
+    return paths
+
+
+def generate_rules(count, seed=0):
+    u"""
+    Returns a deterministic list of `count` ignore-file rules, in the style of the large ignore
+    files of monorepos (per-project build outputs, generated files and exceptions).
+
+    :type count: int
+    :type seed: int
+    :rtype: typing.List[six.text_type]
+    """
+    rng = random.Random(seed)
+    rules = []
+    for index in range(count):
+        name = u'{}{}'.format(rng.choice(_NAMES), index)
+        shape = rng.randint(0, 4)
+        if shape == 0:
+            rules.append(u'{}/'.format(name))
+        elif shape == 1:
+            rules.append(u'*.{}'.format(name))
+        elif shape == 2:
+            rules.append(u'/{}/{}/*.log'.format(rng.choice(_DIRECTORIES), name))
+        elif shape == 3:
+            rules.append(u'{}/**/{}-*'.format(rng.choice(_DIRECTORIES), name))
+        else:
+            rules.append(u'!{}[0-9].txt'.format(name))
+    return rules
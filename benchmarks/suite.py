@@ -0,0 +1,705 @@
+# -*- coding: utf8 -*-
+
+u"""
+Micro-benchmark suite of the hot paths: parsing, compilation, matching, streams and walks.
+
+Each benchmark times a stage on deterministic inputs and reports the best time per operation
+(a parsed expression, a compiled pattern, a loaded rule, a matched path or a walked file). The
+results are saved as JSON and compared with a baseline recorded on the same machine: a benchmark
+slower than the baseline by more than its threshold is a regression, and the runner exits with
+the status 1.
+
+The speed of shared machines drifts between (and during) runs. A reference workload, using only
+the standard library, is timed along each benchmark: the comparison uses the times relative to
+the reference.
+
+Usage:
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json [--threshold 0.25]
+    python -m benchmarks.suite --quick -k PathspecList
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+import argparse
+import atexit
+import collections
+import gc
+import io
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import time
+# noinspection PyCompatibility
+import typing
+
+from six import text_type
+
+from pathmatch import batch
+from pathmatch import cli
+from pathmatch import gitmatch
+from pathmatch import ignorefile
+from pathmatch import parallel
+from pathmatch import stream
+from pathmatch import syntax
+from pathmatch import walker
+from pathmatch import wildmatch
+from pathmatch.diskcache import DiskCache
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.pathspec import Pathspec, PathspecList
+from pathmatch.patternset import WildmatchSet
+from pathmatch.wildmatch import WildmatchPattern
+
+from benchmarks import data
+
+# Version of the JSON results
+FORMAT_VERSION = 1
+
+# Default relative slowdown reported as a regression
+DEFAULT_THRESHOLD = 0.25
+
+_PATH_COUNT = 1000
+
+Benchmark = collections.namedtuple(u'Benchmark', [u'name', u'setup', u'threshold'])
+u"""
+A benchmark of the suite: `setup()` returns the timed function and the number of operations of
+each call. `threshold` overrides the default threshold of the runner, for noisy benchmarks.
+"""
+
+_benchmarks = []  # type: typing.List[Benchmark]
+
+
+def benchmark(name, threshold=None):
+    u"""
+    Decorator registering the setup function of a benchmark.
+
+    :type name: text_type
+    :type threshold: float | None
+    :rtype: typing.Callable
+    """
+    def register(setup):
+        _benchmarks.append(Benchmark(name, setup, threshold))
+        return setup
+    return register
+
+
+def _paths():
+    return data.generate_paths(_PATH_COUNT)
+
+
+def _match_all(match, paths):
+    u"""
+    Returns the timed function matching every path.
+    """
+    def run():
+        for path in paths:
+            match(path)
+    return run, len(paths)
+
+
+def _pathspecs(rules, prefilter=False, **kwargs):
+    u"""
+    Returns the path spec list of `(pattern, negated)` rules.
+    """
+    return PathspecList([Pathspec(GitmatchPattern(pattern, **kwargs), negated)
+                         for pattern, negated in rules], prefilter=prefilter)
+
+
+def _generated_rules(count):
+    return [(rule.lstrip(u'!'), rule.startswith(u'!')) for rule in data.generate_rules(count)]
+
+
+def _temporary_directory():
+    u"""
+    Returns a new temporary directory, removed when the interpreter exits.
+    """
+    directory = tempfile.mkdtemp(prefix=u'pathmatch-benchmark-')
+    atexit.register(shutil.rmtree, directory, True)
+    return directory
+
+
+####################################################################################################
+# Parsing                                                                                          #
+####################################################################################################
+
+_BRACKET_EXPRESSIONS = {
+    u'simple': u'[abc]',
+    u'ranges': u'[a-zA-Z0-9_-]',
+    u'negated': u'[!./]',
+    u'classes': u'[[:alpha:][:digit:]_]',
+    u'collating': u'[[.a.][=e=]x-z]',
+}
+
+
+def _bracket_expression_setup(expression):
+    def setup():
+        expressions = [u'prefix' + expression] * 100
+
+        def run():
+            for pattern in expressions:
+                syntax.parse_bracket_expression(pattern, 6)
+        return run, len(expressions)
+    return setup
+
+
+for _name, _expression in sorted(_BRACKET_EXPRESSIONS.items()):
+    benchmark(u'parse_bracket_expression/' + _name)(_bracket_expression_setup(_expression))
+
+
+@benchmark(u'syntax.parse/generated')
+def _parse_generated():
+    rules = [rule.lstrip(u'!') for rule in data.generate_rules(1000)]
+
+    def run():
+        for rule in rules:
+            syntax.parse(rule)
+    return run, len(rules)
+
+
+####################################################################################################
+# Translation                                                                                      #
+####################################################################################################
+
+def _translate_setup(rules):
+    def setup():
+        patterns = [rule for rule, _ in rules()]
+
+        def run():
+            re.purge()  # Measure the regex compilation, not the cache of the `re` module
+            for pattern in patterns:
+                wildmatch.translate(pattern)
+        return run, len(patterns)
+    return setup
+
+
+benchmark(u'translate/python_gitignore')(
+    _translate_setup(lambda: data.iter_rules(data.PYTHON_GITIGNORE)))
+benchmark(u'translate/generated')(
+    _translate_setup(lambda: ((rule.lstrip(u'!'), False) for rule in data.generate_rules(1000))))
+
+
+def _compile_setup(compile_pattern, patterns):
+    def setup():
+        rules = patterns()
+
+        def run():
+            re.purge()  # Measure the regex compilation, not the cache of the `re` module
+            for pattern in rules:
+                compile_pattern(pattern)
+        return run, len(rules)
+    return setup
+
+
+def _generated_patterns():
+    return [pattern for pattern, _ in _generated_rules(1000)]
+
+
+benchmark(u'WildmatchPattern/generated')(_compile_setup(WildmatchPattern, _generated_patterns))
+benchmark(u'GitmatchPattern/generated')(_compile_setup(GitmatchPattern, _generated_patterns))
+benchmark(u'GitmatchPattern/generated_lazy')(
+    _compile_setup(lambda pattern: GitmatchPattern(pattern, lazy=True), _generated_patterns))
+# The Unicode tables of the classes are built on first use, then shared
+benchmark(u'WildmatchPattern/character_classes')(
+    _compile_setup(WildmatchPattern, lambda: [u'**/[[:upper:]]*.md', u'**/*[![:alnum:]]',
+                                              u'**/v[[:digit:][:punct:]]*']))
+
+
+def _ignorefile_setup(rules):
+    def setup():
+        content = (u'\n'.join(rules()) + u'\n').encode(u'utf-8')
+        line_count = content.count(b'\n')
+
+        def run():
+            re.purge()
+            ignorefile.parse(content, prefilter=True)
+        return run, line_count
+    return setup
+
+
+benchmark(u'ignorefile.parse/generated')(_ignorefile_setup(lambda: data.generate_rules(2000)))
+# Generated ignore files often repeat the same rules (one section per project)
+benchmark(u'ignorefile.parse/repeated')(
+    _ignorefile_setup(lambda: data.generate_rules(200) * 10))
+
+
+@benchmark(u'DiskCache.get/generated')
+def _disk_cache_get():
+    rules = tuple(data.generate_rules(1000))
+    disk_cache = DiskCache(_temporary_directory())
+    key = (u'benchmark', rules)
+    disk_cache.get(key, lambda: _pathspecs(_generated_rules(1000)))  # Fill the cache
+
+    def run():
+        re.purge()
+        disk_cache.get(key, lambda: None)
+    return run, len(rules)
+
+
+####################################################################################################
+# Matching                                                                                         #
+####################################################################################################
+
+# Shapes of patterns: fast paths, regexes with wildcards and bracket expressions
+_PATTERNS = {
+    u'literal': u'build',
+    u'suffix': u'*.py',
+    u'tree': u'src/**',
+    u'deep': u'**/node_modules/**',
+    u'wildcards': u'src/*/test_*.py',
+    u'brackets': u'**/[a-m]*.py[cod]',
+}
+
+
+def _wildmatch_setup(pattern, **kwargs):
+    def setup():
+        return _match_all(WildmatchPattern(pattern, **kwargs).match, _paths())
+    return setup
+
+
+def _gitmatch_setup(pattern, **kwargs):
+    def setup():
+        return _match_all(GitmatchPattern(pattern, **kwargs).match, _paths())
+    return setup
+
+
+for _name, _pattern in sorted(_PATTERNS.items()):
+    benchmark(u'WildmatchPattern.match/' + _name)(_wildmatch_setup(_pattern))
+for _name, _pattern in sorted(_PATTERNS.items()):
+    benchmark(u'GitmatchPattern.match/' + _name)(_gitmatch_setup(_pattern))
+benchmark(u'GitmatchPattern.match/case_fold')(_gitmatch_setup(u'Build/', case_fold=True))
+# Slash-free pattern without fast path: matched component by component
+benchmark(u'GitmatchPattern.match/components')(_gitmatch_setup(u'*-[0-9]*.py[cod]'))
+benchmark(u'WildmatchPattern.match/segment')(
+    _wildmatch_setup(u'src/**/test_*.py', engine=wildmatch.ENGINE_SEGMENT))
+benchmark(u'WildmatchPattern.match/character_class')(
+    _wildmatch_setup(u'**/[[:upper:]]*.md'))
+benchmark(u'WildmatchPattern.match/character_class_native')(
+    _wildmatch_setup(u'**/[[:upper:]]*.md', engine=wildmatch.ENGINE_NATIVE))
+
+
+@benchmark(u'WildmatchPattern.match_segments/segment')
+def _match_segments():
+    pattern = WildmatchPattern(u'**/node_modules/*/lib/*.[ch]', engine=wildmatch.ENGINE_SEGMENT)
+    return _match_all(pattern.match_segments, [path.split(u'/') for path in _paths()])
+
+
+@benchmark(u'WildmatchSet.matches/rule_sets')
+def _pattern_set_matches():
+    rules = [pattern for text in data.RULE_SETS.values() for pattern, _ in data.iter_rules(text)]
+    return _match_all(WildmatchSet([GitmatchPattern(rule) for rule in rules]).matches, _paths())
+
+
+def _pathspec_list_setup(rule_count, prefilter, path_count=_PATH_COUNT):
+    def setup():
+        rules = data.generate_rules(rule_count)
+        pathspecs = PathspecList([Pathspec(GitmatchPattern(rule.lstrip(u'!')),
+                                           rule.startswith(u'!')) for rule in rules],
+                                 prefilter=prefilter)
+        return _match_all(pathspecs.match, data.generate_paths(path_count))
+    return setup
+
+
+benchmark(u'PathspecList.match/10')(_pathspec_list_setup(10, False))
+benchmark(u'PathspecList.match/1k')(_pathspec_list_setup(1000, False, 100))
+benchmark(u'PathspecList.match/1k_prefilter')(_pathspec_list_setup(1000, True))
+benchmark(u'PathspecList.match/100k_prefilter')(_pathspec_list_setup(100000, True))
+
+
+def _rule_set_setup(binary=False, case_fold=False):
+    def setup():
+        rules = list(data.iter_rules(data.PYTHON_GITIGNORE))
+        paths = _paths()
+        if binary:
+            rules = [(pattern.encode(u'utf-8'), negated) for pattern, negated in rules]
+            paths = [path.encode(u'utf-8') for path in paths]
+        if case_fold:  # Mixed-case paths, as found on case insensitive file systems
+            paths = [path.title() if index % 2 else path for index, path in enumerate(paths)]
+        return _match_all(_pathspecs(rules, case_fold=case_fold).match, paths)
+    return setup
+
+
+benchmark(u'PathspecList.match/python_gitignore')(_rule_set_setup())
+benchmark(u'PathspecList.match/python_gitignore_bytes')(_rule_set_setup(binary=True))
+benchmark(u'PathspecList.match/python_gitignore_case_fold')(_rule_set_setup(case_fold=True))
+
+if batch.numpy is not None:
+    @benchmark(u'PathspecList.match_many/rooted')
+    def _match_many():
+        # The fast paths of the rooted rules are vectorized
+        rules = [(u'/' + pattern.lstrip(u'/'), negated)
+                 for pattern, negated in data.iter_rules(data.PYTHON_GITIGNORE)]
+        match_many = _pathspecs(rules).match_many
+        paths = batch.numpy.array(data.generate_paths(10000))
+
+        def run():
+            match_many(paths)
+        return run, len(paths)
+
+
+def _parallel_filter_setup(executor):
+    def setup():
+        parallel_filter = _pathspecs(_generated_rules(1000), prefilter=True).parallel_filter
+        paths = data.generate_paths(20000)
+
+        def run():
+            for _ in parallel_filter(paths, executor=executor, workers=2):
+                pass
+        return run, len(paths)
+    return setup
+
+
+if parallel.futures is not None:
+    # The pools are created by each call: the measure includes their start
+    benchmark(u'PathspecList.parallel_filter/process', threshold=0.5)(
+        _parallel_filter_setup(parallel.EXECUTOR_PROCESS))
+    benchmark(u'PathspecList.parallel_filter/thread', threshold=0.5)(
+        _parallel_filter_setup(parallel.EXECUTOR_THREAD))
+
+
+####################################################################################################
+# Paths                                                                                            #
+####################################################################################################
+
+_BASE_PATH = u'/home/user/project'
+
+
+def _absolute_paths():
+    return [_BASE_PATH + u'/' + path for path in _paths()]
+
+
+@benchmark(u'normalize_path/absolute')
+def _normalize_path():
+    return _match_all(lambda path: gitmatch.normalize_path(path, _BASE_PATH), _absolute_paths())
+
+
+@benchmark(u'PathNormalizer.normalize/absolute')
+def _path_normalizer():
+    return _match_all(gitmatch.PathNormalizer(_BASE_PATH).normalize, _absolute_paths())
+
+
+@benchmark(u'PathNormalizer.normalize_many/absolute')
+def _path_normalizer_many():
+    normalize_many = gitmatch.PathNormalizer(_BASE_PATH).normalize_many
+    paths = _absolute_paths()
+
+    def run():
+        normalize_many(paths)
+    return run, len(paths)
+
+
+####################################################################################################
+# Streams and walks                                                                                #
+####################################################################################################
+
+def _path_stream(separator):
+    paths = data.generate_paths(20000)
+    return (separator.join(path.encode(u'utf-8') for path in paths) + separator), len(paths)
+
+
+@benchmark(u'stream.filter_stream/nul')
+def _filter_stream():
+    source, path_count = _path_stream(stream.NUL)
+    match = GitmatchPattern(b'*.py').match
+
+    def run():
+        stream.filter_stream(match, io.BytesIO(source), io.BytesIO(), stream.NUL)
+    return run, path_count
+
+
+@benchmark(u'cli.main/gitmatch')
+def _cli_main():
+    source, path_count = _path_stream(stream.NEWLINE)
+
+    def run():
+        cli.main([u'--gitmatch', u'*.py'], stdin=io.BytesIO(source), stdout=io.BytesIO())
+    return run, path_count
+
+
+_tree = []  # Root and file count of the walked tree, created on first use
+
+
+def _walked_tree():
+    u"""
+    Returns the root and the file count of a tree of sources and of an ignored `node_modules`
+    directory holding as many files.
+    """
+    if len(_tree) == 0:
+        sources = data.generate_paths(2000, max_depth=3)
+        dependencies = [u'node_modules/package{}/{}'.format(index % 50, path)
+                        for index, path in enumerate(data.generate_paths(2000, seed=1,
+                                                                         max_depth=2))]
+        root = _temporary_directory()
+        paths = set(sources + dependencies)
+        for path in paths:
+            full_path = os.path.join(root, *path.split(u'/'))
+            directory = os.path.dirname(full_path)
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            with open(full_path, u'w'):
+                pass
+        _tree.extend((root, len(paths)))
+    return _tree[0], _tree[1]
+
+
+def _walk_setup(walk, **kwargs):
+    def setup():
+        # The ignore rules select the files to skip: the walked files are the non-ignored ones
+        rules = [(u'*', False)] + [(pattern, not negated) for pattern, negated
+                                   in data.iter_rules(data.NODE_GITIGNORE)]
+        pathspecs = _pathspecs(rules)
+        root, file_count = _walked_tree()
+
+        def run():
+            for _ in walk(root, pathspecs, **kwargs):
+                pass
+        return run, file_count
+    return setup
+
+
+if walker.scandir is not None:
+    benchmark(u'walker.walk/node_gitignore', threshold=0.5)(_walk_setup(walker.walk))
+    benchmark(u'walker.parallel_walk/node_gitignore', threshold=0.5)(
+        _walk_setup(walker.parallel_walk, threads=4))
+
+
+####################################################################################################
+# Adversarial inputs                                                                               #
+####################################################################################################
+
+def _adversarial_setup(pattern, text, **kwargs):
+    def setup():
+        return _match_all(WildmatchPattern(pattern, **kwargs).match, [text])
+    return setup
+
+
+# Backtracking regexes: each asterisk retries every split of the text (polynomial time)
+benchmark(u'adversarial/asterisks_regex', threshold=0.5)(
+    _adversarial_setup(u'*a*a*a*a*b', u'a' * 40))
+benchmark(u'adversarial/asterisks_native', threshold=0.5)(
+    _adversarial_setup(u'*a*a*a*a*b', u'a' * 40, engine=wildmatch.ENGINE_NATIVE))
+benchmark(u'adversarial/wild_stars_regex', threshold=0.5)(
+    _adversarial_setup(u'**/a/**/a/**/a/**/b', u'/'.join([u'a'] * 30)))
+benchmark(u'adversarial/wild_stars_segment', threshold=0.5)(
+    _adversarial_setup(u'**/a/**/a/**/a/**/b', u'/'.join([u'a'] * 30),
+                       engine=wildmatch.ENGINE_SEGMENT))
+benchmark(u'adversarial/long_path', threshold=0.5)(
+    _adversarial_setup(u'**/*[0-9]?.txt', u'/'.join([u'directory'] * 1000) + u'/file.txt'))
+
+
+####################################################################################################
+# Runner                                                                                           #
+####################################################################################################
+
+def measure(bench, min_time=0.2, repeat=5):
+    u"""
+    Times a benchmark: the number of calls per measure is calibrated to last at least `min_time`
+    seconds, the garbage collector is disabled while timing.
+
+    :type bench: Benchmark
+    :type min_time: float
+    :type repeat: int
+    :rtype: typing.Dict[text_type, typing.Any]
+    :return: The best and median times per operation, in seconds
+    """
+    function, operations = bench.setup()
+    function()  # Warm up the caches
+
+    loops = 1
+    while True:
+        elapsed = _time(function, loops)
+        if elapsed >= min_time:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+    times = [elapsed]
+    reference_times = []
+    for _ in range(repeat - 1):
+        reference_times.append(_time(_reference, _REFERENCE_LOOPS))
+        times.append(_time(function, loops))
+    reference_times.append(_time(_reference, _REFERENCE_LOOPS))
+    times.sort()
+    unit = loops * operations
+    return {
+        u'best': times[0] / unit,
+        u'median': times[len(times) // 2] / unit,
+        u'reference': min(reference_times) / _REFERENCE_LOOPS,
+        u'operations': operations,
+        u'loops': loops,
+        u'repeat': repeat,
+    }
+
+
+_REFERENCE_PATHS = data.generate_paths(200, seed=1)
+_REFERENCE_REGEX = re.compile(u'^(?:.*/)?[^/]*\\.py$')
+_REFERENCE_LOOPS = 20
+
+
+def _reference():
+    u"""
+    The reference workload: string operations and regex matches of the standard library.
+    """
+    for path in _REFERENCE_PATHS:
+        path.endswith(u'.py')
+        path.split(u'/')
+        _REFERENCE_REGEX.match(path)
+
+
+def _time(function, loops):
+    u"""
+    :rtype: float
+    :return: The time spent by `loops` calls of `function`, in seconds
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.time()
+        for _ in range(loops):
+            function()
+        return time.time() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def environment():
+    u"""
+    Returns the description of the interpreter and the machine, stored with the results.
+
+    :rtype: typing.Dict[text_type, text_type]
+    """
+    return {
+        u'python': text_type(platform.python_version()),
+        u'implementation': text_type(platform.python_implementation()),
+        u'platform': text_type(platform.platform()),
+        u'machine': text_type(platform.machine()),
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    u"""
+    Compares the best times of the results with a baseline.
+
+    :type results: typing.Dict[text_type, typing.Dict[text_type, typing.Any]]
+    :type baseline: typing.Dict[text_type, typing.Dict[text_type, typing.Any]]
+    :type threshold: float
+    :param threshold: Relative slowdown reported as a regression, unless the benchmark has its own
+    :rtype: typing.List[typing.Tuple[text_type, float | None, text_type]]
+    :return: The name, relative time ratio (current / baseline) and status of each benchmark:
+             `regression`, `improvement`, `ok`, `new` or `missing`
+    """
+    thresholds = {bench.name: bench.threshold for bench in _benchmarks}
+    comparison = []
+    for name in sorted(set(results) | set(baseline)):
+        if name not in baseline:
+            comparison.append((name, None, u'new'))
+            continue
+        if name not in results:
+            comparison.append((name, None, u'missing'))
+            continue
+        bench_threshold = thresholds.get(name) or threshold
+        ratio = _relative_time(results[name]) / _relative_time(baseline[name])
+        if ratio > 1 + bench_threshold:
+            status = u'regression'
+        elif ratio < 1 / (1 + bench_threshold):
+            status = u'improvement'
+        else:
+            status = u'ok'
+        comparison.append((name, ratio, status))
+    return comparison
+
+
+def _relative_time(result):
+    u"""
+    Returns the best time of a result relative to its reference workload.
+
+    :type result: typing.Dict[text_type, typing.Any]
+    :rtype: float
+    """
+    return result[u'best'] / result[u'reference']
+
+
+def main(argv=None):
+    u"""
+    Runs the suite.
+
+    :type argv: typing.Sequence[text_type] | None
+    :rtype: int
+    :return: The exit status: 1 if a benchmark regressed
+    """
+    parser = argparse.ArgumentParser(prog=u'python -m benchmarks.suite',
+                                     description=u'Runs the micro-benchmark suite.')
+    parser.add_argument(u'-k', dest=u'keyword', metavar=u'SUBSTRING',
+                        help=u'Only run the benchmarks whose name contains SUBSTRING')
+    parser.add_argument(u'-o', u'--output', metavar=u'FILE', help=u'Save the results to FILE')
+    parser.add_argument(u'-b', u'--baseline', metavar=u'FILE',
+                        help=u'Compare the results with the baseline saved in FILE')
+    parser.add_argument(u'-t', u'--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=u'Relative slowdown reported as a regression (default: %(default)s)')
+    parser.add_argument(u'--quick', action=u'store_true',
+                        help=u'Shorter and noisier measures')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline is not None:
+        with io.open(args.baseline, u'r', encoding=u'utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get(u'environment') != environment():
+            print(u'Warning: the baseline was recorded in another environment: {}'.format(
+                baseline.get(u'environment')))
+
+    min_time, repeat = (0.05, 3) if args.quick else (0.2, 5)
+    results = collections.OrderedDict()
+    for bench in _benchmarks:
+        if args.keyword is not None and args.keyword not in bench.name:
+            continue
+        results[bench.name] = measure(bench, min_time, repeat)
+        print(u'{:45} {:>12}/op'.format(bench.name, _format_time(results[bench.name][u'best'])))
+        sys.stdout.flush()
+
+    if args.output is not None:
+        document = {u'version': FORMAT_VERSION, u'environment': environment(),
+                    u'results': results}
+        with io.open(args.output, u'w', encoding=u'utf-8') as output:
+            output.write(text_type(json.dumps(document, indent=2, sort_keys=True)) + u'\n')
+
+    if baseline is None:
+        return 0
+    if args.keyword is not None:
+        baseline_results = {name: result for name, result in baseline[u'results'].items()
+                            if args.keyword in name}
+    else:
+        baseline_results = baseline[u'results']
+    print(u'\nComparison with {}:'.format(args.baseline))
+    regressions = 0
+    for name, ratio, status in compare(results, baseline_results, args.threshold):
+        ratio_text = u'' if ratio is None else u'{:.2f}x'.format(ratio)
+        print(u'{:45} {:>8} {}'.format(name, ratio_text, status))
+        if status == u'regression':
+            regressions += 1
+    if regressions > 0:
+        print(u'{} regression(s)'.format(regressions))
+        return 1
+    return 0
+
+
+def _format_time(seconds):
+    u"""
+    :type seconds: float
+    :rtype: text_type
+    """
+    for unit, scale in ((u's', 1), (u'ms', 1e-3), (u'us', 1e-6)):
+        if seconds >= scale:
+            return u'{:.3f} {}'.format(seconds / scale, unit)
+    return u'{:.1f} ns'.format(seconds / 1e-9)
+
+
+if __name__ == u'__main__':
+    sys.exit(main())
@@ -0,0 +1,17 @@
+# -*- coding: utf8 -*-
+
+u"""
+Runs the `pathmatch` command: `python -m pathmatch`
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import sys
+
+from pathmatch.cli import main
+
+if __name__ == u'__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes asyncio-native filtering and walking, it requires Python 3.6+.
+
+Matching millions of paths in a coroutine blocks its event loop for seconds. `afilter` matches the
+paths in batches and yields control to the event loop once its time slice is elapsed: the other
+tasks are delayed by a few time slices (a timer wakes its task up after two iterations of the event
+loop, each one may run a time slice of matching). `awalk` lists the directories on a bounded pool of
+threads (see `walker.parallel_walk`), matching their entries outside of the event loop.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+import asyncio
+import concurrent.futures
+import itertools
+# noinspection PyCompatibility
+import typing
+
+from pathmatch import walker
+
+
+# Default maximal duration between two yields to the event loop, in seconds
+TIME_SLICE = 0.002
+
+# Number of paths matched between two clock reads
+_BATCH_SIZE = 64
+
+
+async def afilter(match, paths, time_slice=TIME_SLICE):
+    u"""
+    Returns an asynchronous generator yielding the elements of `paths` accepted by `match`.
+
+    :type match: typing.Callable[[str], bool]
+    :param match: The matcher of a single path, for example `PathspecList.match`
+    :type paths: typing.AsyncIterable[str] | typing.Iterable[str]
+    :param paths: The paths to filter, synchronous iterables are consumed by batches
+    :type time_slice: float
+    :param time_slice: Maximal duration between two yields to the event loop, in seconds. It
+                       includes the time spent by the consumer of the generator.
+    :rtype: typing.AsyncGenerator[str, None]
+    """
+    clock = _running_loop().time
+    deadline = clock() + time_slice
+    if hasattr(paths, u'__aiter__'):
+        count = 0
+        async for path in paths:
+            if match(path):
+                yield path
+            count += 1
+            if count == _BATCH_SIZE:
+                count = 0
+                if clock() >= deadline:
+                    await asyncio.sleep(0)
+                    deadline = clock() + time_slice
+    else:
+        iterator = iter(paths)
+        while True:
+            batch = list(itertools.islice(iterator, _BATCH_SIZE))
+            if len(batch) == 0:
+                break
+            for path in batch:
+                if match(path):
+                    yield path
+            if clock() >= deadline:
+                await asyncio.sleep(0)
+                deadline = clock() + time_slice
+
+
+async def awalk(root, pathspecs, concurrency=4, executor=None, rooted=True, follow_links=False,
+                onerror=None, time_slice=TIME_SLICE):
+    u"""
+    Returns an asynchronous generator yielding the paths of the files inside `root` matched by
+    `pathspecs` (see `walker.walk`). The paths of each directory are yielded as soon as it is
+    listed.
+
+    :type root: str | bytes
+    :param root: Path of the directory to walk, a bytes path yields bytes paths
+    :type pathspecs: pathmatch.pathspec.PathspecList
+    :param pathspecs: The path specs selecting the yielded files
+    :type concurrency: int
+    :param concurrency: Maximum number of directories listed at a time
+    :type executor: concurrent.futures.Executor | None
+    :param executor: The executor listing the directories, a pool of `concurrency` threads by
+                     default
+    :type rooted: bool
+    :param rooted: See `walker.walk`
+    :type follow_links: bool
+    :param follow_links: See `walker.walk`
+    :type onerror: typing.Callable[[OSError], None] | None
+    :param onerror: See `walker.walk`, it is called on the event loop
+    :type time_slice: float
+    :param time_slice: Maximal duration between two yields to the event loop while yielding the
+                       paths of a directory, in seconds
+    :rtype: typing.AsyncGenerator[str | bytes, None]
+    """
+    if concurrency < 1:
+        raise ValueError(u'`concurrency` must be positive: {}'.format(concurrency))
+    scanner = walker.Scanner(pathspecs, isinstance(root, bytes), rooted, follow_links)
+    loop = _running_loop()
+    clock = loop.time
+    owned_executor = None
+    if executor is None:
+        executor = owned_executor = concurrent.futures.ThreadPoolExecutor(concurrency)
+    pending = [scanner.root(root)]  # Directories to list
+    running = set()  # Listings in progress
+    try:
+        while len(pending) > 0 or len(running) > 0:
+            while len(pending) > 0 and len(running) < concurrency:
+                running.add(loop.run_in_executor(executor, scanner.scan, pending.pop()))
+            done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            deadline = clock() + time_slice
+            for future in done:
+                try:
+                    paths, subdirectories = future.result()
+                except OSError as error:
+                    if onerror is not None:
+                        onerror(error)
+                    continue
+                subdirectories.reverse()
+                pending.extend(subdirectories)
+                for index, path in enumerate(paths):
+                    yield path
+                    if index % _BATCH_SIZE == 0 and clock() >= deadline:
+                        await asyncio.sleep(0)
+                        deadline = clock() + time_slice
+    finally:
+        for future in running:
+            future.cancel()
+        if owned_executor is not None:
+            owned_executor.shutdown(wait=False)
+
+
+def _running_loop():
+    u"""
+    Returns the event loop running the current coroutine.
+
+    :rtype: asyncio.AbstractEventLoop
+    """
+    get_running_loop = getattr(asyncio, u'get_running_loop', None)
+    if get_running_loop is None:  # pragma: no cover
+        return asyncio.get_event_loop()  # Python 3.6
+    return get_running_loop()
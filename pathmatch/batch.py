@@ -0,0 +1,91 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes the batch matching of many paths against a pattern, see `Pattern.match_many`.
+
+The result is a boolean mask with one item per path. When NumPy is installed, the mask is a NumPy
+boolean array: it can directly index a column of paths. The fast path shapes (see `fastpath`) are
+then evaluated with vectorized string comparisons on NumPy string arrays. Without NumPy, the mask
+is a `bytearray` of zeros and ones.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+# noinspection PyCompatibility
+import typing
+
+from six import binary_type, text_type
+
+from pathmatch import fastpath
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+_SLASH = u'/'
+_BINARY_SLASH = b'/'
+
+# Kinds of the NumPy string arrays: unicode (text paths) and bytes (bytes paths)
+_STRING_KINDS = (u'U', u'S')
+
+
+def match_many(match, paths, fast_path=None):
+    u"""
+    Matches every path against a single matcher.
+
+    :type match: typing.Callable[[text_type], bool]
+    :param match: Matcher of a single path
+    :type paths: typing.Sequence[text_type]
+    :param paths: Paths to match, a NumPy string or bytes array enables the vectorized fast paths
+    :type fast_path: fastpath.FastPath | None
+    :param fast_path: Fast path equivalent to `match`, if any
+    :rtype: numpy.ndarray | bytearray
+    :return: A boolean mask, `True` for the matched paths
+    """
+    if numpy is None:
+        return bytearray(match(path) for path in paths)
+    if isinstance(paths, numpy.ndarray):
+        if fast_path is not None and paths.ndim == 1 and paths.dtype.kind in _STRING_KINDS:
+            mask = vectorized_match(fast_path, paths)
+            if mask is not None:
+                return mask
+        # Python strings are matched about twice as fast as NumPy string scalars
+        paths = paths.tolist()
+    return numpy.fromiter(map(match, paths), dtype=bool, count=len(paths))
+
+
+def vectorized_match(fast_path, paths):
+    u"""
+    Evaluates a fast path with vectorized string operations.
+
+    Only the comparisons of the whole path or of its ends are vectorized: NumPy substring searches
+    are slower than the `in` operator on Python strings, the other kinds fall back to the loop.
+
+    :type fast_path: fastpath.FastPath
+    :type paths: numpy.ndarray
+    :rtype: numpy.ndarray | None
+    :return: The boolean mask, or `None` if this fast path is not vectorized
+    """
+    kind, operand, path_name = fast_path
+    char = numpy.char
+    if isinstance(operand, binary_type) != (paths.dtype.kind == u'S'):
+        return None  # Let the matcher reject the mismatched types
+    slash = _BINARY_SLASH if isinstance(operand, binary_type) else _SLASH
+
+    if kind == fastpath.EQUALS:
+        return paths == operand
+    elif kind == fastpath.SUFFIX and not path_name:
+        return char.endswith(paths, operand)
+    elif kind == fastpath.PREFIX and not path_name:
+        return char.startswith(paths, operand)
+    elif kind == fastpath.DEEP_EQUALS:
+        return (paths == operand) | char.endswith(paths, slash + operand)
+    elif kind == fastpath.DIR_EQUALS:
+        return (paths == operand) | char.startswith(paths, operand + slash)
+    return None
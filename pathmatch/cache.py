@@ -0,0 +1,165 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes the shared cache of compiled patterns.
+
+The one-shot functions of the `wildmatch` and `gitmatch` modules (`match`, `filter` and
+`translate`) receive the pattern as text: without a cache they would parse and compile it on every
+call. They use a shared least-recently-used cache keyed on the pattern text and its flags instead.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+from collections import namedtuple, OrderedDict
+import threading
+# noinspection PyCompatibility
+import typing
+
+
+DEFAULT_MAX_SIZE = 512
+
+CacheInfo = namedtuple(u'CacheInfo', [u'hits', u'misses', u'evictions', u'size', u'max_size'])
+
+
+class PatternCache(object):
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        u"""
+        A thread-safe least-recently-used cache of compiled patterns.
+
+        :type max_size: int
+        :param max_size: Maximum number of compiled patterns retained by the cache, `0` disables
+                         the cache.
+        :rtype: None
+        """
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._max_size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self.max_size = max_size
+
+    @property
+    def max_size(self):
+        u"""
+        Maximum number of compiled patterns retained by the cache.
+
+        :rtype: int
+        """
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, max_size):
+        if max_size < 0:
+            raise ValueError(u'`max_size` must be a non-negative integer: {}'.format(max_size))
+        with self._lock:
+            self._max_size = max_size
+            self._trim()
+
+    def get(self, key, factory):
+        u"""
+        Returns the compiled pattern stored for `key`, calling `factory` to create (and store) it
+        if it is missing.
+
+        :type key: typing.Hashable
+        :param key: The cache key, it must identify the pattern text and all of its flags.
+        :type factory: typing.Callable[[], typing.Any]
+        :param factory: A function compiling the pattern, errors are propagated and not cached.
+        :return: The compiled pattern
+        """
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                self._entries[key] = value  # Move the entry to the most recent position
+                self._hits += 1
+                return value
+            self._misses += 1
+
+        # Compile outside of the lock: concurrent misses on the same key only cost a duplicated
+        # compilation.
+        value = factory()
+
+        with self._lock:
+            if self._max_size > 0:
+                self._entries.pop(key, None)
+                self._entries[key] = value
+                self._trim()
+        return value
+
+    def clear(self):
+        u"""
+        Removes all the compiled patterns and resets the statistics.
+
+        :rtype: None
+        """
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def info(self):
+        u"""
+        Returns the statistics of this cache.
+
+        :rtype: CacheInfo
+        """
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, len(self._entries),
+                             self._max_size)
+
+    def _trim(self):
+        # Must be called while holding the lock
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+
+_SHARED_CACHE = PatternCache()
+
+
+def get(key, factory):
+    u"""
+    Returns the compiled pattern stored for `key` in the shared cache, see `PatternCache.get`.
+
+    :type key: typing.Hashable
+    :param key: The cache key, it must identify the pattern text and all of its flags.
+    :type factory: typing.Callable[[], typing.Any]
+    :param factory: A function compiling the pattern.
+    :return: The compiled pattern
+    """
+    return _SHARED_CACHE.get(key, factory)
+
+
+def clear():
+    u"""
+    Removes all the compiled patterns from the shared cache and resets its statistics.
+
+    :rtype: None
+    """
+    _SHARED_CACHE.clear()
+
+
+def info():
+    u"""
+    Returns the hit, miss and eviction counts of the shared cache.
+
+    :rtype: CacheInfo
+    """
+    return _SHARED_CACHE.info()
+
+
+def set_max_size(max_size):
+    u"""
+    Changes the size of the shared cache, evicting the least recently used patterns if needed.
+
+    :type max_size: int
+    :param max_size: Maximum number of compiled patterns retained by the cache, `0` disables
+                     the cache.
+    :rtype: None
+    """
+    _SHARED_CACHE.max_size = max_size
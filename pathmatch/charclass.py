@@ -0,0 +1,171 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes the POSIX character classes (`[:alpha:]`, `[:digit:]`...) of bracket
+expressions as tables of code point ranges.
+
+Text patterns use Unicode semantics: the classes are defined from the general categories of the
+Unicode Character Database (see `unicodedata`). Scanning every code point is expensive, so the
+tables are built lazily, once per process, and shared by all the patterns. Bytes patterns use the
+ASCII definitions of POSIX.
+http://pubs.opengroup.org/onlinepubs/9699919799/functions/wctype.html
+http://pubs.opengroup.org/onlinepubs/009695399/basedefs/xbd_chap09.html#tag_09_03_05
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+import sys
+import unicodedata
+# noinspection PyCompatibility
+import typing
+
+from six import text_type, unichr
+
+
+# POSIX character classes for ASCII, as inclusive ranges of characters.
+_CHARACTER_CLASSES = {
+    u'alnum': ((u'0', u'9'), (u'A', u'Z'), (u'a', u'z')),
+    u'alpha': ((u'A', u'Z'), (u'a', u'z')),
+    u'blank': ((u'\t', u'\t'), (u' ', u' ')),
+    u'cntrl': ((u'\x00', u'\x1f'), (u'\x7f', u'\x7f')),  # ASCII C0 (ECMA-48) characters and DEL
+    u'digit': ((u'0', u'9'),),
+    u'graph': ((u'\x21', u'\x7e'),),  # ASCII graphical characters (without C0, DEL and SP)
+    u'lower': ((u'a', u'z'),),
+    u'print': ((u'\x20', u'\x7e'),),  # ASCII printable characters (without C0 and DEL)
+    u'punct': ((u'!', u'/'), (u':', u'@'), (u'[', u'`'), (u'{', u'~')),
+    u'space': ((u'\t', u'\r'), (u' ', u' ')),  # ASCII: HT, LF, VT, FF, CR and SP
+    u'upper': ((u'A', u'Z'),),
+    u'xdigit': ((u'0', u'9'), (u'A', u'F'), (u'a', u'f')),
+}
+
+# Unicode general categories of each character class. The classes that are not defined by
+# categories only are completed by `_UNICODE_EXTRA_RANGES`.
+_UNICODE_CATEGORIES = {
+    u'alnum': frozenset([u'Lu', u'Ll', u'Lt', u'Lm', u'Lo', u'Nd']),
+    u'alpha': frozenset([u'Lu', u'Ll', u'Lt', u'Lm', u'Lo']),
+    u'blank': frozenset([u'Zs']),
+    u'cntrl': frozenset([u'Cc']),
+    u'digit': frozenset([u'Nd']),
+    u'graph': frozenset([u'Lu', u'Ll', u'Lt', u'Lm', u'Lo', u'Mn', u'Mc', u'Me', u'Nd', u'Nl',
+                         u'No', u'Pc', u'Pd', u'Ps', u'Pe', u'Pi', u'Pf', u'Po', u'Sm', u'Sc',
+                         u'Sk', u'So']),
+    u'lower': frozenset([u'Ll']),
+    u'print': frozenset([u'Lu', u'Ll', u'Lt', u'Lm', u'Lo', u'Mn', u'Mc', u'Me', u'Nd', u'Nl',
+                         u'No', u'Pc', u'Pd', u'Ps', u'Pe', u'Pi', u'Pf', u'Po', u'Sm', u'Sc',
+                         u'Sk', u'So', u'Zs']),
+    u'punct': frozenset([u'Pc', u'Pd', u'Ps', u'Pe', u'Pi', u'Pf', u'Po', u'Sm', u'Sc', u'Sk',
+                         u'So']),
+    u'space': frozenset([u'Zs', u'Zl', u'Zp']),
+    u'upper': frozenset([u'Lu', u'Lt']),
+    u'xdigit': frozenset(),
+}
+
+_UNICODE_EXTRA_RANGES = {
+    u'blank': ((u'\t', u'\t'),),
+    u'space': ((u'\t', u'\r'), (u'\x1c', u'\x1f'), (u'\x85', u'\x85')),
+    u'xdigit': _CHARACTER_CLASSES[u'xdigit'],
+}
+
+# Runs of consecutive code points sharing the same general category: `(start, end, category)`,
+# built on first use by `_category_runs`.
+_category_runs_table = None  # type: typing.Optional[typing.List[tuple]]
+
+# Ranges of the Unicode character classes, by name, built on first use of each class
+_unicode_classes = {}  # type: typing.Dict[text_type, typing.Tuple[tuple, ...]]
+
+
+def is_character_class(name):
+    u"""
+    Tests if `name` is the name of a supported character class.
+
+    :type name: text_type
+    :rtype: bool
+    """
+    return name in _CHARACTER_CLASSES
+
+
+def character_class_ranges(name, binary=False, case_fold=False):
+    u"""
+    Returns the characters of a character class, as sorted and disjoint inclusive ranges.
+
+    With the `case_fold` flag, `[:upper:]` and `[:lower:]` match both cases (as Git does): the
+    other classes are closed under case mapping.
+
+    :type name: text_type
+    :param name: Name of the class, see `is_character_class`
+    :type binary: bool
+    :param binary: Use the ASCII definition of the class (for bytes patterns)
+    :type case_fold: bool
+    :rtype: typing.Tuple[typing.Tuple[text_type, text_type], ...]
+    """
+    if not is_character_class(name):
+        raise ValueError(u'Unknown character class: {}'.format(repr(name)))
+    if case_fold and name in (u'upper', u'lower'):
+        return merge_ranges(character_class_ranges(u'upper', binary)
+                            + character_class_ranges(u'lower', binary))
+    if binary:
+        return _CHARACTER_CLASSES[name]
+    ranges = _unicode_classes.get(name)
+    if ranges is None:
+        ranges = _unicode_classes[name] = _build_unicode_class(name)
+    return ranges
+
+
+def merge_ranges(ranges):
+    u"""
+    Sorts inclusive character ranges and merges the overlapping or adjacent ones. Empty ranges
+    (with `start > end`) are dropped.
+
+    :type ranges: typing.Iterable[typing.Tuple[text_type, text_type]]
+    :rtype: typing.Tuple[typing.Tuple[text_type, text_type], ...]
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if start > end:
+            continue
+        if len(merged) > 0 and ord(start) <= ord(merged[-1][1]) + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return tuple(merged)
+
+
+def _build_unicode_class(name):
+    u"""
+    :type name: text_type
+    :rtype: typing.Tuple[typing.Tuple[text_type, text_type], ...]
+    """
+    categories = _UNICODE_CATEGORIES[name]
+    ranges = [(unichr(start), unichr(end)) for start, end, category in _category_runs()
+              if category in categories]
+    ranges.extend(_UNICODE_EXTRA_RANGES.get(name, ()))
+    return merge_ranges(ranges)
+
+
+def _category_runs():
+    u"""
+    Returns the runs of consecutive code points with the same general category. Surrogates and
+    unassigned code points are skipped: no class contains them.
+
+    :rtype: typing.List[typing.Tuple[int, int, text_type]]
+    """
+    global _category_runs_table
+    if _category_runs_table is None:
+        category = unicodedata.category
+        runs = []
+        run_start = 0
+        run_category = category(unichr(0))
+        for code_point in range(1, sys.maxunicode + 1):
+            char_category = category(unichr(code_point))
+            if char_category != run_category:
+                runs.append((run_start, code_point - 1, run_category))
+                run_start = code_point
+                run_category = char_category
+        runs.append((run_start, sys.maxunicode, run_category))
+        _category_runs_table = [run for run in runs if run[2] not in (u'Cs', u'Cn')]
+    return _category_runs_table
@@ -0,0 +1,205 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes the `pathmatch` command, a streaming filter of paths:
+
+    git ls-files | pathmatch '**/*.py' | xargs ...
+    git ls-files | pathmatch --rules .gitignore --invert-match
+    git ls-files -z | pathmatch -z '**/*.py' | xargs -0 ...
+
+The paths are read as bytes in large chunks and matched without decoding them (the patterns are
+encoded with the file system encoding, see `WildmatchPattern`). The selected paths are written
+back one chunk at a time, see `stream.filter_stream`.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+import argparse
+import errno
+import os
+import sys
+# noinspection PyCompatibility
+import typing
+
+from six import binary_type
+
+from pathmatch import ignorefile
+from pathmatch import stream
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.pathspec import Pathspec, PathspecList
+from pathmatch.wildmatch import WildmatchPattern
+
+_SLASH = b'/'
+
+# Exit statuses, as `grep`
+_SELECTED = 0
+_NOTHING_SELECTED = 1
+_ERROR = 2
+
+
+def main(argv=None, stdin=None, stdout=None):
+    u"""
+    Runs the `pathmatch` command.
+
+    :type argv: typing.Sequence[text_type] | None
+    :param argv: The arguments, `sys.argv[1:]` by default
+    :type stdin: typing.BinaryIO | None
+    :param stdin: The standard input, as a binary stream
+    :type stdout: typing.BinaryIO | None
+    :param stdout: The standard output, as a binary stream
+    :rtype: int
+    :return: The exit status: 0 if a path was selected, 1 if no path was selected, 2 on error
+    """
+    args = _parser().parse_args(argv)
+    if stdin is None:
+        stdin = getattr(sys.stdin, u'buffer', sys.stdin)
+    if stdout is None:
+        stdout = getattr(sys.stdout, u'buffer', sys.stdout)
+    if len(args.patterns) == 0 and len(args.rules) == 0:
+        sys.stderr.write(u'pathmatch: no pattern nor rules file\n')
+        return _ERROR
+
+    try:
+        pathspecs = _pathspecs(args)
+    except (IOError, OSError, ValueError) as error:
+        sys.stderr.write(u'pathmatch: {}\n'.format(error))
+        return _ERROR
+    if len(pathspecs.pathspecs) == 1 and not pathspecs.pathspecs[0].negated:
+        match = pathspecs.pathspecs[0].pattern.match
+    else:
+        match = pathspecs.match
+    if args.rooted:
+        match = _rooted(match)
+    separator = stream.NUL if args.null else stream.NEWLINE
+
+    count = 0
+    try:
+        for input_path in args.inputs or [u'-']:
+            if input_path == u'-':
+                count += stream.filter_stream(match, stdin, stdout, separator,
+                                              invert=args.invert_match)
+            else:
+                with open(input_path, u'rb') as input_file:
+                    count += stream.filter_stream(match, input_file, stdout, separator,
+                                                  invert=args.invert_match)
+        stdout.flush()
+    except (IOError, OSError) as error:
+        if error.errno != errno.EPIPE:
+            sys.stderr.write(u'pathmatch: {}\n'.format(error))
+            return _ERROR
+        # The reader exited (`pathmatch ... | head`): stop quietly as grep does, a path was
+        # being written
+        _discard_output(stdout)
+        return _SELECTED
+    return _SELECTED if count > 0 else _NOTHING_SELECTED
+
+
+def _discard_output(stdout):
+    u"""
+    Redirects the output to the null device after a broken pipe: the paths still buffered are
+    discarded when the interpreter flushes them at exit instead of raising again.
+
+    :type stdout: typing.BinaryIO
+    :rtype: None
+    """
+    try:
+        file_descriptor = stdout.fileno()
+    except (AttributeError, IOError, OSError, ValueError):
+        return  # Not a file, for example a `BytesIO`
+    null_descriptor = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(null_descriptor, file_descriptor)
+    finally:
+        os.close(null_descriptor)
+
+
+def _parser():
+    u"""
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog=u'pathmatch',
+        description=u'Writes the paths read from the inputs (one per line, see -z) that match the '
+                    u'patterns. With several patterns or rules, the last matching one wins.')
+    parser.add_argument(u'patterns', metavar=u'PATTERN', nargs=u'*',
+                        help=u'A wildmatch pattern (gitmatch with --gitmatch)')
+    parser.add_argument(u'-i', u'--input', dest=u'inputs', metavar=u'FILE', action=u'append',
+                        default=[], help=u'Read the paths from FILE instead of the standard input '
+                                         u'(repeatable, - for the standard input)')
+    parser.add_argument(u'-r', u'--rules', metavar=u'FILE', action=u'append', default=[],
+                        help=u'Read gitignore rules from FILE, before the PATTERN arguments '
+                             u'(repeatable)')
+    parser.add_argument(u'-g', u'--gitmatch', action=u'store_true',
+                        help=u'The PATTERN arguments are gitmatch patterns (gitignore rules)')
+    parser.add_argument(u'-R', u'--rooted', action=u'store_true',
+                        help=u'The paths are relative to the root of the rules (as the output of '
+                             u'`git ls-files`): a slash is prepended before matching them')
+    parser.add_argument(u'-v', u'--invert-match', action=u'store_true',
+                        help=u'Write the paths that do not match')
+    parser.add_argument(u'-z', u'--null', action=u'store_true',
+                        help=u'The paths are separated by NUL characters instead of newlines, in '
+                             u'the inputs and the output')
+    parser.add_argument(u'--case-fold', action=u'store_true',
+                        help=u'Perform a case insensitive match')
+    parser.add_argument(u'--no-escape', action=u'store_true',
+                        help=u'Wildmatch: disable backslash escaping')
+    parser.add_argument(u'--no-path-name', dest=u'path_name', action=u'store_false',
+                        help=u'Wildmatch: wildcards match slashes (requires --no-wild-star)')
+    parser.add_argument(u'--no-wild-star', dest=u'wild_star', action=u'store_false',
+                        help=u'Wildmatch: `**` is a simple asterisk')
+    return parser
+
+
+def _pathspecs(args):
+    u"""
+    Compiles the rules files and the patterns of the arguments to bytes patterns.
+
+    :type args: argparse.Namespace
+    :rtype: PathspecList
+    """
+    pathspecs = []
+    patterns = {}  # Shared by the rules files
+    for rules_path in args.rules:
+        with open(rules_path, u'rb') as rules_file:
+            pathspecs.extend(ignorefile.parse_pathspecs(rules_file.read(),
+                                                        case_fold=args.case_fold,
+                                                        patterns=patterns, source=rules_path))
+    for pattern in args.patterns:
+        pattern = _encode_argument(pattern)
+        if args.gitmatch:
+            pathspecs.append(Pathspec(GitmatchPattern(pattern, case_fold=args.case_fold)))
+        else:
+            pathspecs.append(Pathspec(WildmatchPattern(
+                pattern, no_escape=args.no_escape, path_name=args.path_name,
+                wild_star=args.wild_star, case_fold=args.case_fold)))
+    return PathspecList(pathspecs, prefilter=len(pathspecs) > 1)
+
+
+def _encode_argument(argument):
+    u"""
+    Returns a command line argument as bytes, encoded as the paths of the file system.
+
+    :type argument: text_type | binary_type
+    :rtype: binary_type
+    """
+    if isinstance(argument, binary_type):  # Python 2
+        return argument
+    if hasattr(os, u'fsencode'):
+        return os.fsencode(argument)
+    return argument.encode(sys.getfilesystemencoding() or u'utf-8')
+
+
+def _rooted(match):
+    u"""
+    Returns a matcher of the paths relative to the root of the rules.
+
+    :type match: typing.Callable[[binary_type], bool]
+    :rtype: typing.Callable[[binary_type], bool]
+    """
+    def match_rooted(path):
+        return match(_SLASH + path)
+    return match_rooted
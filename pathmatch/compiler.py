@@ -0,0 +1,667 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes the compilation of parsed patterns (the nodes returned by `syntax.parse`) to
+the matchers of `wildmatch` and `gitmatch`: Python regexes, fast paths, programs of the native
+and segment engines and required literals.
+
+The bytes patterns are decoded with `decode_pattern` before being parsed, the functions taking a
+`binary` flag encode their results back to bytes.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+import re
+import sys
+# noinspection PyCompatibility
+import typing
+
+from six import binary_type, text_type, unichr
+
+from pathmatch import charclass
+from pathmatch import fastpath
+from pathmatch import native
+from pathmatch import segment
+from pathmatch import syntax
+
+
+RegexType = type(re.compile(u''))
+
+# Matching engines of `WildmatchPattern` and `GitmatchPattern`
+ENGINE_REGEX = u'regex'  # Python regular expression returned by `wildmatch.translate`
+ENGINE_NATIVE = u'native'  # Linear-time automaton of the `native` module, never backtracks
+ENGINE_SEGMENT = u'segment'  # Component by component matching of the `segment` module
+
+
+# When inserted in a pattern, this prevents the pattern from matching anything.
+_PY_IMPOSSIBLE_MATCH = u'(?:a\\A)'
+
+# First character outside of the Basic Multilingual Plane, `None` on narrow Python 2 builds. The
+# `re` module compiles the BMP part of a character set to a bitmap but tests the other ranges one
+# by one: when a character class has more supplementary items than `_MAX_SUPPLEMENTARY_ITEMS`,
+# they are only tested after a single range check (see `_py_pattern_from_character_set`). Below
+# this count, the alternation costs more than the tests.
+_FIRST_SUPPLEMENTARY_CHAR = unichr(0x10000) if sys.maxunicode > 0xffff else None
+_MAX_SUPPLEMENTARY_ITEMS = 32
+
+# Bytes patterns are parsed as latin-1 texts: each byte is decoded to the code point with the same
+# value. The results (regexes, fast paths and literals) are encoded back to bytes.
+_BINARY_ENCODING = u'latin-1'
+
+# Maximum number of code points of a bracket expression range folded character by character
+_MAX_FOLDED_RANGE = 0x2000
+
+_SLASH = u'/'  # Path separator
+_BINARY_SLASH = b'/'
+
+
+def decode_pattern(pattern):
+    u"""
+    Decodes a bytes pattern to the text parsed by `syntax.parse`.
+
+    :type pattern: text_type | binary_type
+    :rtype: typing.Tuple[text_type, bool]
+    :return: The text pattern and a boolean indicating if `pattern` was a bytes pattern
+    """
+    if isinstance(pattern, binary_type):
+        return pattern.decode(_BINARY_ENCODING), True
+    return pattern, False
+
+
+def encode_fast_path(fast_path):
+    u"""
+    Encodes the operand of a fast path for a bytes pattern.
+
+    :type fast_path: fastpath.FastPath | None
+    :rtype: fastpath.FastPath | None
+    """
+    if fast_path is None:
+        return None
+    return fast_path._replace(operand=fast_path.operand.encode(_BINARY_ENCODING))
+
+
+def encode_literals(literals):
+    u"""
+    Encodes the required literals of a bytes pattern.
+
+    :type literals: typing.Tuple[text_type, ...]
+    :rtype: typing.Tuple[binary_type, ...]
+    """
+    return tuple(literal.encode(_BINARY_ENCODING) for literal in literals)
+
+
+def regex_from_nodes(nodes, path_name, closed_regex, binary=False, case_fold=False):
+    u"""
+    Converts a parsed pattern to a compiled regex.
+
+    :type nodes: typing.Sequence[syntax.Node]
+    :param nodes: Nodes returned by `syntax.parse`
+    :type binary: bool
+    :param binary: Compile a bytes regex, the nodes are parsed from `decode_pattern`
+    :type case_fold: bool
+    :param case_fold: Compile a case insensitive regex
+    :rtype: RegexType
+    """
+    return re.compile(*regex_source_from_nodes(nodes, path_name, closed_regex, binary=binary,
+                                               case_fold=case_fold))
+
+
+def regex_source_from_nodes(nodes, path_name, closed_regex, binary=False, case_fold=False):
+    u"""
+    Converts a parsed pattern to the arguments of `re.compile`, see `regex_from_nodes`.
+
+    :type nodes: typing.Sequence[syntax.Node]
+    :type binary: bool
+    :type case_fold: bool
+    :rtype: typing.Tuple[text_type | binary_type, int]
+    """
+    pattern = pattern_from_nodes(nodes, path_name, binary=binary, case_fold=case_fold)
+    if closed_regex:
+        pattern = u'\\A' + pattern + u'\\Z'
+    return regex_source(pattern, binary=binary, case_fold=case_fold)
+
+
+def pattern_from_nodes(nodes, path_name, binary=False, case_fold=False):
+    u"""
+    Converts a parsed pattern to the source of an unanchored regex.
+
+    :type nodes: typing.Sequence[syntax.Node]
+    :param nodes: Nodes returned by `syntax.parse`
+    :type binary: bool
+    :type case_fold: bool
+    :rtype: text_type
+    """
+    result = []
+
+    for node in nodes:
+        if isinstance(node, syntax.Literal):
+            result.append(re.escape(node.text))
+        elif isinstance(node, syntax.BracketExpression):
+            result.append(_py_pattern_from_bracket_expression(node, path_name=path_name,
+                                                              case_fold=case_fold,
+                                                              binary=binary))
+        elif isinstance(node, syntax.WildStar):
+            if node.trailing:  # Pattern like ** or foo/**:
+                result.append(u'.*')
+            else:  # Pattern like **/foo or foo/**/bar
+                result.append(u'(?:.*\\/)?')
+        elif isinstance(node, syntax.Asterisk):
+            result.append(u'[^/]*' if path_name else u'.*')
+        else:  # Question mark
+            result.append(u'[^/]' if path_name else u'.')
+
+    return u''.join(result)
+
+
+def compile_regex(pattern, binary=False, case_fold=False):
+    u"""
+    Compiles a regex source returned by `pattern_from_nodes`.
+
+    :type pattern: text_type
+    :type binary: bool
+    :param binary: Compile a bytes regex, `pattern` is encoded back to bytes
+    :type case_fold: bool
+    :rtype: RegexType
+    """
+    return re.compile(*regex_source(pattern, binary=binary, case_fold=case_fold))
+
+
+def regex_source(pattern, binary=False, case_fold=False):
+    u"""
+    Returns the arguments of `re.compile` for a regex source returned by
+    `pattern_from_nodes`, see `compile_regex`.
+
+    :type pattern: text_type
+    :type binary: bool
+    :type case_fold: bool
+    :rtype: typing.Tuple[text_type | binary_type, int]
+    """
+    # The flags are plain integers (not `re.RegexFlag`) to be serialized by `diskcache`. As the
+    # fast paths and the other engines, the wildcards match newlines: `.` needs `re.DOTALL`.
+    if binary:
+        # Bytes regexes only fold the case of ASCII letters
+        return (pattern.encode(_BINARY_ENCODING),
+                int(re.DOTALL | re.IGNORECASE) if case_fold else int(re.DOTALL))
+    # The UNICODE flag is implicit on Python 3, it enables the case folding of non-ASCII letters
+    return pattern, int(re.DOTALL | re.IGNORECASE | re.UNICODE) if case_fold else int(re.DOTALL)
+
+
+def required_literals_from_nodes(nodes):
+    u"""
+    Returns the texts of the literal nodes: every match contains them.
+
+    :type nodes: typing.Sequence[syntax.Node]
+    :param nodes: Nodes returned by `syntax.parse`
+    :rtype: typing.Tuple[text_type, ...]
+    """
+    return tuple(node.text for node in nodes if isinstance(node, syntax.Literal))
+
+
+def _case_variants(char, binary=False):
+    u"""
+    Returns the single-character case variants of a character, including the character itself.
+
+    :type char: text_type
+    :type binary: bool
+    :param binary: `char` is a decoded byte, only ASCII letters have case variants
+    :rtype: typing.Set[text_type]
+    """
+    variants = {char}
+    if binary and ord(char) >= 0x80:
+        return variants
+    for variant in (char.lower(), char.upper()):
+        if len(variant) == 1:
+            variants.add(variant)
+    return variants
+
+
+def native_program_from_nodes(nodes, path_name, case_fold=False, binary=False):
+    u"""
+    Converts a parsed pattern to a program for the native engine.
+
+    :type nodes: typing.Sequence[syntax.Node]
+    :param nodes: Nodes returned by `syntax.parse`
+    :type case_fold: bool
+    :param case_fold: Match the case variants of the letters
+    :type binary: bool
+    :param binary: The nodes are parsed from `decode_pattern`
+    :rtype: typing.List[typing.Tuple[text_type, typing.Any]]
+    """
+    program = []
+
+    for node in nodes:
+        if isinstance(node, syntax.Literal):
+            for char in node.text:
+                variants = _case_variants(char, binary) if case_fold else (char,)
+                # The text patterns fold the case as the regex, see `native.CharSet`: the
+                # non-ASCII characters may have variants without `lower` or `upper` (like İ)
+                text_fold = case_fold and not binary
+                if len(variants) > 1 or (text_fold and ord(char) >= 0x80):
+                    program.append((native.SET, native.CharSet(True, variants, (), (),
+                                                               case_fold=text_fold)))
+                else:
+                    program.append((native.CHAR, char))
+        elif isinstance(node, syntax.BracketExpression):
+            char_set = native.CharSet(*resolve_bracket_expression(
+                node, path_name=path_name, case_fold=case_fold, binary=binary),
+                case_fold=case_fold and not binary)
+            program.append((native.SET, char_set))
+        elif isinstance(node, syntax.WildStar):
+            if node.trailing:  # Pattern like ** or foo/**:
+                program.append((native.STAR, False))
+            else:  # Pattern like **/foo or foo/**/bar
+                program.append((native.DEEP, None))
+        elif isinstance(node, syntax.Asterisk):
+            program.append((native.STAR, path_name))
+        else:  # Question mark
+            program.append((native.ANY, path_name))
+
+    return program
+
+
+def segment_program_from_nodes(nodes, case_fold=False, binary=False, dir_suffix=False):
+    u"""
+    Converts a parsed pattern to a program for the segment engine. The pattern is matched with
+    the `path_name` flag.
+
+    :type nodes: typing.Sequence[syntax.Node]
+    :param nodes: Nodes returned by `syntax.parse`
+    :type case_fold: bool
+    :param case_fold: Match the case variants of the letters
+    :type binary: bool
+    :param binary: The nodes are parsed from `decode_pattern`
+    :type dir_suffix: bool
+    :param dir_suffix: Also match the paths inside the matched directories (see `gitmatch`)
+    :rtype: typing.List[typing.Tuple[text_type, typing.Any]]
+    """
+    program = []
+    component = []  # Nodes of the current component
+    for node in nodes:
+        if isinstance(node, syntax.Literal):
+            parts = node.text.split(_SLASH)
+            if len(parts[0]) > 0:
+                component.append(syntax.Literal(parts[0]))
+            for part in parts[1:]:
+                program.append(_segment_instruction(component, case_fold, binary))
+                component = [syntax.Literal(part)] if len(part) > 0 else []
+        elif isinstance(node, syntax.WildStar):
+            # The parser only accepts wild stars delimited by slashes: `component` is empty
+            if node.trailing:
+                program.append((segment.TAIL, None))
+                return program
+            program.append((segment.DEEP, None))  # Consumes the following slash
+        else:
+            component.append(node)
+    program.append(_segment_instruction(component, case_fold, binary))
+    if dir_suffix:
+        program.append((segment.DEEP, None))
+    return program
+
+
+def _segment_instruction(nodes, case_fold, binary):
+    u"""
+    Returns the segment engine instruction matching a single component.
+
+    :type nodes: typing.Sequence[syntax.Node]
+    :param nodes: Nodes of the component, without slash
+    :rtype: typing.Tuple[text_type, typing.Any]
+    """
+    shape = tuple(type(node) for node in nodes)
+    if shape == (syntax.Asterisk,):
+        return segment.ANY, None
+    literal, instruction = None, None
+    if case_fold:
+        pass  # The literals are compared case insensitively by the regex
+    elif shape == ():
+        literal, instruction = u'', segment.LITERAL
+    elif shape == (syntax.Literal,):
+        literal, instruction = nodes[0].text, segment.LITERAL
+    elif shape == (syntax.Literal, syntax.Asterisk):
+        literal, instruction = nodes[0].text, segment.PREFIX
+    elif shape == (syntax.Asterisk, syntax.Literal):
+        literal, instruction = nodes[1].text, segment.SUFFIX
+    elif shape == (syntax.Asterisk, syntax.Literal, syntax.Asterisk):
+        literal, instruction = nodes[1].text, segment.CONTAINS
+    if instruction is not None:
+        return instruction, literal.encode(_BINARY_ENCODING) if binary else literal
+    regex = regex_from_nodes(nodes, path_name=True, closed_regex=True, binary=binary,
+                             case_fold=case_fold)
+    return segment.REGEX, regex
+
+
+def fast_path_from_nodes(nodes, path_name, dir_suffix=False):
+    u"""
+    Detects the common pattern shapes that do not need a regex. The supported shapes are made of
+    an optional leading wild star `**/`, a body (`foo`, `*foo` or `foo*`) and an optional trailing
+    wild star `/**` or directory suffix.
+
+    :type nodes: typing.Sequence[syntax.Node]
+    :param nodes: Nodes returned by `syntax.parse`
+    :rtype: fastpath.FastPath | None
+    """
+    deep = len(nodes) > 0 and isinstance(nodes[0], syntax.WildStar) and not nodes[0].trailing
+    tree = len(nodes) > 0 and isinstance(nodes[-1], syntax.WildStar) and nodes[-1].trailing
+    body = nodes[(1 if deep else 0):(-1 if tree else len(nodes))]
+
+    shape = tuple(type(node) for node in body)
+    if shape == ():
+        literal, asterisk = u'', None
+    elif shape == (syntax.Literal,):
+        literal, asterisk = body[0].text, None
+    elif shape == (syntax.Asterisk,):
+        literal, asterisk = u'', u'head'
+    elif shape == (syntax.Asterisk, syntax.Literal):
+        literal, asterisk = body[1].text, u'head'
+    elif shape == (syntax.Literal, syntax.Asterisk):
+        literal, asterisk = body[0].text, u'tail'
+    else:
+        return None
+
+    if tree:  # The tail `.*` also covers the directory suffix
+        if asterisk == u'head' and deep:
+            # `(?:.*\/)?[^/]*` matches any text: the pattern is equivalent to `.*L.*`
+            return fastpath.FastPath(fastpath.CONTAINS, literal, path_name)
+        elif asterisk is not None:
+            return None
+        elif deep:
+            return fastpath.FastPath(fastpath.DEEP_TREE, literal, path_name)
+        return fastpath.FastPath(fastpath.PREFIX, literal, False)
+
+    if asterisk is None:
+        if deep and dir_suffix:
+            return fastpath.FastPath(fastpath.DEEP_DIR_EQUALS, literal, path_name)
+        elif deep:
+            return fastpath.FastPath(fastpath.DEEP_EQUALS, literal, path_name)
+        elif dir_suffix:
+            return fastpath.FastPath(fastpath.DIR_EQUALS, literal, path_name)
+        return fastpath.FastPath(fastpath.EQUALS, literal, path_name)
+
+    if asterisk == u'head':
+        # `(?:.*\/)?[^/]*` matches any text: the leading wild star only leaves the suffix
+        if deep and dir_suffix:
+            return fastpath.FastPath(fastpath.DEEP_DIR_SUFFIX, literal, path_name)
+        elif deep:
+            return fastpath.FastPath(fastpath.SUFFIX, literal, False)
+        elif not dir_suffix:
+            return fastpath.FastPath(fastpath.SUFFIX, literal, path_name)
+    elif not deep and not dir_suffix:
+        return fastpath.FastPath(fastpath.PREFIX, literal, path_name)
+
+    return None
+
+
+def resolve_bracket_expression(bracket_expression, path_name, case_fold=False, binary=False):
+    u"""
+    Resolves the items of a bracket expression to the sets of characters it matches.
+    With the `path_name` flag, the slash is excluded from the single characters and ranges (but
+    not from the multi-character collating elements).
+    With the `case_fold` flag, the case variants of the single characters and of the characters
+    in the ranges are added to the single characters: `[B-a]` also matches `A`.
+    Character classes (`[:alpha:]`) are resolved to ranges, see `charclass`. An unknown class
+    makes the bracket expression match nothing.
+
+    :param bracket_expression: A bracket expression node
+    :type path_name: bool
+    :type case_fold: bool
+    :type binary: bool
+    :param binary: The bracket expression is decoded with `decode_pattern`
+    :rtype: typing.Tuple[bool, set, set, set]
+    :return: The tuple `(matching, single_chars, ranges, multi_chars)`
+    """
+    single_chars = set()
+    multi_chars = set()
+    ranges = set()
+    class_ranges = []  # Ranges of the character classes
+    matching, items = bracket_expression.matching, bracket_expression.items
+    for item in items:
+        if isinstance(item, syntax.Range):
+            start_seq, end_seq = item.start, item.end
+            if len(start_seq) != 1 or len(end_seq) != 1:
+                raise ValueError(u'Ranges are only supported between single-char collating elems')
+            ranges.add((start_seq, end_seq))
+        elif isinstance(item, syntax.CharacterClass):
+            name = item.name
+            if not charclass.is_character_class(name):
+                # Git rejects the whole pattern: the bracket expression matches nothing
+                return True, set(), set(), set()
+            class_ranges.extend(charclass.character_class_ranges(name, binary, case_fold))
+        else:
+            if isinstance(item, syntax.CollatingElement):
+                sequence = item.sequence
+            elif isinstance(item, syntax.EquivalenceClass):
+                sequence = item.representant
+            else:
+                raise ValueError(u'Unexpected item {}'.format(item))
+
+            if len(sequence) == 0:
+                raise ValueError(u'Empty string is not a valid collating element')
+            elif len(sequence) == 1:
+                single_chars.add(sequence)
+            else:
+                multi_chars.add(sequence)
+
+    if case_fold:
+        single_chars |= _fold_bracket_expression_chars(single_chars, ranges, binary)
+    # The classes are already closed under case folding, their large ranges are not folded again
+    ranges.update(class_ranges)
+
+    if path_name:  # bracket expression cannot match /
+        if not matching:
+            single_chars.add(_SLASH)  # Pretty easy!
+        else:  # Remove slash from single_chars and ranges (we do not check multi_chars)
+            if _SLASH in single_chars:
+                single_chars.remove(_SLASH)
+
+            slash_code_point = ord(_SLASH)
+            cleared_ranges = set()
+            for be_range in ranges:
+                start_seq, end_seq = be_range
+                if len(start_seq) != 1 or len(end_seq) != 1:
+                    raise ValueError(u'Only ranges between single characters are supported in '
+                                     u'bracket expression with the path_name flag')
+                start_code_point = ord(start_seq)
+                end_code_point = ord(end_seq)
+                if start_code_point > end_code_point:
+                    raise ValueError(u'Invalid range, wrong order of bounds: {}'.format(be_range))
+                if slash_code_point < start_code_point or slash_code_point > end_code_point:
+                    cleared_ranges.add(be_range)
+                else:
+                    if start_code_point == slash_code_point:
+                        if end_code_point == slash_code_point:  # /-/
+                            continue
+                        else:  # start = slash < end
+                            start_seq = unichr(start_code_point + 1)
+                            cleared_ranges.add((start_seq, end_seq))
+                    else:
+                        if end_code_point == slash_code_point:  # start < slash = end
+                            end_seq = unichr(end_code_point - 1)
+                            cleared_ranges.add((start_seq, end_seq))
+                        else:  # start < slash < end
+                            before_slash = unichr(slash_code_point - 1)
+                            after_slash = unichr(slash_code_point + 1)
+                            cleared_ranges.add((start_seq, before_slash))
+                            cleared_ranges.add((after_slash, end_seq))
+            ranges = cleared_ranges
+
+    return matching, single_chars, ranges, multi_chars
+
+
+def _fold_bracket_expression_chars(single_chars, ranges, binary):
+    u"""
+    Returns the case variants of the characters of a bracket expression that are not in the
+    bracket expression itself. Ranges larger than `_MAX_FOLDED_RANGE` code points are left to
+    the `re.IGNORECASE` flag, also applied by the native engine to the text patterns (see
+    `native.CharSet`). The bytes patterns only fold ASCII letters, their ranges are small.
+
+    :type single_chars: typing.Set[text_type]
+    :type ranges: typing.Set[typing.Tuple[text_type, text_type]]
+    :type binary: bool
+    :rtype: typing.Set[text_type]
+    """
+    folded = set()
+    for char in single_chars:
+        folded |= _case_variants(char, binary)
+    for start, end in ranges:
+        if ord(end) - ord(start) > _MAX_FOLDED_RANGE:
+            continue
+        for code_point in range(ord(start), ord(end) + 1):
+            for variant in _case_variants(unichr(code_point), binary):
+                if not start <= variant <= end:
+                    folded.add(variant)
+    return folded - single_chars
+
+
+def _py_pattern_from_bracket_expression(bracket_expression, path_name, case_fold=False,
+                                        binary=False):
+    u"""
+    Converts a bracket expression to a Python regex pattern.
+
+    :param bracket_expression: A bracket expression node
+    :type path_name: bool
+    :type case_fold: bool
+    :type binary: bool
+    :rtype: text_type
+    """
+    matching, single_chars, ranges, multi_chars = resolve_bracket_expression(
+        bracket_expression, path_name, case_fold=case_fold, binary=binary)
+
+    if len(single_chars) > 0 or len(ranges) > 0:
+        primary_pattern = _py_pattern_from_character_set(matching, single_chars, ranges)
+    else:
+        primary_pattern = None
+
+    if len(multi_chars) > 0:
+        if not matching:
+            raise ValueError(u'Cannot perform negative match on bracket expression containing '
+                             u'multi-character collating elements')
+        alternate_pattern = u'|'.join(re.escape(seq) for seq in multi_chars)
+    else:
+        alternate_pattern = None
+
+    if alternate_pattern is None:
+        if primary_pattern is None:  # Can happen when removing characters
+            return _PY_IMPOSSIBLE_MATCH
+        else:
+            return primary_pattern
+    else:
+        if primary_pattern is not None:
+            alternate_pattern = primary_pattern + u'|' + alternate_pattern
+        return u'(?:{})'.format(alternate_pattern)
+
+
+def _py_pattern_from_character_set(matching, single_chars, ranges):
+    u"""
+    Converts the characters of a bracket expression to a Python regex character set.
+
+    When there are many characters outside of the Basic Multilingual Plane, they are moved to a
+    second set only tested for the characters of these planes: `[ab\\U00010400...]` becomes
+    `(?:[ab]|(?=[\\U00010000-\\U0010ffff])[\\U00010400...])`.
+
+    :type matching: bool
+    :type single_chars: typing.Set[text_type]
+    :type ranges: typing.Set[typing.Tuple[text_type, text_type]]
+    :rtype: text_type
+    """
+    if _FIRST_SUPPLEMENTARY_CHAR is None:
+        return _py_character_set(matching, single_chars, ranges)
+
+    supplementary_chars = set(char for char in single_chars if char >= _FIRST_SUPPLEMENTARY_CHAR)
+    supplementary_ranges = set((max(start, _FIRST_SUPPLEMENTARY_CHAR), end)
+                               for start, end in ranges if end >= _FIRST_SUPPLEMENTARY_CHAR)
+    if len(supplementary_chars) + len(supplementary_ranges) <= _MAX_SUPPLEMENTARY_ITEMS:
+        return _py_character_set(matching, single_chars, ranges)
+
+    last_bmp_char = unichr(ord(_FIRST_SUPPLEMENTARY_CHAR) - 1)
+    supplementary_planes = ((_FIRST_SUPPLEMENTARY_CHAR, unichr(sys.maxunicode)),)
+    bmp_chars = single_chars - supplementary_chars
+    bmp_ranges = set((start, min(end, last_bmp_char))
+                     for start, end in ranges if start < _FIRST_SUPPLEMENTARY_CHAR)
+    if matching:
+        bmp_pattern = _py_character_set(True, bmp_chars, bmp_ranges)
+    else:  # The supplementary characters are matched by the second set
+        bmp_pattern = _py_character_set(False, bmp_chars, bmp_ranges | set(supplementary_planes))
+    return u'(?:{}|(?={}){})'.format(
+        bmp_pattern, _py_character_set(True, (), supplementary_planes),
+        _py_character_set(matching, supplementary_chars, supplementary_ranges))
+
+
+def _py_character_set(matching, single_chars, ranges):
+    u"""
+    :type matching: bool
+    :type single_chars: typing.Iterable[text_type]
+    :type ranges: typing.Iterable[typing.Tuple[text_type, text_type]]
+    :rtype: text_type
+    """
+    if matching and len(single_chars) == 0 and len(ranges) == 0:
+        return _PY_IMPOSSIBLE_MATCH
+    pattern = [u'['] if matching else [u'[^']
+
+    for char in single_chars:
+        pattern.append(_escape_bracket_expression_character(char))
+
+    for start, end in ranges:
+        pattern.append(_escape_bracket_expression_character(start))
+        pattern.append(u'-')
+        pattern.append(_escape_bracket_expression_character(end))
+
+    pattern.append(u']')
+    return u''.join(pattern)
+
+
+def _escape_bracket_expression_character(unsafe_char):
+    if unsafe_char == u'^':
+        return u'\\^'
+    elif unsafe_char == u']':
+        return u'\\]'
+    elif unsafe_char == u'-':
+        return u'\\-'
+    elif unsafe_char == u'\\':
+        return u'\\\\'
+    else:
+        return unsafe_char
+
+
+def compile_matcher(nodes, get_regex, fast_path, path_name, case_fold=False, binary=False,
+                    engine=ENGINE_REGEX, lazy=False, get_segment_matcher=None):
+    u"""
+    Returns the fastest matcher of a compiled pattern: its fast path if any, otherwise its regex,
+    a native automaton or a segment matcher.
+
+    :type nodes: typing.Sequence[syntax.Node]
+    :type get_regex: typing.Callable[[], RegexType]
+    :param get_regex: Returns the closed regex of the pattern, only called if the matcher needs
+                      it.
+    :type fast_path: fastpath.FastPath | None
+    :type path_name: bool
+    :type case_fold: bool
+    :type binary: bool
+    :type engine: text_type
+    :param engine: `ENGINE_REGEX`, `ENGINE_NATIVE` or `ENGINE_SEGMENT`
+    :type lazy: bool
+    :param lazy: Do not compile the regex now
+    :type get_segment_matcher: typing.Callable[[], segment.SegmentMatcher] | None
+    :param get_segment_matcher: Returns the segment matcher of the pattern, for `ENGINE_SEGMENT`
+    :rtype: typing.Callable[[text_type], bool] | None
+    :return: The matcher, or `None` if it is the regex and `lazy` is set
+    """
+    if fast_path is not None and not case_fold:
+        return fastpath.compile_matcher(fast_path)
+    elif fast_path is not None:
+        # `None` if the fast path cannot be matched case insensitively
+        match = fastpath.compile_case_fold_matcher(
+            fast_path, lambda text: get_regex().match(text) is not None)
+        if match is not None:
+            return match
+    if engine == ENGINE_NATIVE:
+        program = native_program_from_nodes(nodes, path_name=path_name, case_fold=case_fold,
+                                            binary=binary)
+        return native.NativeMatcher(program, binary=binary).match
+    elif engine == ENGINE_SEGMENT:
+        return get_segment_matcher().match
+    if lazy:
+        return None
+    return fastpath.regex_matcher(get_regex())
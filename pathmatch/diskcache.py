@@ -0,0 +1,263 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes an on-disk cache of compiled patterns and path spec lists.
+
+Tools loading the same large rule files on every start (ignore files, CODEOWNERS...) spend most of
+their startup parsing the rules, translating them to regular expressions and classifying their
+fast paths. The compiled state of the patterns is stored in a cache directory, keyed by a hash of
+the rules and of all the flags: a warm start restores the patterns without parsing nor translating
+them. Only the regexes are compiled again from their stored source.
+
+The entries are serialized with `marshal`, they only contain builtin values (no code is loaded
+from the cache). An entry written by another version of this module, of Python or of the Unicode
+database is never read since these versions are part of the key. Unreadable entries are treated as
+misses and overwritten.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+import errno
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import unicodedata
+# noinspection PyCompatibility
+import typing
+
+from six import binary_type, integer_types, text_type
+
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.pathspec import Pathspec, PathspecList
+from pathmatch.wildmatch import WildmatchPattern
+
+
+# Version of the serialized state, increment it when the state of a serialized class changes
+FORMAT_VERSION = 3
+
+_FILE_SUFFIX = u'.pmc'
+
+_WILDMATCH = u'wildmatch'
+_GITMATCH = u'gitmatch'
+_PATHSPEC = u'pathspec'
+_PATHSPEC_LIST = u'pathspec_list'
+_LIST = u'list'
+
+
+class DiskCache(object):
+    def __init__(self, directory):
+        u"""
+        A cache of compiled patterns stored in a directory, created on the first write.
+
+        :type directory: text_type
+        :param directory: Path of the cache directory
+        :rtype: None
+        """
+        self.directory = directory
+
+    def get(self, key, factory):
+        u"""
+        Returns the compiled value stored for `key`, calling `factory` to create (and store) it if
+        it is missing. The cache is best effort: when the entry cannot be written (read-only or
+        full file system), the created value is returned without storing it.
+
+        :type key: tuple
+        :param key: The cache key, made of texts, bytes, numbers, booleans, `None` and tuples or
+                    lists of them. It must identify the rules and all of their flags.
+        :type factory: typing.Callable[[], typing.Any]
+        :param factory: A function compiling the value: a `WildmatchPattern`, a `GitmatchPattern`,
+                        a `Pathspec`, a `PathspecList` or a list of them.
+        :return: The compiled value
+        """
+        path = self.path(key)
+        try:
+            with open(path, u'rb') as cache_file:
+                data = cache_file.read()
+        except (IOError, OSError):
+            data = None
+        if data is not None:
+            try:
+                return loads(data)
+            except (EOFError, ValueError, TypeError, KeyError, IndexError):
+                pass  # Corrupted or truncated entry: overwrite it
+
+        value = factory()
+        data = dumps(value)
+        try:
+            self._write(path, data)
+        except (IOError, OSError):
+            pass  # The next call compiles the value again
+        return value
+
+    def path(self, key):
+        u"""
+        Returns the path of the cache file storing the value of `key`.
+
+        :type key: tuple
+        :rtype: text_type
+        """
+        return os.path.join(self.directory, cache_key(key) + _FILE_SUFFIX)
+
+    def clear(self):
+        u"""
+        Removes all the entries of this cache.
+
+        :rtype: None
+        """
+        try:
+            names = os.listdir(self.directory)
+        except OSError as error:
+            if error.errno == errno.ENOENT:
+                return
+            raise
+        for name in names:
+            if name.endswith(_FILE_SUFFIX):
+                os.remove(os.path.join(self.directory, name))
+
+    def _write(self, path, data):
+        u"""
+        Writes a cache file atomically: concurrent readers see either no entry or the complete
+        entry.
+
+        :type path: text_type
+        :type data: binary_type
+        :rtype: None
+        """
+        try:
+            os.makedirs(self.directory)
+        except OSError as error:
+            if error.errno != errno.EEXIST:
+                raise
+        descriptor, temp_path = tempfile.mkstemp(suffix=u'.tmp', dir=self.directory)
+        try:
+            with os.fdopen(descriptor, u'wb') as temp_file:
+                temp_file.write(data)
+            _replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+
+def cache_key(key):
+    u"""
+    Returns the hexadecimal digest identifying `key` in a `DiskCache`.
+
+    The digest is computed from a type-tagged encoding of `key`: unlike `hash` or `repr`, it does
+    not depend on the process and it distinguishes texts from bytes on Python 2.
+
+    :type key: tuple
+    :rtype: text_type
+    """
+    digest = hashlib.sha256()
+    _update_digest(digest, (FORMAT_VERSION, tuple(sys.version_info[:2]),
+                            text_type(unicodedata.unidata_version), key))
+    return text_type(digest.hexdigest())
+
+
+def dumps(value):
+    u"""
+    Serializes a compiled value, see `DiskCache.get` for the supported types.
+
+    :rtype: binary_type
+    """
+    return marshal.dumps((FORMAT_VERSION, _dump(value)))
+
+
+def loads(data):
+    u"""
+    Restores a value serialized by `dumps`.
+
+    :type data: binary_type
+    :raise ValueError: If `data` is not a serialized value of the current format
+    """
+    version, state = marshal.loads(data)
+    if version != FORMAT_VERSION:
+        raise ValueError(u'Unsupported format version: {}'.format(repr(version)))
+    return _load(state)
+
+
+def _dump(value):
+    u"""
+    Converts a compiled value to builtin values.
+    """
+    if isinstance(value, WildmatchPattern):
+        return _WILDMATCH, value.__getstate__()
+    elif isinstance(value, GitmatchPattern):
+        return _GITMATCH, value.__getstate__()
+    elif isinstance(value, Pathspec):
+        return _PATHSPEC, _dump(value.pattern), value.negated
+    elif isinstance(value, PathspecList):
+        pathspecs, prefilter = value.__getstate__()
+        return _PATHSPEC_LIST, _dump(pathspecs), prefilter
+    elif isinstance(value, (list, tuple)):
+        return _LIST, tuple(_dump(item) for item in value)
+    raise TypeError(u'Unsupported type: {}'.format(type(value).__name__))
+
+
+def _load(state):
+    u"""
+    Restores a compiled value from the result of `_dump`.
+    """
+    kind = state[0]
+    if kind == _WILDMATCH or kind == _GITMATCH:
+        cls = WildmatchPattern if kind == _WILDMATCH else GitmatchPattern
+        value = cls.__new__(cls)
+        value.__setstate__(state[1])
+        return value
+    elif kind == _PATHSPEC:
+        return Pathspec(_load(state[1]), negated=state[2])
+    elif kind == _PATHSPEC_LIST:
+        value = PathspecList.__new__(PathspecList)
+        value.__setstate__((_load(state[1]), state[2]))
+        return value
+    elif kind == _LIST:
+        return [_load(item) for item in state[1]]
+    raise ValueError(u'Unknown kind: {}'.format(repr(kind)))
+
+
+def _update_digest(digest, part):
+    u"""
+    :type digest: hashlib.sha256
+    :rtype: None
+    """
+    if isinstance(part, (tuple, list)):
+        digest.update(b'(' + text_type(len(part)).encode(u'ascii') + b':')
+        for item in part:
+            _update_digest(digest, item)
+        digest.update(b')')
+        return
+    if isinstance(part, text_type):
+        tag, data = b'u', part.encode(u'utf8')
+    elif isinstance(part, binary_type):
+        tag, data = b'b', part
+    elif part is None or isinstance(part, (bool, float)):
+        # `bool` is tested before the integers: `True` and `1` are distinct keys
+        tag, data = type(part).__name__.encode(u'ascii'), repr(part).encode(u'ascii')
+    elif isinstance(part, integer_types):
+        tag, data = b'int', text_type(part).encode(u'ascii')
+    else:
+        raise TypeError(u'Unsupported key type: {}'.format(type(part).__name__))
+    digest.update(tag + text_type(len(data)).encode(u'ascii') + b':' + data)
+
+
+def _replace(source, destination):
+    u"""
+    Atomically replaces `destination` by `source`.
+
+    :type source: text_type
+    :type destination: text_type
+    :rtype: None
+    """
+    replace = getattr(os, u'replace', None)
+    if replace is not None:
+        replace(source, destination)
+    else:  # Python 2: `rename` replaces existing files on POSIX only
+        if os.name == u'nt' and os.path.exists(destination):
+            os.remove(destination)
+        os.rename(source, destination)
@@ -0,0 +1,291 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes regex-free matchers for the most common pattern shapes.
+
+Most of the rules found in ignore files are plain literals (`build`), suffix globs (`*.pyc`),
+directory trees (`dist/**`) or deep names (`**/node_modules`). These shapes are detected once when
+a pattern is compiled (see `wildmatch.classify`) and matched with simple string operations instead
+of the regular expression returned by `translate`.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+from collections import namedtuple
+import re
+# noinspection PyCompatibility
+import typing
+
+from six import binary_type, text_type
+
+
+RegexType = type(re.compile(u''))
+
+
+# Fast path kinds, `L` is the literal operand. The equivalent regex is given for each kind.
+EQUALS = u'equals'  # `L`
+SUFFIX = u'suffix'  # `[^/]*L` (with path_name) or `.*L`
+PREFIX = u'prefix'  # `L[^/]*` (with path_name) or `L.*`
+DEEP_EQUALS = u'deep_equals'  # `(?:.*\/)?L`
+DEEP_TREE = u'deep_tree'  # `(?:.*\/)?L.*`
+CONTAINS = u'contains'  # `(?:.*\/)?[^/]*L.*`, equivalent to `.*L.*`
+DIR_EQUALS = u'dir_equals'  # `L(?:\/.*)?`
+DEEP_DIR_EQUALS = u'deep_dir_equals'  # `(?:.*\/)?L(?:\/.*)?`
+DEEP_DIR_SUFFIX = u'deep_dir_suffix'  # `(?:.*\/)?[^/]*L(?:\/.*)?`
+
+_SLASH = u'/'
+_BINARY_SLASH = b'/'
+
+FastPath = namedtuple(u'FastPath', [u'kind', u'operand', u'path_name'])
+
+
+def compile_matcher(fast_path):
+    u"""
+    Returns a function matching a whole text against the supplied fast path.
+
+    :type fast_path: FastPath
+    :param fast_path: A fast path description, as returned by `wildmatch.classify`.
+    :rtype: typing.Callable[[text_type], bool]
+    """
+    kind, operand, path_name = fast_path
+    # The operand of a bytes pattern is a bytes string, matched against bytes texts
+    binary = isinstance(operand, binary_type)
+    slash = _BINARY_SLASH if binary else _SLASH
+    size = len(operand)
+    slash_operand = slash + operand
+    operand_slash = operand + slash
+
+    if binary and kind in (DEEP_TREE, CONTAINS, DEEP_DIR_EQUALS, DEEP_DIR_SUFFIX):
+        return _compile_binary_search_matcher(kind, operand)
+    elif kind == EQUALS:
+        def match(text):
+            return text == operand
+    elif kind == SUFFIX and path_name:
+        def match(text):
+            return text.endswith(operand) and text.rfind(slash, 0, len(text) - size) < 0
+    elif kind == SUFFIX:
+        def match(text):
+            return text.endswith(operand)
+    elif kind == PREFIX and path_name:
+        def match(text):
+            return text.startswith(operand) and text.find(slash, size) < 0
+    elif kind == PREFIX:
+        def match(text):
+            return text.startswith(operand)
+    elif kind == DEEP_EQUALS:
+        def match(text):
+            return text == operand or text.endswith(slash_operand)
+    elif kind == DEEP_TREE:
+        def match(text):
+            return slash_operand in text or text.startswith(operand)
+    elif kind == CONTAINS:
+        def match(text):
+            return operand in text
+    elif kind == DIR_EQUALS:
+        def match(text):
+            return text == operand or text.startswith(operand_slash)
+    elif kind == DEEP_DIR_EQUALS:
+        slash_operand_slash = slash + operand + slash
+
+        def match(text):
+            # Most texts do not contain the operand at all: reject them with a single search
+            return operand in text and (text == operand or text.startswith(operand_slash)
+                                        or text.endswith(slash_operand)
+                                        or slash_operand_slash in text)
+    elif kind == DEEP_DIR_SUFFIX:
+        def match(text):
+            return text.endswith(operand) or operand_slash in text
+    else:
+        raise ValueError(u'Unknown fast path kind: {}'.format(repr(kind)))
+
+    return match
+
+
+def compile_case_fold_matcher(fast_path, fallback):
+    u"""
+    Returns a function matching a whole text case insensitively against the supplied fast path,
+    or `None` if this fast path is not supported.
+
+    The fast paths comparing the ends of the text with an ASCII operand lowercase the compared
+    part of the text instead of the whole text. If this part contains non-ASCII characters, their
+    case folding may differ from `str.lower` (for example the Kelvin sign matches `k`): the text
+    is then matched by `fallback`. The fast paths searching the operand in the text reject the
+    texts that do not contain any case variant of two consecutive characters of the operand: only
+    the remaining texts are lowercased.
+
+    :type fast_path: FastPath
+    :param fast_path: A fast path description, as returned by `wildmatch.classify`.
+    :type fallback: typing.Callable[[text_type], bool]
+    :param fallback: Case insensitive matcher equivalent to the fast path (see `regex_matcher`)
+    :rtype: typing.Callable[[text_type], bool] | None
+    """
+    kind, operand, path_name = fast_path
+    binary = isinstance(operand, binary_type)
+    if not binary and not _is_ascii(operand):
+        return None
+    slash = _BINARY_SLASH if binary else _SLASH
+    lowered = operand.lower()
+    size = len(operand)
+
+    def folded_equals(part, text):
+        u"""
+        Compares a part of `text` with the operand.
+        """
+        if part.lower() == lowered:
+            return True
+        # Bytes are only folded as ASCII, like bytes regexes
+        return not binary and not _is_ascii(part) and fallback(text)
+
+    if kind == EQUALS:
+        def match(text):
+            return len(text) == size and folded_equals(text, text)
+    elif kind == SUFFIX:
+        def match(text):
+            end = len(text) - size
+            return end >= 0 and (not path_name or text.rfind(slash, 0, end) < 0) \
+                and folded_equals(text[end:], text)
+    elif kind == PREFIX:
+        def match(text):
+            return len(text) >= size and (not path_name or text.find(slash, size) < 0) \
+                and folded_equals(text[:size], text)
+    elif kind == DEEP_EQUALS:
+        def match(text):
+            end = len(text) - size
+            return (end == 0 or end > 0 and text[end - 1:end] == slash) \
+                and folded_equals(text[end:], text)
+    elif kind == DIR_EQUALS:
+        def match(text):
+            return (len(text) == size or text[size:size + 1] == slash) \
+                and folded_equals(text[:size], text)
+    elif size > 0:  # The operand occurs in every match of the other kinds
+        return _compile_case_fold_search_matcher(fast_path, fallback)
+    else:
+        return None
+
+    return match
+
+
+def _compile_case_fold_search_matcher(fast_path, fallback):
+    u"""
+    Returns a matcher rejecting the texts that do not contain the operand case insensitively, the
+    other texts are lowercased and matched against the lowercased fast path.
+
+    :type fast_path: FastPath
+    :param fast_path: A fast path with a non-empty ASCII operand
+    :type fallback: typing.Callable[[text_type], bool]
+    :param fallback: Case insensitive matcher for the non-ASCII texts
+    :rtype: typing.Callable[[text_type], bool]
+    """
+    operand = fast_path.operand
+    binary = isinstance(operand, binary_type)
+    lowered_match = compile_matcher(fast_path._replace(operand=operand.lower()))
+    # Search the window of two characters with the fewest case variants, they are all searched
+    windows = [operand[index:index + 2] for index in range(max(len(operand) - 1, 1))]
+    window = min(windows, key=lambda part: len(_ascii_case_variants(part)))
+    variants = _ascii_case_variants(window)
+
+    if binary:
+        # Bytes are only folded as ASCII, like bytes regexes
+        def match(text):
+            for variant in variants:
+                if text.find(variant) >= 0:
+                    return lowered_match(text.lower())
+            return False
+    else:
+        def match(text):
+            # Non-ASCII characters may be folded to the operand (for example the Kelvin sign)
+            if not _is_ascii(text):
+                return fallback(text)
+            for variant in variants:
+                if variant in text:
+                    return lowered_match(text.lower())
+            return False
+
+    return match
+
+
+def _ascii_case_variants(text):
+    u"""
+    Returns all the case variants of an ASCII text.
+
+    :type text: text_type | binary_type
+    :rtype: typing.List[text_type | binary_type]
+    """
+    variants = [text[:0]]
+    for index in range(len(text)):
+        char = text[index:index + 1]
+        chars = {char.lower(), char.upper()}
+        variants = [variant + char_variant for variant in variants for char_variant in chars]
+    return sorted(variants)
+
+
+if hasattr(text_type, u'isascii'):  # Python 3.7+
+    _is_ascii = text_type.isascii
+else:
+    def _is_ascii(text):
+        u"""
+        Tests if a text only contains ASCII characters.
+
+        :type text: text_type
+        :rtype: bool
+        """
+        try:
+            text.encode(u'ascii')
+        except UnicodeError:
+            return False
+        return True
+
+
+def _compile_binary_search_matcher(kind, operand):
+    u"""
+    Returns the matcher of a fast path searching a bytes operand in the text.
+
+    On Python 3, the `in` operator of `bytes` first tries to interpret its operand as an integer:
+    it is several times slower than `bytes.find`, these matchers use `find` instead.
+
+    :type kind: text_type
+    :type operand: binary_type
+    :rtype: typing.Callable[[binary_type], bool]
+    """
+    slash_operand = _BINARY_SLASH + operand
+    operand_slash = operand + _BINARY_SLASH
+
+    if kind == DEEP_TREE:
+        def match(text):
+            return text.find(slash_operand) >= 0 or text.startswith(operand)
+    elif kind == CONTAINS:
+        def match(text):
+            return text.find(operand) >= 0
+    elif kind == DEEP_DIR_EQUALS:
+        slash_operand_slash = _BINARY_SLASH + operand + _BINARY_SLASH
+
+        def match(text):
+            return text.find(operand) >= 0 and (text == operand or text.startswith(operand_slash)
+                                                or text.endswith(slash_operand)
+                                                or text.find(slash_operand_slash) >= 0)
+    else:  # DEEP_DIR_SUFFIX
+        def match(text):
+            return text.endswith(operand) or text.find(operand_slash) >= 0
+
+    return match
+
+
+def regex_matcher(regex):
+    u"""
+    Returns a function matching a whole text against a closed regex, with the same interface as
+    the fast path matchers.
+
+    :type regex: RegexType
+    :param regex: A compiled regex, anchored at both ends.
+    :rtype: typing.Callable[[text_type], bool]
+    """
+    regex_match = regex.match
+
+    def match(text):
+        return regex_match(text) is not None
+
+    return match
@@ -19,14 +19,25 @@ import re
 # noinspection PyCompatibility
 import typing
 
-from six import text_type
-
-from pathmatch import wildmatch
+from six import binary_type, text_type
+from six.moves import map as lazy_map
+
+from pathmatch import batch
+from pathmatch import cache
+from pathmatch import compiler
+from pathmatch import fastpath
+from pathmatch import segment
+from pathmatch import syntax
 from pathmatch.pattern import Pattern
 
 RegexType = type(re.compile(u''))
 
 
+# `PathNormalizer` of the recent base paths of `normalize_path`
+_normalizers = {}  # type: typing.Dict[typing.Tuple[type, text_type], PathNormalizer]
+_MAX_NORMALIZERS = 64
+
+
 def normalize_path(path, base_path=u'/', is_dir=None):
     u"""
     Normalize a path to use it with a gitmatch pattern.
@@ -34,6 +45,8 @@ def normalize_path(path, base_path=u'/', is_dir=None):
     If a path is rooted (starts with a slash), it has to be a subdirectory of `base_path`. The
     path root is then changed to be based of `base_path`.
 
+    Use a `PathNormalizer` to normalize many paths against the same base path.
+
     :type path: text_type
     :param path: A POSIX path to normalize
     :type base_path: text_type
@@ -43,33 +56,111 @@ def normalize_path(path, base_path=u'/', is_dir=None):
                    `None`, keeps the current ending.
     :return:
     """
-    path = posixpath.normpath(path)
+    # The type distinguishes text and bytes base paths that compare equal on Python 2
+    key = (type(base_path), base_path)
+    normalizer = _normalizers.get(key)
+    if normalizer is None:
+        if len(_normalizers) >= _MAX_NORMALIZERS:
+            _normalizers.clear()
+        normalizer = _normalizers[key] = PathNormalizer(base_path)
+    return normalizer.normalize(path, is_dir)
 
-    base_path = posixpath.normpath(base_path)
 
-    if len(base_path) == 0:
-        raise ValueError(u'`project_root` cannot be an empty string after normalization')
-
-    if base_path[-1] != u'/':
-        base_path += u'/'
-
-    if path.startswith(base_path):
-        path = u'/' + posixpath.relpath(path, base_path)
-    elif path.startswith(u'/'):
-        raise ValueError(u'`path` ({}) is absolute but not inside base_path ({})'.format(path,
-                                                                                         base_path))
+class PathNormalizer(object):
+    u"""
+    Normalizes paths against a base path (see `normalize_path`), the base path is normalized
+    once. The paths without empty, `.` nor `..` components (the paths listed by a walker or
+    `git ls-files`) are not normalized again: `posixpath.normpath` is only called for the others.
+    """
 
-    if is_dir is None:
+    def __init__(self, base_path=u'/'):
+        u"""
+        :type base_path: text_type | binary_type
+        :param base_path: A POSIX path to the base directory, a bytes base path normalizes bytes
+                          paths
+        """
+        binary = isinstance(base_path, binary_type)
+        self._slash = b'/' if binary else u'/'
+        self._dot = b'.' if binary else u'.'
+        self._double_slash = b'//' if binary else u'//'
+        self._dot_slash = b'./' if binary else u'./'
+
+        base_path = posixpath.normpath(base_path)
+        if len(base_path) == 0:
+            raise ValueError(u'`project_root` cannot be an empty string after normalization')
+        if base_path[-1:] != self._slash:
+            base_path += self._slash
+        self.base_path = base_path
+
+    def normalize(self, path, is_dir=None):
+        u"""
+        Returns the normalized path, see `normalize_path`.
+
+        :type path: text_type | binary_type
+        :param path: A POSIX path to normalize
+        :type is_dir: bool | None
+        :param is_dir: If `true`, adds a trailing slash. If `false` removes any trailing slash. If
+                       `None`, keeps the ending of the normalized path (without trailing slash).
+        :rtype: text_type | binary_type
+        """
+        slash = self._slash
+        clean = len(path) > 1 and self._double_slash not in path \
+            and self._dot_slash not in path and path[-1:] != self._dot
+        if clean:
+            # `normpath` would only remove the trailing slash
+            if path[-1:] == slash:
+                path = path[:-1]
+        else:
+            path = posixpath.normpath(path)
+
+        base_path = self.base_path
+        if path.startswith(base_path):
+            if clean:
+                # Equivalent to `relpath`, the clean path is longer than the base path
+                path = slash + path[len(base_path):]
+            else:
+                path = slash + posixpath.relpath(path, base_path)
+        elif path[:1] == slash:
+            raise ValueError(u'`path` ({}) is absolute but not inside base_path ({})'.format(
+                path, base_path))
+
+        if is_dir is None:
+            return path
+        elif is_dir and path[-1:] != slash:
+            return path + slash
+        elif not is_dir and path[-1:] == slash:
+            return path[:-1]
         return path
-    elif is_dir and path[-1:] != u'/':
-        return path + u'/'
-    elif not is_dir and path[-1:] == u'/':
-        return path[:-1]
-
-    return path
 
+    def normalize_many(self, paths, is_dir=None):
+        u"""
+        Returns the normalized paths, see `normalize`.
 
-def match(pattern, text):
+        :type paths: typing.Iterable[text_type | binary_type]
+        :type is_dir: bool | None
+        :rtype: typing.List[text_type | binary_type]
+        """
+        normalize = self.normalize
+        if self.base_path[:1] != self._slash:
+            return [normalize(path, is_dir) for path in paths]
+
+        # With a rooted base path, the clean relative paths are returned as-is
+        slash = self._slash
+        dot = self._dot
+        double_slash = self._double_slash
+        dot_slash = self._dot_slash
+        normalized = []
+        append = normalized.append
+        for path in paths:
+            if path[:1] != slash and len(path) > 1 and path[-1:] != slash \
+                    and path[-1:] != dot and double_slash not in path and dot_slash not in path:
+                append(path if not is_dir else path + slash)
+            else:
+                append(normalize(path, is_dir))
+        return normalized
+
+
+def match(pattern, text, case_fold=False):
     u"""
     Matches `text` against the gitmatch pattern `pattern`.
 
@@ -77,14 +168,16 @@ def match(pattern, text):
     :param pattern: A gitmatch pattern
     :type text: text_type
     :param text: A text to match against this pattern
+    :type case_fold: bool
+    :param case_fold: Perform a case insensitive match (like git's `core.ignoreCase`)
     :rtype: bool
     :return: Result of the match
     """
-    return GitmatchPattern(pattern).match(text)
+    return _compile(pattern, case_fold).match(text)
 
 
 # noinspection PyShadowingBuiltins
-def filter(pattern, texts):
+def filter(pattern, texts, case_fold=False):
     u"""
     Returns a generator yielding the elements of `texts` matching the pattern.
 
@@ -92,47 +185,393 @@ def filter(pattern, texts):
     :param pattern: A gitmatch pattern
     :type texts: typing.Iterable[text_type]
     :param texts: An iterable collection of texts to match
+    :type case_fold: bool
+    :param case_fold: Perform a case insensitive match (like git's `core.ignoreCase`)
     :rtype: typing.Generator[text_type]
     :return: A generator of filtered elements.
     """
-    return GitmatchPattern(pattern).filter(texts)
+    return _compile(pattern, case_fold).filter(texts)
 
 
-def translate(pattern):
+def translate(pattern, case_fold=False):
     u"""
     Returns a compiled Python regular expression equivalent to this pattern.
 
     :type pattern: text_type
     :param pattern: A gitmatch pattern
+    :type case_fold: bool
+    :param case_fold: Perform a case insensitive match (like git's `core.ignoreCase`)
     :rtype: RegexType
     """
-    return GitmatchPattern(pattern).translate()
+    return _compile(pattern, case_fold).translate()
+
+
+def _compile(pattern, case_fold=False):
+    u"""
+    Returns the `GitmatchPattern` for the supplied pattern, using the shared cache.
+
+    :rtype: GitmatchPattern
+    """
+    # The type distinguishes text and bytes patterns that compare equal on Python 2
+    return cache.get((u'gitmatch', type(pattern), pattern, case_fold),
+                     lambda: GitmatchPattern(pattern, case_fold=case_fold))
+
+
+def _regex_source_from_nodes(nodes, trailing_slash, binary=False, case_fold=False):
+    u"""
+    Returns the arguments of `re.compile` for the regex of a parsed gitmatch pattern.
+
+    :type nodes: typing.Sequence[syntax.Node]
+    :param nodes: Nodes of the deep pattern, with a trailing `**` for the directory patterns
+    :type trailing_slash: bool
+    :param trailing_slash: The pattern ends with a slash
+    :type binary: bool
+    :type case_fold: bool
+    :rtype: typing.Tuple[text_type | binary_type, int]
+    """
+    if trailing_slash:
+        return compiler.regex_source_from_nodes(nodes, path_name=True, closed_regex=True,
+                                                binary=binary, case_fold=case_fold)
+    # The pattern also matches the content of the matched directories
+    regex_pattern = compiler.pattern_from_nodes(nodes, path_name=True, binary=binary,
+                                                case_fold=case_fold)
+    return compiler.regex_source(u'\\A' + regex_pattern + u'(?:\\/.*)?\\Z', binary=binary,
+                                 case_fold=case_fold)
+
+
+def _component_nodes(nodes, trailing_slash):
+    u"""
+    Returns the nodes matching a single path component for the slash-free unrooted patterns
+    (`**/name` or `**/name/**` with a trailing slash), `None` for the other patterns.
+
+    Such a pattern matches a path if it matches one of its components, excluding the last one
+    with a trailing slash (only the directories followed by a slash).
+
+    :type nodes: typing.Sequence[syntax.Node]
+    :param nodes: Nodes of the deep pattern, with a trailing `**` for the directory patterns
+    :type trailing_slash: bool
+    :rtype: typing.Tuple[syntax.Node, ...] | None
+    """
+    if len(nodes) < 2 or nodes[0] != syntax.WildStar(trailing=False):
+        return None
+    component_nodes = list(nodes[1:])
+    if trailing_slash:
+        if component_nodes[-1] != syntax.WildStar(trailing=True):
+            return None
+        component_nodes.pop()
+        last = component_nodes[-1] if len(component_nodes) > 0 else None
+        if not isinstance(last, syntax.Literal) or last.text[-1:] != u'/':
+            return None
+        if len(last.text) > 1:
+            component_nodes[-1] = syntax.Literal(last.text[:-1])
+        else:
+            component_nodes.pop()
+        if len(component_nodes) == 0:
+            return None
+    for node in component_nodes:
+        if isinstance(node, syntax.WildStar):
+            return None
+        if isinstance(node, syntax.Literal) and u'/' in node.text:
+            return None
+    return tuple(component_nodes)
+
+
+def _component_matcher(match_component, literal, binary, directories_only):
+    u"""
+    Returns the matcher of a slash-free pattern testing the components of a path: its basename,
+    then its parent directories.
+
+    Calling the component regex for each component costs more than a single deep regex: the
+    components are only tested if the path contains `literal`, required in any matched
+    component.
+
+    :type match_component: typing.Callable
+    :param match_component: The `match` method of the closed regex of a component
+    :type literal: text_type | binary_type
+    :param literal: A literal required in the matched components, empty if there is none
+    :type binary: bool
+    :type directories_only: bool
+    :param directories_only: Skip the basename (the pattern has a trailing slash)
+    :rtype: typing.Callable[[text_type | binary_type], bool]
+    """
+    separator = b'/' if binary else u'/'
+
+    def match(text):
+        if literal not in text:
+            return False
+        head, _, basename = text.rpartition(separator)
+        if not directories_only and match_component(basename) is not None:
+            return True
+        if literal not in head:
+            return False
+        return any(component is not None
+                   for component in lazy_map(match_component, reversed(head.split(separator))))
+
+    return match
 
 
 class GitmatchPattern(Pattern):
-    def __init__(self, pattern):
+    def __init__(self, pattern, case_fold=False, lazy=False, engine=compiler.ENGINE_REGEX):
         u"""
         Creates a new `gitmatch` pattern, useful when reusing a pattern many times since it
         compiles the pattern only once.
 
-        :type pattern: text_type
-        :param pattern: A gitmatch pattern
+        :type pattern: text_type | binary_type
+        :param pattern: A gitmatch pattern, a bytes pattern matches bytes paths
+        :type case_fold: bool
+        :param case_fold: Perform a case insensitive match (like git's `core.ignoreCase`)
+        :type lazy: bool
+        :param lazy: Defer the translation and compilation of the regex until it is needed, see
+                     `WildmatchPattern`
+        :type engine: text_type
+        :param engine: The engine used for the patterns without a fast path:
+                       `wildmatch.ENGINE_REGEX` (default) or `wildmatch.ENGINE_SEGMENT`
         :rtype: None
         """
+        if engine not in (compiler.ENGINE_REGEX, compiler.ENGINE_SEGMENT):
+            raise ValueError(u'Unsupported engine: {}'.format(repr(engine)))
         self.pattern = pattern
+        self.case_fold = case_fold
+        self.engine = engine
+        text_pattern, self.binary = compiler.decode_pattern(pattern)
 
         # Non-rooted pattern performs a deep match
-        if pattern[:1] != u'/':
-            pattern = u'**/' + pattern
-
-        # Trailing slash semantics
-        if pattern[-1:] == u'/':
-            regex = wildmatch.translate(pattern + u'**', closed_regex=True)
+        if text_pattern[:1] != u'/':
+            text_pattern = u'**/' + text_pattern
+
+        # The pattern is parsed once for all the backends
+        trailing_slash = text_pattern[-1:] == u'/'
+        if trailing_slash:  # Trailing slash semantics
+            nodes = syntax.parse(text_pattern + u'**')
+            fast_path = compiler.fast_path_from_nodes(nodes, path_name=True)
         else:
-            regex = wildmatch.translate(pattern, closed_regex=False)
-            regex = re.compile(u'\\A' + regex.pattern + u'(?:\\/.*)?\\Z', regex.flags)
+            nodes = syntax.parse(text_pattern)
+            fast_path = compiler.fast_path_from_nodes(nodes, path_name=True, dir_suffix=True)
+        syntax.validate(nodes)  # The lazy patterns are not translated yet
+
+        literals = compiler.required_literals_from_nodes(nodes)
+        if self.binary:
+            literals = compiler.encode_literals(literals)
+            fast_path = compiler.encode_fast_path(fast_path)
+        self._init_compiled(nodes, None, fast_path, literals)
+        if not lazy:
+            self._compile()
+
+    def _init_compiled(self, nodes, regex_source, fast_path, literals, regex=None):
+        u"""
+        Initializes the attributes derived from the parsed pattern, see
+        `WildmatchPattern._init_compiled`.
+
+        :type nodes: typing.Tuple[syntax.Node, ...]
+        :type regex_source: typing.Tuple[text_type | binary_type, int] | None
+        :type fast_path: fastpath.FastPath | None
+        :type literals: typing.Tuple[text_type, ...]
+        :type regex: RegexType | None
+        :rtype: None
+        """
+        self._nodes = nodes
+        self._regex_source = regex_source
+        self._regex = regex
+        # The literals and fast paths are case sensitive
+        self.literals = literals if not self.case_fold else ()
+        self._fast_path = fast_path  # Also used by the case insensitive matcher
+        self.fast_path = fast_path if not self.case_fold else None
+        self._segment_matcher = None  # Built on first use, see `_get_segment_matcher`
+        self._component_nodes = None
+        self._component_matcher = None  # Built on first use, see `_compile_component_matcher`
+        if fast_path is None and self.engine == compiler.ENGINE_REGEX:
+            self._component_nodes = _component_nodes(nodes, self._trailing_slash())
+        if self._component_nodes is not None:
+            # Slash-free pattern: its components are matched without the deep regex
+            self._match = self._compile_component_and_match
+            return
+        # Regex-free matcher for the common pattern shapes
+        self._match = compiler.compile_matcher(nodes, lambda: self.regex, fast_path,
+                                               path_name=True, case_fold=self.case_fold,
+                                               binary=self.binary, engine=self.engine,
+                                               lazy=regex is None,
+                                               get_segment_matcher=self._get_segment_matcher)
+        if self._match is None:
+            self._match = self._compile_and_match
+
+    def _compile(self):
+        u"""
+        Compiles the matcher of a pattern created with `lazy=False`. The slash-free patterns only
+        compile their component matcher: their full regex is compiled if `regex` is used.
+
+        :rtype: None
+        """
+        if self._component_nodes is None:
+            self._regex = re.compile(*self._get_regex_source())
+        self._get_matcher()
+
+    def _compile_and_match(self, text):
+        u"""
+        Compiles the regex of a lazy pattern on its first match, see
+        `WildmatchPattern._compile_and_match`.
+
+        :type text: text_type
+        :rtype: bool
+        """
+        self._match = fastpath.regex_matcher(self.regex)
+        return self._match(text)
+
+    def _compile_component_and_match(self, text):
+        u"""
+        Compiles the component matcher of a slash-free pattern on its first match.
+
+        :type text: text_type
+        :rtype: bool
+        """
+        self._match = self._compile_component_matcher()
+        return self._match(text)
+
+    def _compile_component_matcher(self):
+        u"""
+        Returns the component matcher of a slash-free pattern, compiled on first use.
+
+        :rtype: typing.Callable[[text_type], bool]
+        """
+        if self._component_matcher is not None:
+            return self._component_matcher
+        regex = re.compile(*compiler.regex_source_from_nodes(
+            self._component_nodes, path_name=True, closed_regex=True, binary=self.binary,
+            case_fold=self.case_fold))
+        literals = () if self.case_fold else \
+            compiler.required_literals_from_nodes(self._component_nodes)
+        literal = max(literals, key=len) if len(literals) > 0 else u''
+        if self.binary:
+            literal = compiler.encode_literals((literal,))[0]
+        self._component_matcher = _component_matcher(regex.match, literal, self.binary,
+                                                     self._trailing_slash())
+        return self._component_matcher
+
+    def _get_matcher(self):
+        u"""
+        Returns the matcher of this pattern, compiling a lazy pattern now rather than on its
+        first match, see `WildmatchPattern._get_matcher`.
+
+        :rtype: typing.Callable[[text_type], bool]
+        """
+        if self._match == self._compile_component_and_match:
+            self._match = self._compile_component_matcher()
+        elif self._match == self._compile_and_match:
+            self._match = fastpath.regex_matcher(self.regex)
+        return self._match
+
+    @property
+    def regex(self):
+        u"""
+        Closed regex equivalent to this pattern.
+
+        :rtype: RegexType
+        """
+        if self._regex is None:
+            self._regex = re.compile(*self._get_regex_source())
+        return self._regex
+
+    def is_compiled(self):
+        u"""
+        Tests if the regex of this pattern is compiled, see `WildmatchPattern.is_compiled`. The
+        slash-free patterns are compiled once their component matcher is.
+
+        :rtype: bool
+        """
+        return self._regex is not None or self._component_matcher is not None
+
+    def _get_regex_source(self):
+        u"""
+        Returns the source and flags of the closed regex, translated on first use.
+
+        :rtype: typing.Tuple[text_type | binary_type, int]
+        """
+        if self._regex_source is None:
+            self._regex_source = _regex_source_from_nodes(self._nodes, self._trailing_slash(),
+                                                          binary=self.binary,
+                                                          case_fold=self.case_fold)
+        return self._regex_source
+
+    def _get_segment_matcher(self):
+        u"""
+        Returns the matcher of the segment engine, built on first use.
+
+        :rtype: segment.SegmentMatcher
+        """
+        if self._segment_matcher is None:
+            # Without trailing slash, the pattern also matches the content of the directories
+            program = compiler.segment_program_from_nodes(
+                self._nodes, case_fold=self.case_fold, binary=self.binary,
+                dir_suffix=not self._trailing_slash())
+            self._segment_matcher = segment.SegmentMatcher(program, binary=self.binary)
+        return self._segment_matcher
+
+    def _trailing_slash(self):
+        u"""
+        Tests if this pattern ends with a slash: it only matches directories.
+
+        :rtype: bool
+        """
+        return self.pattern[-1:] == (b'/' if self.binary else u'/')
+
+    def __getstate__(self):
+        u"""
+        Returns the compiled state of this pattern, see `WildmatchPattern.__getstate__`.
+
+        :rtype: tuple
+        """
+        fast_path = tuple(self._fast_path) if self._fast_path is not None else None
+        regex_pattern, regex_flags = self._get_regex_source()
+        return (self.pattern, self.case_fold, self.engine, syntax.dump(self._nodes),
+                regex_pattern, regex_flags, fast_path, self.literals)
+
+    def __setstate__(self, state):
+        u"""
+        Restores a pattern from `__getstate__` without parsing nor translating it. The regex is
+        compiled on first use.
+
+        :type state: tuple
+        :rtype: None
+        """
+        pattern, case_fold, engine, nodes, regex_pattern, regex_flags, fast_path, literals = state
+        self.pattern = pattern
+        self.case_fold = case_fold
+        self.engine = engine
+        self.binary = isinstance(pattern, binary_type)
+        self._init_compiled(syntax.load(nodes), (regex_pattern, regex_flags),
+                            fastpath.FastPath(*fast_path) if fast_path is not None else None,
+                            tuple(literals))
+
+    def match_many(self, texts):
+        u"""
+        Matches every element of `texts` against this pattern. The fast paths are vectorized for
+        NumPy string arrays.
+
+        :type texts: typing.Sequence[text_type]
+        :param texts: A sized collection of texts to match
+        :rtype: numpy.ndarray | bytearray
+        :return: A boolean mask (see `Pattern.match_many`)
+        """
+        return batch.match_many(self._get_matcher(), texts, self.fast_path)
+
+    def filter(self, texts):
+        u"""
+        Returns a generator yielding the elements of `texts` matching this pattern.
+
+        :type texts: typing.Iterable[text_type]
+        :param texts: An iterable collection of texts to match
+        :rtype: typing.Iterable[text_type]
+        :return: A generator of filtered elements.
+        """
+        match_ = self._get_matcher()
+        return (text for text in texts if match_(text))
 
-        self.regex = regex
+    def required_literals(self):
+        u"""
+        Returns the literal substrings occurring in every text matched by this pattern.
+
+        :rtype: typing.Tuple[text_type, ...]
+        """
+        return self.literals
 
     def translate(self):
         u"""
@@ -151,6 +590,53 @@ class GitmatchPattern(Pattern):
         :rtype: bool
         :return: Result of the match
         """
-        return self.regex.match(text) is not None
+        return self._match(text)
 
     __call__ = match
+
+    def may_match_under(self, dir_path):
+        u"""
+        Tests if a path inside the directory `dir_path` may match this pattern. The content of
+        the matched directories is matched: `node_modules/` matches everything under
+        `a/node_modules`.
+
+        :type dir_path: text_type
+        :param dir_path: Path of a directory, with or without trailing slash
+        :rtype: bool
+        """
+        segments = segment.directory_segments(dir_path, self.binary)
+        return self._get_segment_matcher().may_match_under(segments)
+
+    def matches_all_under(self, dir_path):
+        u"""
+        Tests if every path inside the directory `dir_path` matches this pattern, see
+        `may_match_under`.
+
+        :type dir_path: text_type
+        :param dir_path: Path of a directory, with or without trailing slash
+        :rtype: bool
+        """
+        segments = segment.directory_segments(dir_path, self.binary)
+        return self._get_segment_matcher().matches_all_under(segments)
+
+    def subtree_matcher(self):
+        u"""
+        Returns the segment matcher of this pattern (see `Pattern.subtree_matcher`).
+
+        :rtype: segment.SegmentMatcher
+        """
+        return self._get_segment_matcher()
+
+    def match_segments(self, segments):
+        u"""
+        Matches a path already split on its slashes, see `WildmatchPattern.match_segments`.
+
+        :type segments: typing.Sequence[text_type]
+        :param segments: Components of the path, for example `['src', 'main.py']` for
+                         `src/main.py`
+        :rtype: bool
+        :return: Result of the match
+        """
+        if self.engine == compiler.ENGINE_SEGMENT:
+            return self._get_segment_matcher().match_segments(segments)
+        return self._match((b'/' if self.binary else u'/').join(segments))
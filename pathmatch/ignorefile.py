@@ -0,0 +1,164 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes the loading of ignore files (`.gitignore`, `.git/info/exclude`) as path spec
+lists.
+
+The rules follow the syntax of git: a line starting with `#` is a comment, a leading `!` negates
+the rule, a leading backslash escapes a `#` or `!` (`\\#main.py`), the trailing spaces are
+ignored unless escaped with a backslash. The last matching rule wins.
+
+    pathspecs = ignorefile.load([u'.git/info/exclude', u'.gitignore'])
+    pathspecs.match(u'build/main.o')
+
+The patterns are lazy (see `GitmatchPattern`): loading large generated ignore files only parses
+the rules, each regex is compiled when a path first needs it.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+from collections import namedtuple
+# noinspection PyCompatibility
+import typing
+
+from six import binary_type, text_type
+
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.pathspec import Pathspec, PathspecList
+
+Rule = namedtuple(u'Rule', [u'pattern', u'negated', u'line_number'])
+
+_BOM = u'\ufeff'  # Skipped at the start of the files, as git does
+_BINARY_BOM = _BOM.encode(u'utf-8')
+
+
+def iter_rules(data):
+    u"""
+    Yields the rules of an ignore file, skipping the comments and the blank lines.
+
+    :type data: text_type | binary_type
+    :param data: The content of the ignore file, bytes content yields bytes patterns
+    :rtype: typing.Iterator[Rule]
+    :return: The rules, with the pattern stripped of the negation and of the trailing spaces
+    """
+    if isinstance(data, binary_type):
+        bom, newline, carriage_return, space, backslash = _BINARY_BOM, b'\n', b'\r', b' ', b'\\'
+        comment, negation = b'#', b'!'
+    else:
+        bom, newline, carriage_return, space, backslash = _BOM, u'\n', u'\r', u' ', u'\\'
+        comment, negation = u'#', u'!'
+    if data.startswith(bom):
+        data = data[len(bom):]
+
+    for line_number, line in enumerate(data.split(newline), 1):
+        if line[-1:] == carriage_return:
+            line = line[:-1]
+        if line[:1] == comment:
+            continue
+        pattern = line.rstrip(space)
+        if len(pattern) < len(line) and pattern[-1:] == backslash:
+            # An odd number of backslashes escapes the first trailing space
+            backslashes = len(pattern) - len(pattern.rstrip(backslash))
+            if backslashes % 2 == 1:
+                pattern += space
+        if len(pattern) == 0:
+            continue
+        if pattern[:1] == negation:
+            yield Rule(pattern[1:], True, line_number)
+        else:
+            yield Rule(pattern, False, line_number)
+
+
+def parse_pathspecs(data, case_fold=False, patterns=None, source=None):
+    u"""
+    Returns the path specs of the rules of an ignore file, in a single pass over its lines.
+
+    Identical patterns share a single `GitmatchPattern`. A rule repeated with the same negation
+    shadows its previous occurrences: only the last one is kept. The rules are validated when
+    they are loaded: an invalid rule raises `ValueError` with its file name and line number,
+    matching the paths never raises.
+
+    :type data: text_type | binary_type
+    :param data: The content of the ignore file, bytes content yields bytes patterns
+    :type case_fold: bool
+    :param case_fold: Perform case insensitive matches (like git's `core.ignoreCase`)
+    :type patterns: typing.Dict[text_type | binary_type, GitmatchPattern] | None
+    :param patterns: The patterns already compiled with the same `case_fold`, by source. Pass
+                     the same dictionary to share the patterns of several files.
+    :type source: text_type | None
+    :param source: Name of the ignore file in the error messages
+    :rtype: typing.List[Pathspec]
+    """
+    if patterns is None:
+        patterns = {}
+    pathspecs = []  # type: typing.List[Pathspec | None]
+    last_indexes = {}  # Index of the last path spec of each rule
+    shadowed = False
+    for rule in iter_rules(data):
+        pattern = patterns.get(rule.pattern)
+        if pattern is None:
+            try:
+                pattern = GitmatchPattern(rule.pattern, case_fold=case_fold, lazy=True)
+            except ValueError as error:
+                raise ValueError(u'{}:{}: {}'.format(source or u'<rules>', rule.line_number,
+                                                     error))
+            patterns[rule.pattern] = pattern
+        key = (rule.pattern, rule.negated)
+        last_index = last_indexes.get(key)
+        if last_index is not None:
+            pathspecs[last_index] = None
+            shadowed = True
+        last_indexes[key] = len(pathspecs)
+        pathspecs.append(Pathspec(pattern, rule.negated))
+    if shadowed:
+        pathspecs = [spec for spec in pathspecs if spec is not None]
+    return pathspecs
+
+
+def parse(data, case_fold=False, prefilter=False):
+    u"""
+    Returns the path spec list of the content of an ignore file, see `parse_pathspecs`.
+
+    :type data: text_type | binary_type
+    :param data: The content of the ignore file, bytes content yields bytes patterns
+    :type case_fold: bool
+    :param case_fold: Perform case insensitive matches (like git's `core.ignoreCase`)
+    :type prefilter: bool
+    :param prefilter: Index the required literals of the rules, see `PathspecList`
+    :rtype: PathspecList
+    """
+    return PathspecList(parse_pathspecs(data, case_fold=case_fold), prefilter=prefilter)
+
+
+def load(file_paths, case_fold=False, prefilter=False, binary=False):
+    u"""
+    Returns the path spec list of the rules of one or several ignore files. The rules of the
+    last files take precedence: git reads `.git/info/exclude` before `.gitignore`.
+
+    :type file_paths: text_type | typing.Iterable[text_type]
+    :param file_paths: The path of an ignore file, or the paths of several ignore files
+    :type case_fold: bool
+    :param case_fold: Perform case insensitive matches (like git's `core.ignoreCase`)
+    :type prefilter: bool
+    :param prefilter: Index the required literals of the rules, see `PathspecList`
+    :type binary: bool
+    :param binary: Load bytes patterns, matching bytes paths. Otherwise the files are decoded
+                   as UTF-8.
+    :rtype: PathspecList
+    """
+    if isinstance(file_paths, (text_type, binary_type)):
+        file_paths = [file_paths]
+    patterns = {}
+    pathspecs = []
+    for file_path in file_paths:
+        with open(file_path, u'rb') as ignore_file:
+            data = ignore_file.read()
+        if not binary:
+            data = data.decode(u'utf-8')
+        pathspecs.extend(parse_pathspecs(data, case_fold=case_fold, patterns=patterns,
+                                         source=file_path))
+    return PathspecList(pathspecs, prefilter=prefilter)
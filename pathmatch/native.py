@@ -0,0 +1,245 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes a native (regex-free) wildmatch engine that never backtracks.
+
+The patterns translated to Python regular expressions can trigger exponential backtracking: for
+example `*a*a*a*a*b` becomes `[^/]*a[^/]*a[^/]*a[^/]*a[^/]*b`. This engine simulates a
+non-deterministic finite automaton instead, tracking the set of active states as a bit mask: each
+character of the text is processed once, for a guaranteed `O(len(pattern) * len(text))` runtime.
+
+The program matched by the engine is a list of instructions, built by `wildmatch` from a parsed
+pattern (see `WildmatchPattern` and its `engine` option).
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+from bisect import bisect_left
+import re
+# noinspection PyCompatibility
+import typing
+
+from six import binary_type, text_type
+
+from pathmatch import charclass
+
+
+# Instructions, the equivalent regex is given for each instruction.
+CHAR = u'char'  # `c`, single literal character (argument: the character)
+ANY = u'any'  # `[^/]` or `.` (argument: path_name)
+SET = u'set'  # `[...]`, bracket expression (argument: a `CharSet`)
+STAR = u'star'  # `[^/]*` or `.*` (argument: path_name)
+DEEP = u'deep'  # `(?:.*\/)?`, leading or inner wild star (no argument)
+
+_SLASH = u'/'
+_BINARY_ENCODING = u'latin-1'
+
+# States of the automaton, `DEEP` instructions use two states: an entry state that only has
+# epsilon transitions and a loop state.
+_STATE_CHAR = 0
+_STATE_ANY = 1
+_STATE_SET = 2
+_STATE_STAR = 3
+_STATE_DEEP_ENTRY = 4
+_STATE_DEEP_LOOP = 5
+_STATE_ACCEPT = 6
+
+
+class CharSet(object):
+    def __init__(self, matching, single_chars, ranges, multi_chars, case_fold=False):
+        u"""
+        The set of characters (and multi-character collating elements) matched by a bracket
+        expression.
+
+        :type matching: bool
+        :param matching: `False` for a negated bracket expression
+        :type single_chars: typing.Iterable[text_type]
+        :param single_chars: Characters in the set
+        :type ranges: typing.Iterable[typing.Tuple[text_type, text_type]]
+        :param ranges: Inclusive character ranges in the set
+        :type multi_chars: typing.Iterable[text_type]
+        :param multi_chars: Multi-character collating elements in the set (only for matching sets)
+        :type case_fold: bool
+        :param case_fold: Match the characters as a Python regex with the `re.IGNORECASE` flag,
+                          for the text patterns: the Unicode case folding of `re` (`K` and the
+                          Kelvin sign, `s` and the long s...) is not derived from `lower` and
+                          `upper`. The result of each character is cached.
+        :rtype: None
+        """
+        self.matching = matching
+        self.single_chars = frozenset(single_chars)
+        # Disjoint ranges, searched by bisection: character classes have hundreds of ranges
+        self.ranges = charclass.merge_ranges(ranges)
+        self._range_ends = tuple(end for start, end in self.ranges)
+        self.multi_chars = tuple(sorted(multi_chars))
+        if not matching and len(self.multi_chars) > 0:
+            raise ValueError(u'Cannot perform negative match on bracket expression containing '
+                             u'multi-character collating elements')
+        self._fold_match = None
+        self._multi_char_matches = ()
+        if case_fold:
+            flags = re.IGNORECASE | re.UNICODE
+            self._fold_match = re.compile(self._regex_source(), flags).match
+            self._folded = {}  # Cached results of `_fold_match`, by character
+            self._multi_char_matches = tuple(re.compile(re.escape(sequence), flags).match
+                                             for sequence in self.multi_chars)
+
+    def _regex_source(self):
+        u"""
+        Returns the source of a regex matching a single character of this set.
+
+        :rtype: text_type
+        """
+        items = [re.escape(char) for char in sorted(self.single_chars)]
+        items.extend(u'{}-{}'.format(re.escape(start), re.escape(end))
+                     for start, end in self.ranges)
+        if len(items) == 0:
+            return u'(?!)' if self.matching else u'(?s).'
+        return u'[{}{}]'.format(u'' if self.matching else u'^', u''.join(items))
+
+    def contains(self, char):
+        u"""
+        Tests if a single character is in this set.
+
+        :type char: text_type
+        :rtype: bool
+        """
+        if self._fold_match is not None:
+            result = self._folded.get(char)
+            if result is None:
+                result = self._folded[char] = self._fold_match(char) is not None
+            return result
+        if char in self.single_chars:
+            return self.matching
+        index = bisect_left(self._range_ends, char)
+        if index < len(self.ranges) and self.ranges[index][0] <= char:
+            return self.matching
+        return not self.matching
+
+    def multi_char_ends(self, text, index):
+        u"""
+        Returns the end indexes of the multi-character collating elements of this set found at
+        the index `index` of `text`.
+
+        :type text: text_type
+        :type index: int
+        :rtype: typing.List[int]
+        """
+        if len(self._multi_char_matches) > 0:
+            return [index + len(sequence)
+                    for sequence, match in zip(self.multi_chars, self._multi_char_matches)
+                    if match(text, index) is not None]
+        return [index + len(sequence) for sequence in self.multi_chars
+                if text.startswith(sequence, index)]
+
+
+class NativeMatcher(object):
+    def __init__(self, program, binary=False):
+        u"""
+        Compiles a program to a non-deterministic finite automaton.
+
+        :type program: typing.Sequence[typing.Tuple[text_type, typing.Any]]
+        :param program: A list of `(instruction, argument)` pairs
+        :type binary: bool
+        :param binary: Match bytes texts, the program is built from the latin-1 decoding of a
+                       bytes pattern.
+        :rtype: None
+        """
+        self.binary = binary
+        kinds = []
+        args = []
+        for instruction, arg in program:
+            if instruction == CHAR:
+                kinds.append(_STATE_CHAR)
+            elif instruction == ANY:
+                kinds.append(_STATE_ANY)
+            elif instruction == SET:
+                kinds.append(_STATE_SET)
+            elif instruction == STAR:
+                kinds.append(_STATE_STAR)
+            elif instruction == DEEP:
+                kinds.append(_STATE_DEEP_ENTRY)
+                args.append(None)
+                kinds.append(_STATE_DEEP_LOOP)
+            else:
+                raise ValueError(u'Unknown instruction: {}'.format(repr(instruction)))
+            args.append(arg)
+        kinds.append(_STATE_ACCEPT)
+        args.append(None)
+
+        self._kinds = tuple(kinds)
+        self._args = tuple(args)
+        # Epsilon closures of each state, as bit masks
+        self._closures = tuple(self._closure(state) for state in range(len(kinds)))
+        self._start = self._closures[0]
+        self._accept = 1 << (len(kinds) - 1)
+
+    def _closure(self, state):
+        kind = self._kinds[state]
+        if kind == _STATE_STAR:
+            return (1 << state) | self._closure(state + 1)
+        elif kind == _STATE_DEEP_ENTRY:
+            # The entry state does not consume characters: it is not part of its closure
+            return self._closure(state + 1) | self._closure(state + 2)
+        return 1 << state
+
+    def match(self, text):
+        u"""
+        Matches a whole text against this automaton.
+
+        :type text: text_type | binary_type
+        :rtype: bool
+        """
+        if self.binary:
+            text = text.decode(_BINARY_ENCODING)
+        kinds = self._kinds
+        args = self._args
+        closures = self._closures
+
+        current = self._start
+        pending = {}  # Text index to states reached after a multi-character collating element
+        for index, char in enumerate(text):
+            if len(pending) > 0:
+                current |= pending.pop(index, 0)
+            if current == 0:
+                if len(pending) == 0:
+                    return False
+                continue
+            following = 0
+            states = current
+            while states:
+                lowest = states & -states
+                states ^= lowest
+                state = lowest.bit_length() - 1
+                kind = kinds[state]
+                if kind == _STATE_CHAR:
+                    if char == args[state]:
+                        following |= closures[state + 1]
+                elif kind == _STATE_ANY:
+                    if char != _SLASH or not args[state]:
+                        following |= closures[state + 1]
+                elif kind == _STATE_STAR:
+                    if char != _SLASH or not args[state]:
+                        following |= closures[state]
+                elif kind == _STATE_DEEP_LOOP:
+                    following |= lowest
+                    if char == _SLASH:
+                        following |= closures[state + 1]
+                elif kind == _STATE_SET:
+                    char_set = args[state]
+                    if char_set.contains(char):
+                        following |= closures[state + 1]
+                    if char_set.multi_chars:
+                        for end in char_set.multi_char_ends(text, index):
+                            pending[end] = pending.get(end, 0) | closures[state + 1]
+            current = following
+
+        if len(pending) > 0:
+            current |= pending.pop(len(text), 0)
+        return (current & self._accept) != 0
+
+    __call__ = match
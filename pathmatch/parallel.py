@@ -0,0 +1,268 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes the parallel filtering of large path lists, see `PathspecList.parallel_filter`.
+
+The paths are split in chunks matched by a pool of workers, the results are yielded in the order
+of the input. A process pool receives the compiled rules with the first chunks of each worker, in
+the compact form of `diskcache.dumps`: only the chunks of paths and the resulting masks are
+transferred afterwards.
+On free-threaded Python builds (without global interpreter lock), a thread pool shares the rules
+without serializing them.
+
+The default chunk size adapts to the cost of the rules: each chunk should take a few tens of
+milliseconds to match, long enough to amortize its transfer and short enough to balance the
+workers.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+import collections
+import hashlib
+import itertools
+import multiprocessing
+import os
+import pickle
+import sys
+import time
+# noinspection PyCompatibility
+import typing
+
+from six import text_type
+
+from pathmatch import diskcache
+
+try:
+    from concurrent import futures
+except ImportError:  # pragma: no cover
+    futures = None  # Python 2 without the `futures` backport (`pip install pathmatch[parallel]`)
+
+
+# Kinds of executors created by `parallel_filter`
+EXECUTOR_PROCESS = u'process'
+EXECUTOR_THREAD = u'thread'
+
+_MIN_CHUNK_SIZE = 256
+_MAX_CHUNK_SIZE = 65536
+_TARGET_CHUNK_TIME = 0.05  # Seconds
+
+_MARSHAL = u'marshal'
+_PICKLE = u'pickle'
+
+# Key and path spec list last loaded by the current worker process
+_worker_rules = (None, None)  # type: typing.Tuple[typing.Optional[text_type], typing.Any]
+
+
+def parallel_filter(pathspecs, paths, executor=None, workers=None, chunk_size=None):
+    u"""
+    Returns a generator yielding the elements of `paths` matched by `pathspecs`, in order.
+
+    :type pathspecs: pathmatch.pathspec.PathspecList
+    :type paths: typing.Iterable[text_type]
+    :param paths: The paths to filter, consumed one chunk at a time
+    :type executor: text_type | concurrent.futures.Executor | None
+    :param executor: `EXECUTOR_PROCESS` or `EXECUTOR_THREAD` to create a pool for this call, or
+                     an existing executor. By default, a thread pool on free-threaded builds and
+                     a process pool otherwise. The rules are sent to an existing process pool with
+                     each chunk: they are only loaded once per worker but transferred each time.
+    :type workers: int | None
+    :param workers: Number of workers of the created pool, the number of CPUs by default
+    :type chunk_size: int | None
+    :param chunk_size: Number of paths per chunk, adapted to the cost of the rules by default
+    :rtype: typing.Generator[text_type]
+    :return: A generator of the matched paths
+    """
+    if futures is None:  # pragma: no cover
+        raise ImportError(u'`parallel_filter` requires `concurrent.futures` (Python 3.2+) or the '
+                          u'`futures` package')
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError(u'`chunk_size` must be positive: {}'.format(chunk_size))
+    if executor is None:
+        executor = EXECUTOR_PROCESS if _gil_enabled() else EXECUTOR_THREAD
+    if isinstance(executor, text_type):
+        if executor not in (EXECUTOR_PROCESS, EXECUTOR_THREAD):
+            raise ValueError(u'Unknown executor: {}'.format(repr(executor)))
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        return _ParallelFilter(pathspecs, executor == EXECUTOR_PROCESS, None, workers,
+                               chunk_size).run(paths)
+    if workers is None:
+        workers = getattr(executor, u'_max_workers', None) or multiprocessing.cpu_count()
+    processes = not isinstance(executor, futures.ThreadPoolExecutor)
+    return _ParallelFilter(pathspecs, processes, executor, workers, chunk_size).run(paths)
+
+
+def _gil_enabled():
+    u"""
+    Tests if the global interpreter lock is enabled: threads do not match paths in parallel.
+
+    :rtype: bool
+    """
+    is_gil_enabled = getattr(sys, u'_is_gil_enabled', None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+class _ParallelFilter(object):
+    def __init__(self, pathspecs, processes, executor, workers, chunk_size):
+        u"""
+        :type pathspecs: pathmatch.pathspec.PathspecList
+        :type processes: bool
+        :param processes: The workers are processes, the rules must be serialized
+        :type executor: concurrent.futures.Executor | None
+        :param executor: An existing executor, `None` to create a pool
+        :type workers: int
+        :type chunk_size: int | None
+        :rtype: None
+        """
+        self.pathspecs = pathspecs
+        self.processes = processes
+        self.executor = executor
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    def run(self, paths):
+        u"""
+        Matches the chunks of `paths` and yields the matched paths in order. At most two chunks
+        per worker are submitted ahead of the consumer.
+
+        :type paths: typing.Iterable[text_type]
+        :rtype: typing.Generator[text_type]
+        """
+        executor = self.executor
+        key = data = None
+        if self.processes:
+            data = _dumps(self.pathspecs)
+            key = text_type(hashlib.sha1(data[1]).hexdigest())
+        if executor is None:
+            if self.processes:
+                executor = futures.ProcessPoolExecutor(self.workers)
+            else:
+                executor = futures.ThreadPoolExecutor(self.workers)
+        # Worker processes of the created pool which loaded the rules: the rules are sent with
+        # each chunk until all of them did. An existing pool may replace its workers.
+        loaded = set()
+
+        size = _MIN_CHUNK_SIZE if self.chunk_size is None else self.chunk_size
+        iterator = iter(paths)
+        window = collections.deque()  # Submitted chunks with their future, in order
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(window) < 2 * self.workers:
+                    chunk = list(itertools.islice(iterator, size))
+                    if len(chunk) == 0:
+                        exhausted = True
+                        break
+                    if self.processes:
+                        sent = data
+                        if self.executor is None and len(loaded) >= self.workers:
+                            sent = None
+                        future = executor.submit(_match_chunk, key, sent, chunk)
+                    else:
+                        future = executor.submit(_match_local_chunk, self.pathspecs.match, chunk)
+                    window.append((chunk, future))
+                if len(window) == 0:
+                    break
+                chunk, future = window.popleft()
+                if self.processes:
+                    mask, elapsed, worker = future.result()
+                    loaded.add(worker)
+                else:
+                    mask, elapsed = future.result()
+                if self.chunk_size is None:
+                    size = _next_chunk_size(size, len(chunk), elapsed)
+                for path, matched in zip(chunk, mask):
+                    if matched:
+                        yield path
+        finally:
+            for _, future in window:
+                future.cancel()
+            if self.executor is None:
+                executor.shutdown(wait=True)
+
+
+def _next_chunk_size(size, count, elapsed):
+    u"""
+    Returns the size of the next chunks from the time spent matching a chunk of `count` paths:
+    chunks of `_TARGET_CHUNK_TIME`, growing at most four times at each step.
+
+    :type size: int
+    :type count: int
+    :type elapsed: float
+    :rtype: int
+    """
+    if elapsed <= 0:
+        target = 4 * size
+    else:
+        target = int(count * _TARGET_CHUNK_TIME / elapsed)
+    return max(_MIN_CHUNK_SIZE, min(_MAX_CHUNK_SIZE, 4 * size, target))
+
+
+def _dumps(pathspecs):
+    u"""
+    Serializes a path spec list for the worker processes, with `diskcache.dumps` if its patterns
+    support it and `pickle` otherwise.
+
+    :type pathspecs: pathmatch.pathspec.PathspecList
+    :rtype: typing.Tuple[text_type, bytes]
+    """
+    try:
+        return _MARSHAL, diskcache.dumps(pathspecs)
+    except TypeError:  # Other pattern types
+        return _PICKLE, pickle.dumps(pathspecs, pickle.HIGHEST_PROTOCOL)
+
+
+def _load_rules(key, data):
+    u"""
+    Returns the path spec list serialized by `_dumps`, loaded once in the current worker process.
+    Only the last list is kept: a long-lived pool may filter with many successive rules.
+
+    :type key: text_type
+    :type data: typing.Tuple[text_type, bytes] | None
+    :param data: The serialized rules, `None` if they were loaded with a previous chunk
+    :rtype: pathmatch.pathspec.PathspecList
+    """
+    global _worker_rules
+    loaded_key, pathspecs = _worker_rules
+    if loaded_key != key:
+        serialization, serialized = data
+        if serialization == _MARSHAL:
+            pathspecs = diskcache.loads(serialized)
+        else:
+            pathspecs = pickle.loads(serialized)
+        _worker_rules = key, pathspecs
+    return pathspecs
+
+
+def _match_chunk(key, data, chunk):
+    u"""
+    Matches a chunk of paths in a worker process.
+
+    :type key: text_type
+    :type data: typing.Tuple[text_type, bytes] | None
+    :param data: The serialized rules, `None` if they were loaded with a previous chunk
+    :type chunk: typing.List[text_type]
+    :rtype: typing.Tuple[bytearray, float, int]
+    :return: The mask of the matched paths, the time spent matching them and the process ID of
+             the worker
+    """
+    mask, elapsed = _match_local_chunk(_load_rules(key, data).match, chunk)
+    return mask, elapsed, os.getpid()
+
+
+def _match_local_chunk(match, chunk):
+    u"""
+    Matches a chunk of paths.
+
+    :type match: typing.Callable[[text_type], bool]
+    :type chunk: typing.List[text_type]
+    :rtype: typing.Tuple[bytearray, float]
+    :return: The mask of the matched paths and the time spent matching them
+    """
+    start = time.time()
+    mask = bytearray(match(path) for path in chunk)
+    return mask, time.time() - start
@@ -14,9 +14,18 @@ from __future__ import with_statement
 # noinspection PyCompatibility
 import typing
 
-from six import text_type
+from six import binary_type, text_type
 
+from pathmatch import batch
+from pathmatch import segment
 from pathmatch.pattern import Pattern
+from pathmatch.prefilter import LiteralPrefilter
+
+
+# Verdicts of `PathspecList.subtree_verdict`
+INCLUDED = u'included'  # Every path inside the directory is matched
+EXCLUDED = u'excluded'  # No path inside the directory is matched
+UNDECIDED = u'undecided'  # Each path must be matched
 
 
 ####################################################################################################
@@ -56,12 +65,57 @@ class Pathspec(object):
 
 
 class PathspecList(object):
-    def __init__(self, pathspecs):
+    def __init__(self, pathspecs, prefilter=False):
         u"""
         :type pathspecs: typing.Iterable[Pathspec]
         :param pathspecs:
+        :type prefilter: bool
+        :param prefilter: Index the required literals of the patterns to only evaluate the path
+                          specs whose literals occur in the matched path. This speeds up large
+                          lists, `pathspecs` must not be modified afterwards.
         """
         self.pathspecs = list(pathspecs)
+        if prefilter:
+            self._prefilter = LiteralPrefilter([spec.pattern for spec in self.pathspecs])
+        else:
+            self._prefilter = None
+
+    def __getstate__(self):
+        u"""
+        Returns the path specs and the prefilter flag, the prefilter index is rebuilt when
+        restoring the list.
+
+        :rtype: tuple
+        """
+        return self.pathspecs, self._prefilter is not None
+
+    def __setstate__(self, state):
+        u"""
+        :type state: tuple
+        :rtype: None
+        """
+        pathspecs, prefilter = state
+        self.__init__(pathspecs, prefilter=prefilter)
+
+    def compiled_count(self):
+        u"""
+        Returns the number of path specs whose pattern is compiled. With lazy patterns (see
+        `WildmatchPattern`), it shows how many rules were actually needed by the matched paths.
+
+        :rtype: int
+        """
+        return sum(1 for spec in self.pathspecs if spec.pattern.is_compiled())
+
+    def profiled(self):
+        u"""
+        Returns a copy of this list recording, for each path spec, its evaluations, hits and
+        matching time (see `profiling.ProfiledPathspecList`). The path specs are shared.
+
+        :rtype: pathmatch.profiling.ProfiledPathspecList
+        """
+        from pathmatch import profiling  # The profiling module depends on this module
+        return profiling.ProfiledPathspecList(self.pathspecs,
+                                              prefilter=self._prefilter is not None)
 
     def match(self, path):
         u"""
@@ -70,12 +124,157 @@ class PathspecList(object):
         :param path: The path to match against this list of path specs.
         :return:
         """
+        if self._prefilter is not None:
+            pathspecs = self.pathspecs
+            for index in reversed(self._prefilter.candidates(path)):
+                spec = pathspecs[index]
+                if spec.pattern.match(path):
+                    return not spec.negated
+            return False
+
         for spec in reversed(self.pathspecs):  # type: Pathspec
             if spec.pattern.match(path):
                 return not spec.negated
 
         return False
 
+    def subtree_verdict(self, dir_path):
+        u"""
+        Returns the result of `match` shared by every path inside the directory `dir_path`, if
+        it can be decided from the structure of the patterns (see `Pattern.may_match_under`).
+        A directory walker can skip the `EXCLUDED` directories without listing them.
+
+        :type dir_path: text_type
+        :param dir_path: Path of a directory, in the same form as the matched paths
+        :rtype: text_type
+        :return: `INCLUDED`, `EXCLUDED` or `UNDECIDED`
+        """
+        matchers = self.subtree_matchers()
+        states = self.subtree_start(matchers)
+        for name in segment.directory_segments(dir_path, isinstance(dir_path, binary_type)):
+            states = self.subtree_next(matchers, states, name)
+        return self.subtree_verdict_from_states(matchers, states, dir_path)
+
+    def subtree_matchers(self):
+        u"""
+        Returns the subtree matcher of each path spec (see `Pattern.subtree_matcher`).
+
+        A directory walker computes the verdict of each directory from the verdict states of its
+        parent, advanced by the name of the directory: the path specs are not matched again
+        against the whole directory path.
+
+        :rtype: typing.List[segment.SegmentMatcher | None]
+        """
+        return [spec.pattern.subtree_matcher() for spec in self.pathspecs]
+
+    def subtree_start(self, matchers):
+        u"""
+        Returns the verdict states of the root directory, the empty path.
+
+        :type matchers: typing.Sequence[segment.SegmentMatcher | None]
+        :param matchers: The result of `subtree_matchers`
+        :rtype: tuple
+        """
+        return tuple(None if matcher is None else matcher.start_states() for matcher in matchers)
+
+    def subtree_next(self, matchers, states, name):
+        u"""
+        Returns the verdict states of a directory from the states of its parent.
+
+        :type matchers: typing.Sequence[segment.SegmentMatcher | None]
+        :param matchers: The result of `subtree_matchers`
+        :type states: tuple
+        :param states: The verdict states of the parent directory
+        :type name: text_type
+        :param name: The name of the directory
+        :rtype: tuple
+        """
+        return tuple([None if matcher is None else matcher.next_states(matcher_states, name)
+                      for matcher, matcher_states in zip(matchers, states)])
+
+    def subtree_verdict_from_states(self, matchers, states, dir_path):
+        u"""
+        Returns the verdict of a directory (see `subtree_verdict`) from its verdict states.
+
+        :type matchers: typing.Sequence[segment.SegmentMatcher | None]
+        :param matchers: The result of `subtree_matchers`
+        :type states: tuple
+        :param states: The verdict states of the directory
+        :type dir_path: text_type
+        :param dir_path: Path of the directory, for the patterns without subtree matcher
+        :rtype: text_type
+        """
+        # The last matching path spec wins: the path specs are visited from the end, collecting
+        # the possible results until a path spec matches every path.
+        results = set()
+        for index in range(len(self.pathspecs) - 1, -1, -1):
+            spec = self.pathspecs[index]  # type: Pathspec
+            matcher = matchers[index]
+            if matcher is None:
+                matches_all = spec.pattern.matches_all_under(dir_path)
+                may_match = matches_all or spec.pattern.may_match_under(dir_path)
+            else:
+                matches_all = matcher.accepts_all(states[index])
+                may_match = matches_all or matcher.may_continue(states[index])
+            if may_match:
+                results.add(not spec.negated)
+                if len(results) > 1:
+                    return UNDECIDED
+                if matches_all:
+                    break
+        else:
+            results.add(False)  # Paths not matched by any path spec
+        if len(results) > 1:
+            return UNDECIDED
+        return INCLUDED if True in results else EXCLUDED
+
+    def match_many(self, paths):
+        u"""
+        Matches every element of `paths` against this list of path specs.
+
+        For NumPy string (or bytes) arrays, the path specs with a vectorized fast path are
+        evaluated on the whole array first. The other path specs are then only evaluated for each
+        path until a vectorized path spec matched it.
+
+        :type paths: typing.Sequence[text_type]
+        :param paths: A sized collection of paths to match
+        :rtype: numpy.ndarray | bytearray
+        :return: A boolean mask (see `Pattern.match_many`)
+        """
+        numpy = batch.numpy
+        if numpy is None or not isinstance(paths, numpy.ndarray) \
+                or paths.dtype.kind not in (u'U', u'S'):
+            return batch.match_many(self.match, paths)
+
+        # Index of the last path spec matching each path, -1 if there is none
+        last_indexes = numpy.full(len(paths), -1, dtype=int)
+        other_indexes = []  # Indexes of the path specs without vectorized match
+        for index, spec in enumerate(self.pathspecs):  # type: int, Pathspec
+            fast_path = getattr(spec.pattern, u'fast_path', None)
+            mask = batch.vectorized_match(fast_path, paths) if fast_path is not None else None
+            if mask is None:
+                other_indexes.append(index)
+            else:
+                last_indexes[mask] = index
+
+        if len(other_indexes) > 0:
+            other_indexes.reverse()
+            others = [(index, self.pathspecs[index].pattern.match) for index in other_indexes]
+            updated = last_indexes.tolist()
+            for position, path in enumerate(paths.tolist()):
+                last_index = updated[position]
+                for index, match in others:
+                    if index < last_index:
+                        break
+                    if match(path):
+                        updated[position] = index
+                        break
+            last_indexes = numpy.array(updated, dtype=int)
+
+        negated = numpy.array([spec.negated for spec in self.pathspecs] + [True], dtype=bool)
+        # The index -1 selects the trailing `True`: unmatched paths are not included
+        return ~negated[last_indexes]
+
     def filter(self, texts):
         u"""
         Filter a collection of elements.
@@ -86,3 +285,63 @@ class PathspecList(object):
         :return: A generator of matched elements
         """
         return (text for text in texts if self.match(text))
+
+    def afilter(self, paths, time_slice=None):
+        u"""
+        Returns an asynchronous generator yielding the matched paths, yielding control to the
+        event loop regularly (see `aio.afilter`). Requires Python 3.6+.
+
+        :type paths: typing.AsyncIterable[text_type] | typing.Iterable[text_type]
+        :param paths: An asynchronous or synchronous iterable collection of paths to match
+        :type time_slice: float | None
+        :param time_slice: Maximal duration between two yields to the event loop, in seconds,
+                           `aio.TIME_SLICE` by default
+        :rtype: typing.AsyncGenerator[text_type, None]
+        """
+        from pathmatch import aio  # Python 3 only
+        return aio.afilter(self.match, paths,
+                           aio.TIME_SLICE if time_slice is None else time_slice)
+
+    def filter_stream(self, source, output, separator=b'\n', output_separator=None,
+                      invert=False):
+        u"""
+        Writes the matched paths of a binary stream to `output`, reading and writing them by
+        large chunks (see `stream.filter_stream`). The patterns must be bytes patterns.
+
+        :type source: typing.BinaryIO
+        :param source: The binary stream to read
+        :type output: typing.BinaryIO
+        :param output: The binary stream receiving the matched paths
+        :type separator: bytes
+        :param separator: The separator of the paths of `source`, `b'\\n'` or `b'\\0'`
+        :type output_separator: bytes | None
+        :param output_separator: The separator of the written paths, `separator` by default
+        :type invert: bool
+        :param invert: Write the paths that do not match instead
+        :rtype: int
+        :return: The number of written paths
+        """
+        from pathmatch import stream
+        return stream.filter_stream(self.match, source, output, separator, output_separator,
+                                    invert)
+
+    def parallel_filter(self, paths, executor=None, workers=None, chunk_size=None):
+        u"""
+        Filter a large collection of paths on a pool of workers, see `parallel.parallel_filter`.
+
+        :type paths: typing.Iterable[text_type]
+        :param paths: An iterable collection of paths to match
+        :type executor: text_type | concurrent.futures.Executor | None
+        :param executor: `parallel.EXECUTOR_PROCESS`, `parallel.EXECUTOR_THREAD` or an existing
+                         executor, a process pool by default (a thread pool on free-threaded
+                         Python builds)
+        :type workers: int | None
+        :param workers: Number of workers of the created pool, the number of CPUs by default
+        :type chunk_size: int | None
+        :param chunk_size: Number of paths per chunk, adapted to the cost of the rules by default
+        :rtype: typing.Generator[text_type]
+        :return: A generator of matched paths, in the order of `paths`
+        """
+        from pathmatch import parallel  # The parallel module depends on this module
+        return parallel.parallel_filter(self, paths, executor=executor, workers=workers,
+                                        chunk_size=chunk_size)
@@ -17,6 +17,8 @@ import typing
 
 from six import text_type, with_metaclass
 
+from pathmatch import batch
+
 
 RegexType = type(re.compile(u''))
 
@@ -51,6 +53,110 @@ class Pattern(with_metaclass(ABCMeta, object)):
         """
         return (text for text in texts if self.match(text))
 
+    def afilter(self, texts, time_slice=None):
+        u"""
+        Returns an asynchronous generator yielding the elements of `texts` matching this pattern,
+        yielding control to the event loop regularly (see `aio.afilter`). Requires Python 3.6+.
+
+        :type texts: typing.AsyncIterable[text_type] | typing.Iterable[text_type]
+        :param texts: An asynchronous or synchronous iterable collection of texts to match
+        :type time_slice: float | None
+        :param time_slice: Maximal duration between two yields to the event loop, in seconds,
+                           `aio.TIME_SLICE` by default
+        :rtype: typing.AsyncGenerator[text_type, None]
+        """
+        from pathmatch import aio  # Python 3 only
+        return aio.afilter(self.match, texts,
+                           aio.TIME_SLICE if time_slice is None else time_slice)
+
+    def filter_stream(self, source, output, separator=b'\n', output_separator=None,
+                      invert=False):
+        u"""
+        Writes the paths of a binary stream matching this pattern to `output`, reading and
+        writing them by large chunks (see `stream.filter_stream`). The pattern must match bytes.
+
+        :type source: typing.BinaryIO
+        :param source: The binary stream to read
+        :type output: typing.BinaryIO
+        :param output: The binary stream receiving the matched paths
+        :type separator: bytes
+        :param separator: The separator of the paths of `source`, `b'\\n'` or `b'\\0'`
+        :type output_separator: bytes | None
+        :param output_separator: The separator of the written paths, `separator` by default
+        :type invert: bool
+        :param invert: Write the paths that do not match instead
+        :rtype: int
+        :return: The number of written paths
+        """
+        from pathmatch import stream
+        return stream.filter_stream(self.match, source, output, separator, output_separator,
+                                    invert)
+
+    def match_many(self, texts):
+        u"""
+        Matches every element of `texts` against this pattern.
+
+        :type texts: typing.Sequence[text_type]
+        :param texts: A sized collection of texts to match
+        :rtype: numpy.ndarray | bytearray
+        :return: A boolean mask: a NumPy boolean array if NumPy is installed, otherwise a
+                 `bytearray` of zeros and ones.
+        """
+        return batch.match_many(self.match, texts)
+
+    def required_literals(self):
+        u"""
+        Returns substrings occurring in every text matched by this pattern. They allow to skip the
+        pattern without evaluating it (see the `prefilter` module). The default implementation
+        does not know any literal.
+
+        :rtype: typing.Tuple[text_type, ...]
+        """
+        return ()
+
+    def may_match_under(self, dir_path):
+        u"""
+        Tests if a path inside the directory `dir_path` may match this pattern. A directory
+        walker can skip the directories where it returns `False` without listing them. The
+        default implementation does not know the structure of the pattern: it returns `True`.
+
+        :type dir_path: text_type
+        :param dir_path: Path of a directory, in the same form as the matched paths
+        :rtype: bool
+        """
+        return True
+
+    def matches_all_under(self, dir_path):
+        u"""
+        Tests if every path inside the directory `dir_path` matches this pattern. `False` is a
+        conservative answer, it is the answer of the default implementation.
+
+        :type dir_path: text_type
+        :param dir_path: Path of a directory, in the same form as the matched paths
+        :rtype: bool
+        """
+        return False
+
+    def subtree_matcher(self):
+        u"""
+        Returns a matcher of the leading components of the paths, used by the directory walkers to
+        decide `may_match_under` and `matches_all_under` one component at a time (see
+        `segment.SegmentMatcher.start_states`). The default implementation returns `None`: the
+        walkers call `may_match_under` and `matches_all_under` instead.
+
+        :rtype: pathmatch.segment.SegmentMatcher | None
+        """
+        return None
+
+    def is_compiled(self):
+        u"""
+        Tests if the matcher of this pattern is compiled. The patterns supporting lazy compilation
+        override this method, the others are compiled when they are created.
+
+        :rtype: bool
+        """
+        return True
+
     @abstractmethod
     def translate(self):
         u"""
@@ -0,0 +1,357 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes `WildmatchSet`, matching a text against many patterns in a single pass.
+
+The patterns with a fast path operating on a single path component (`build`, `*.pyc`,
+`node_modules/`, `**/name`...) are indexed by their literal: the text is split once and each
+component is looked up in the index. The regular expressions of the other patterns are combined in
+a few large regular expressions: the loop over these patterns runs inside the regex engine instead
+of the Python interpreter. For very large sets, the `prefilter` option replaces these combined
+regexes by a literal-substring prefilter (see `pathmatch.prefilter`).
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+import re
+import sys
+# noinspection PyCompatibility
+import typing
+
+from six import binary_type, text_type
+
+from pathmatch import fastpath
+from pathmatch.pattern import Pattern
+from pathmatch.prefilter import LiteralPrefilter
+from pathmatch.wildmatch import WildmatchPattern
+
+
+RegexType = type(re.compile(u''))
+
+# Maximum number of capturing groups in a single combined regex: Python versions older than 3.5
+# only support 100 groups per regex.
+_MAX_GROUPS = 99 if sys.version_info < (3, 5) else 1000
+
+_SLASH = u'/'
+_BINARY_SLASH = b'/'
+_BINARY_ENCODING = u'latin-1'
+
+# Components of the text where an indexed literal may be found
+_ANY_COMPONENT = 0
+_DIR_COMPONENT = 1  # Any component except the last one
+_LAST_COMPONENT = 2
+
+
+class WildmatchSet(Pattern):
+    def __init__(self, patterns, no_escape=False, path_name=True, wild_star=True, period=False,
+                 case_fold=False, prefilter=False):
+        u"""
+        Compiles a collection of patterns to match them all at once.
+
+        :type patterns: typing.Iterable[text_type | binary_type | Pattern]
+        :param patterns: Wildmatch patterns (compiled with the following flags) or `Pattern`
+                         instances (for example `GitmatchPattern`). Text and bytes patterns cannot
+                         be mixed in a single set.
+        :type no_escape: bool
+        :param no_escape: Disable backslash escaping
+        :type path_name: bool
+        :param path_name: Separator (slash) in text cannot be matched by an asterisk, question-mark
+                          nor bracket expression in pattern (only a literal).
+        :type wild_star: bool
+        :param wild_star: A True value forces the `path_name` flag to True. This allows the
+                          double-asterisk `**` to match any (0 to many) number of directories
+        :type period: bool
+        :param period: A leading period in text cannot be matched by an asterisk, question-mark nor
+                       bracket expression in pattern (only a literal).
+        :type case_fold: bool
+        :param case_fold: Perform a case insensitive match (GNU Extension)
+        :type prefilter: bool
+        :param prefilter: Only evaluate the patterns whose required literals occur in the text,
+                          instead of the combined regexes. Faster for large sets of patterns.
+        :rtype: None
+        """
+        self.patterns = []  # type: typing.List[Pattern]
+        for pattern in patterns:
+            if isinstance(pattern, (text_type, binary_type)):
+                pattern = WildmatchPattern(pattern, no_escape=no_escape, path_name=path_name,
+                                           wild_star=wild_star, period=period,
+                                           case_fold=case_fold)
+            self.patterns.append(pattern)
+
+        regexes = [pattern.translate() for pattern in self.patterns]
+        binary_flags = set(isinstance(regex.pattern, binary_type) for regex in regexes)
+        if len(binary_flags) > 1:
+            raise ValueError(u'Text and bytes patterns cannot be mixed in a single set')
+        self.binary = binary_flags.pop() if len(binary_flags) > 0 else False
+
+        self._index = _ComponentIndex(self.binary)
+        self._fast_matchers = []  # Pairs `(pattern_index, match)` for the other fast paths
+        self._any_regexes = []  # type: typing.List[RegexType]
+        self._groups_regexes = []  # Pairs `(regex, group_indexes)`
+        self._prefilter = None  # type: typing.Optional[LiteralPrefilter]
+        self._prefiltered = []  # Pattern indexes in the prefilter to pattern indexes in this set
+        if prefilter:
+            # The component index is cheaper than the prefilter: only prefilter the other patterns
+            for index, pattern in enumerate(self.patterns):
+                fast_path = getattr(pattern, u'fast_path', None)
+                if fast_path is None or not self._index.add(index, fast_path):
+                    self._prefiltered.append(index)
+            self._prefilter = LiteralPrefilter([self.patterns[index]
+                                                for index in self._prefiltered])
+            return
+
+        # Regexes can only be combined if they share the same flags
+        by_flags = {}
+        for index, pattern in enumerate(self.patterns):
+            fast_path = getattr(pattern, u'fast_path', None)
+            if fast_path is not None:
+                if not self._index.add(index, fast_path):
+                    self._fast_matchers.append((index, fastpath.compile_matcher(fast_path)))
+            else:
+                by_flags.setdefault(regexes[index].flags, []).append(index)
+
+        for flags, indexes in sorted(by_flags.items()):
+            self._any_regexes.append(_compile_source(
+                u'|'.join(u'(?:{})'.format(_source(regexes[index])) for index in indexes), flags,
+                self.binary))
+            chunk = []
+            chunk_groups = 0
+            for index in indexes:
+                groups = 1 + regexes[index].groups
+                if len(chunk) > 0 and chunk_groups + groups > _MAX_GROUPS:
+                    self._groups_regexes.append(_compile_groups_regex(chunk, flags, self.binary))
+                    chunk = []
+                    chunk_groups = 0
+                chunk.append((index, regexes[index]))
+                chunk_groups += groups
+            self._groups_regexes.append(_compile_groups_regex(chunk, flags, self.binary))
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def any(self, text):
+        u"""
+        Tests if at least one of the patterns matches `text`.
+
+        :type text: text_type
+        :param text: A text to match against the patterns of this set
+        :rtype: bool
+        """
+        if self._index.any(text):
+            return True
+        if self._prefilter is not None:
+            for candidate in self._prefilter.candidates(text):
+                if self.patterns[self._prefiltered[candidate]].match(text):
+                    return True
+            return False
+        for _, match in self._fast_matchers:
+            if match(text):
+                return True
+        for regex in self._any_regexes:
+            if regex.match(text) is not None:
+                return True
+        return False
+
+    match = any
+
+    __call__ = any
+
+    def matches(self, text):
+        u"""
+        Returns the indexes of all the patterns matching `text`, in increasing order.
+
+        :type text: text_type
+        :param text: A text to match against the patterns of this set
+        :rtype: typing.List[int]
+        """
+        result = self._index.matches(text)
+        if self._prefilter is not None:
+            for candidate in self._prefilter.candidates(text):
+                pattern_index = self._prefiltered[candidate]
+                if self.patterns[pattern_index].match(text):
+                    result.append(pattern_index)
+        for pattern_index, match in self._fast_matchers:
+            if match(text):
+                result.append(pattern_index)
+        for regex, group_indexes in self._groups_regexes:
+            groups = regex.match(text).groups()
+            for pattern_index, group_index in group_indexes:
+                if groups[group_index] is not None:
+                    result.append(pattern_index)
+        result.sort()
+        return result
+
+    def translate(self):
+        u"""
+        Returns a compiled Python regular expression matching the texts matched by at least one
+        pattern of this set.
+
+        :rtype: RegexType
+        """
+        flags = set(pattern.translate().flags for pattern in self.patterns)
+        if len(flags) > 1:
+            raise ValueError(u'The patterns of this set cannot be combined in a single regex: '
+                             u'they use different flags')
+        elif len(flags) == 0:
+            return re.compile(u'(?:a\\A)')  # Empty set: impossible match
+        return _compile_source(u'|'.join(u'(?:{})'.format(_source(pattern.translate()))
+                                         for pattern in self.patterns), flags.pop(), self.binary)
+
+
+def _source(regex):
+    u"""
+    Returns the source of a regex as text, the sources of bytes regexes are decoded as latin-1.
+
+    :type regex: RegexType
+    :rtype: text_type
+    """
+    if isinstance(regex.pattern, binary_type):
+        return regex.pattern.decode(_BINARY_ENCODING)
+    return regex.pattern
+
+
+def _compile_source(source, flags, binary):
+    u"""
+    Compiles a regex source built from the results of `_source`.
+
+    :type source: text_type
+    :type flags: int
+    :type binary: bool
+    :param binary: Compile a bytes regex
+    :rtype: RegexType
+    """
+    if binary:
+        return re.compile(source.encode(_BINARY_ENCODING), flags)
+    return re.compile(source, flags)
+
+
+def _compile_groups_regex(indexed_regexes, flags, binary):
+    u"""
+    Combines closed regexes in a single regex capturing the matches of each regex in a group.
+    The groups are nested in optional lookaheads: each regex is tried from the start of the text.
+
+    :type indexed_regexes: typing.List[typing.Tuple[int, RegexType]]
+    :param indexed_regexes: Pairs `(pattern_index, regex)`
+    :type binary: bool
+    :param binary: Compile a bytes regex
+    :rtype: typing.Tuple[RegexType, typing.List[typing.Tuple[int, int]]]
+    :return: The combined regex and the pairs `(pattern_index, index in the groups tuple)`
+    """
+    parts = []
+    group_indexes = []
+    group_count = 0
+    for pattern_index, regex in indexed_regexes:
+        parts.append(u'(?:(?=({})))?'.format(_source(regex)))
+        group_indexes.append((pattern_index, group_count))
+        # Skip the groups defined by the regex itself
+        group_count += 1 + regex.groups
+    return _compile_source(u''.join(parts), flags, binary), group_indexes
+
+
+class _ComponentIndex(object):
+    def __init__(self, binary=False):
+        u"""
+        Index of the fast paths testing a literal (or a suffix) against a single path component.
+
+        :type binary: bool
+        :param binary: Index the fast paths of bytes patterns
+        :rtype: None
+        """
+        self._slash = _BINARY_SLASH if binary else _SLASH
+        self._texts = {}  # Whole text to pattern indexes
+        self._components = {}  # Component to pairs `(pattern_index, scope)`
+        self._suffixes = {}  # Suffix length to a dictionary from suffix to `(pattern_index, scope)`
+
+    def add(self, pattern_index, fast_path):
+        u"""
+        Adds a fast path to the index.
+
+        :type pattern_index: int
+        :type fast_path: fastpath.FastPath
+        :rtype: bool
+        :return: `False` if this fast path cannot be indexed
+        """
+        kind, operand, path_name = fast_path
+        if kind == fastpath.EQUALS:
+            self._texts.setdefault(operand, []).append(pattern_index)
+            return True
+
+        if kind in (fastpath.DEEP_TREE, fastpath.CONTAINS) and operand[-1:] == self._slash:
+            # `(?:.*\/)?name\/.*` or `.*suffix\/.*`: the literal is in a directory component
+            operand = operand[:-1]
+            scope = _DIR_COMPONENT
+            suffix = kind == fastpath.CONTAINS
+        elif kind in (fastpath.DEEP_DIR_EQUALS, fastpath.DEEP_DIR_SUFFIX):
+            scope = _ANY_COMPONENT
+            suffix = kind == fastpath.DEEP_DIR_SUFFIX
+        elif kind == fastpath.DEEP_EQUALS or (kind == fastpath.SUFFIX and not path_name):
+            scope = _LAST_COMPONENT
+            suffix = kind == fastpath.SUFFIX
+        else:
+            return False
+
+        if len(operand) == 0 or self._slash in operand:
+            return False
+        if suffix:
+            table = self._suffixes.setdefault(len(operand), {})
+        else:
+            table = self._components
+        table.setdefault(operand, []).append((pattern_index, scope))
+        return True
+
+    def _scan(self, text):
+        u"""
+        Yields the indexes of the patterns matching `text`, possibly with duplicates.
+
+        :type text: text_type
+        :rtype: typing.Iterator[int]
+        """
+        pattern_indexes = self._texts.get(text)
+        if pattern_indexes is not None:
+            for pattern_index in pattern_indexes:
+                yield pattern_index
+
+        if len(self._components) == 0 and len(self._suffixes) == 0:
+            return
+
+        components = text.split(self._slash)
+        last = len(components) - 1
+        for position, component in enumerate(components):
+            entries = self._components.get(component)
+            if entries is not None:
+                for pattern_index, scope in entries:
+                    if scope == _ANY_COMPONENT or (scope == _DIR_COMPONENT) == (position != last):
+                        yield pattern_index
+            for size, table in self._suffixes.items():
+                if len(component) < size:
+                    continue
+                entries = table.get(component[-size:])
+                if entries is not None:
+                    for pattern_index, scope in entries:
+                        if scope == _ANY_COMPONENT \
+                                or (scope == _DIR_COMPONENT) == (position != last):
+                            yield pattern_index
+
+    def any(self, text):
+        u"""
+        Tests if at least one of the indexed patterns matches `text`.
+
+        :type text: text_type
+        :rtype: bool
+        """
+        for _ in self._scan(text):
+            return True
+        return False
+
+    def matches(self, text):
+        u"""
+        Returns the indexes of the indexed patterns matching `text`, in an arbitrary order.
+
+        :type text: text_type
+        :rtype: typing.List[int]
+        """
+        return list(set(self._scan(text)))
@@ -0,0 +1,140 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes a literal-substring prefilter for large collections of patterns.
+
+Almost every rule of an ignore file contains a literal that must occur in any matched path
+(`node_modules`, `.egg-info`, `__pycache__`...). The required literals of the patterns are indexed
+in an Aho-Corasick automaton: a single scan of a path finds all the literals it contains, and only
+the patterns whose literal was found (plus the patterns without literals) have to be evaluated.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+from collections import deque
+# noinspection PyCompatibility
+import typing
+
+from six import text_type
+
+from pathmatch.pattern import Pattern
+
+
+class AhoCorasick(object):
+    def __init__(self, keywords):
+        u"""
+        Builds an Aho-Corasick automaton finding all the occurrences of the keywords in a text.
+
+        :type keywords: typing.Sequence[text_type]
+        :param keywords: Non-empty keywords to search, identified by their index
+        :rtype: None
+        """
+        goto = [{}]  # Transitions of the trie, by state
+        outputs = [[]]  # Keywords ending at each state
+
+        for keyword_index, keyword in enumerate(keywords):
+            if len(keyword) == 0:
+                raise ValueError(u'Empty keywords are not supported')
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(keyword_index)
+
+        # Breadth-first computation of the failure links, the outputs of the state reached by the
+        # failure link are merged in the outputs of each state.
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while len(queue) > 0:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback != 0 and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail_state = goto[fallback].get(char, 0)
+                fail[next_state] = fail_state if fail_state != next_state else 0
+                outputs[next_state].extend(outputs[fail[next_state]])
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = [tuple(output) if len(output) > 0 else None for output in outputs]
+
+    def search(self, text):
+        u"""
+        Returns the indexes of the keywords occurring in `text`.
+
+        :type text: text_type
+        :rtype: typing.Set[int]
+        """
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        root = goto[0]
+
+        found = set()
+        state = 0
+        for char in text:
+            next_state = goto[state].get(char)
+            while next_state is None and state != 0:
+                state = fail[state]
+                next_state = goto[state].get(char)
+            state = next_state if next_state is not None else root.get(char, 0)
+            output = outputs[state]
+            if output is not None:
+                found.update(output)
+        return found
+
+
+class LiteralPrefilter(object):
+    def __init__(self, patterns):
+        u"""
+        Indexes the required literals of a collection of patterns.
+
+        :type patterns: typing.Sequence[Pattern]
+        :param patterns: The patterns to index, identified by their index
+        :rtype: None
+        """
+        keywords = []  # type: typing.List[text_type]
+        keyword_indexes = {}  # Keyword to its index in `keywords`
+        self._by_keyword = []  # Keyword index to the list of pattern indexes
+        self._unfiltered = []  # Patterns without required literals
+
+        for pattern_index, pattern in enumerate(patterns):
+            literals = [literal for literal in pattern.required_literals() if len(literal) > 0]
+            if len(literals) == 0:
+                self._unfiltered.append(pattern_index)
+                continue
+            # The longest literal is usually the most selective
+            keyword = max(literals, key=len)
+            keyword_index = keyword_indexes.get(keyword)
+            if keyword_index is None:
+                keyword_index = keyword_indexes[keyword] = len(keywords)
+                keywords.append(keyword)
+                self._by_keyword.append([])
+            self._by_keyword[keyword_index].append(pattern_index)
+
+        self._automaton = AhoCorasick(keywords)
+
+    def candidates(self, text):
+        u"""
+        Returns the indexes of the patterns that may match `text`, in increasing order.
+
+        :type text: text_type
+        :rtype: typing.List[int]
+        """
+        result = list(self._unfiltered)
+        by_keyword = self._by_keyword
+        for keyword_index in self._automaton.search(text):
+            result.extend(by_keyword[keyword_index])
+        result.sort()
+        return result
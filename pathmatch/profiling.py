@@ -0,0 +1,212 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes the profiling of path spec lists: which rules are evaluated, which ones
+decide the verdicts and where the matching time goes.
+
+Profiling is opt-in: `PathspecList.profiled()` returns a `ProfiledPathspecList`, an instrumented
+copy recording the statistics of each rule. The matching loop of `PathspecList` itself is left
+untouched, it has no cost when profiling is not used.
+
+    profiled = pathspecs.profiled()
+    list(profiled.filter(paths))
+    print(profiled.report(limit=20))
+
+The statistics are not synchronized: profile a list from a single thread. The matching done by
+worker processes (`parallel_filter`) is not recorded.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+from timeit import default_timer
+# noinspection PyCompatibility
+import typing
+
+from six import binary_type, text_type
+
+from pathmatch import batch
+from pathmatch.pathspec import EXCLUDED, INCLUDED, PathspecList
+
+# Sort keys of `ProfiledPathspecList.report`, the rules are sorted in decreasing order
+SORT_TIME = u'time'
+SORT_EVALUATIONS = u'evaluations'
+SORT_HITS = u'hits'
+SORT_MEAN_TIME = u'mean_time'
+
+_SORT_KEYS = (SORT_TIME, SORT_EVALUATIONS, SORT_HITS, SORT_MEAN_TIME)
+
+
+class RuleStats(object):
+    u"""
+    The statistics of a rule (path spec) of a `ProfiledPathspecList`.
+
+    With the last matching rule winning, each hit of a rule decides the verdict of the path: the
+    hits are the paths whose verdict was produced by this rule.
+    """
+    __slots__ = (u'index', u'pathspec', u'evaluations', u'hits', u'time')
+
+    def __init__(self, index, pathspec):
+        u"""
+        :type index: int
+        :param index: Index of the rule in the list
+        :type pathspec: pathmatch.pathspec.Pathspec
+        :rtype: None
+        """
+        self.index = index
+        self.pathspec = pathspec
+        self.evaluations = 0  # Number of paths matched against this rule
+        self.hits = 0  # Number of paths matching this rule
+        self.time = 0.0  # Cumulative matching time, in seconds
+
+    @property
+    def verdict(self):
+        u"""
+        The verdict produced by the hits of this rule: `INCLUDED` or `EXCLUDED` if it is negated.
+
+        :rtype: text_type
+        """
+        return EXCLUDED if self.pathspec.negated else INCLUDED
+
+    @property
+    def mean_time(self):
+        u"""
+        The mean time of an evaluation, in seconds.
+
+        :rtype: float
+        """
+        return self.time / self.evaluations if self.evaluations > 0 else 0.0
+
+    def __repr__(self):
+        return u'RuleStats(index={}, evaluations={}, hits={}, time={})'.format(
+            self.index, self.evaluations, self.hits, self.time)
+
+
+class ProfiledPathspecList(PathspecList):
+    u"""
+    A `PathspecList` recording the statistics of each rule, see `PathspecList.profiled`.
+    """
+
+    def __init__(self, pathspecs, prefilter=False):
+        u"""
+        :type pathspecs: typing.Iterable[pathmatch.pathspec.Pathspec]
+        :type prefilter: bool
+        :param prefilter: See `PathspecList`
+        """
+        super(ProfiledPathspecList, self).__init__(pathspecs, prefilter=prefilter)
+        self.reset()
+
+    def reset(self):
+        u"""
+        Clears the statistics.
+
+        :rtype: None
+        """
+        self.stats = [RuleStats(index, spec) for index, spec in enumerate(self.pathspecs)]
+        self.paths = 0  # Number of matched paths
+        self.unmatched = 0  # Number of paths matched by no rule
+        self.prefilter_time = 0.0  # Time spent selecting the candidate rules, in seconds
+
+    def match(self, path):
+        u"""
+        Matches a path as `PathspecList.match`, recording the evaluated rules.
+
+        :type path: text_type
+        :rtype: bool
+        """
+        pathspecs = self.pathspecs
+        stats = self.stats
+        self.paths += 1
+        if self._prefilter is not None:
+            start = default_timer()
+            indexes = reversed(self._prefilter.candidates(path))
+            self.prefilter_time += default_timer() - start
+        else:
+            indexes = range(len(pathspecs) - 1, -1, -1)
+
+        for index in indexes:
+            spec = pathspecs[index]
+            rule_stats = stats[index]
+            start = default_timer()
+            matched = spec.pattern.match(path)
+            rule_stats.time += default_timer() - start
+            rule_stats.evaluations += 1
+            if matched:
+                rule_stats.hits += 1
+                return not spec.negated
+
+        self.unmatched += 1
+        return False
+
+    def match_many(self, paths):
+        u"""
+        Matches every element of `paths` with `match`: the vectorized evaluation of NumPy arrays
+        (see `PathspecList.match_many`) is not profiled.
+
+        :type paths: typing.Sequence[text_type]
+        :rtype: numpy.ndarray | bytearray
+        """
+        return batch.match_many(self.match, paths)
+
+    def sorted_stats(self, sort=SORT_TIME):
+        u"""
+        Returns the statistics of the rules, in decreasing order of `sort`.
+
+        :type sort: text_type
+        :param sort: `SORT_TIME`, `SORT_EVALUATIONS`, `SORT_HITS` or `SORT_MEAN_TIME`
+        :rtype: typing.List[RuleStats]
+        """
+        if sort not in _SORT_KEYS:
+            raise ValueError(u'Unknown sort key: {}'.format(repr(sort)))
+        return sorted(self.stats, key=lambda rule_stats: (-getattr(rule_stats, sort),
+                                                          rule_stats.index))
+
+    def report(self, sort=SORT_TIME, limit=None):
+        u"""
+        Returns a text report of the statistics of the rules, in decreasing order of `sort`.
+
+        :type sort: text_type
+        :param sort: See `sorted_stats`
+        :type limit: int | None
+        :param limit: Maximum number of reported rules, all of them by default
+        :rtype: text_type
+        """
+        total_time = sum(rule_stats.time for rule_stats in self.stats)
+        lines = [
+            u'{} paths, {} matched by no rule, {} rules'.format(self.paths, self.unmatched,
+                                                                len(self.stats)),
+            u'Matching time: {:.6f} s in the rules, {:.6f} s in the prefilter'.format(
+                total_time, self.prefilter_time),
+            u'',
+            u'{:>6} {:>10} {:>6} {:>10} {:>10} {:>10} {:8}  {}'.format(
+                u'index', u'time (s)', u'time%', u'mean (us)', u'evals', u'hits', u'verdict',
+                u'rule'),
+        ]
+        rows = self.sorted_stats(sort)
+        if limit is not None:
+            rows = rows[:limit]
+        for rule_stats in rows:
+            share = 100 * rule_stats.time / total_time if total_time > 0 else 0.0
+            lines.append(u'{:6d} {:10.6f} {:6.1f} {:10.3f} {:10d} {:10d} {:8}  {}'.format(
+                rule_stats.index, rule_stats.time, share, rule_stats.mean_time * 1e6,
+                rule_stats.evaluations, rule_stats.hits, rule_stats.verdict,
+                _rule_text(rule_stats.pathspec)))
+        return u'\n'.join(lines)
+
+
+def _rule_text(pathspec):
+    u"""
+    Returns the source of a rule, in the syntax of the ignore files.
+
+    :type pathspec: pathmatch.pathspec.Pathspec
+    :rtype: text_type
+    """
+    source = getattr(pathspec.pattern, u'pattern', None)
+    if source is None:
+        source = repr(pathspec.pattern)
+    elif isinstance(source, binary_type):
+        source = source.decode(u'latin-1')
+    return (u'!' if pathspec.negated else u'') + text_type(source)
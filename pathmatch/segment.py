@@ -0,0 +1,346 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes a segment-wise wildmatch engine, matching paths component by component.
+
+With the `path_name` flag, the asterisks, question marks and bracket expressions never match a
+slash and the wild stars `**` match whole components. A pattern is then a list of per-component
+matchers: literal comparisons, simple globs (`*.py`, `test_*`) or small regexes for the other
+components, and wild stars matching any number of components. A path is split once on its slashes
+and matched component by component: without wild stars, a path with the wrong depth or a
+mismatching first directory is rejected without looking at the rest of the path.
+
+The program matched by the engine is a list of instructions, built by `wildmatch` from a parsed
+pattern (see `WildmatchPattern` and its `engine` option).
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+# noinspection PyCompatibility
+import typing
+
+from six import binary_type, text_type
+
+
+# Instructions, each one matches a single component except `DEEP` and `TAIL`.
+LITERAL = u'literal'  # `foo` (argument: the component)
+ANY = u'any'  # `*`, any component (no argument)
+PREFIX = u'prefix'  # `foo*` (argument: the prefix)
+SUFFIX = u'suffix'  # `*foo` (argument: the suffix)
+CONTAINS = u'contains'  # `*foo*` (argument: the substring)
+REGEX = u'regex'  # Other components (argument: a closed regex for the component)
+DEEP = u'deep'  # `**/` or trailing directory suffix, zero or more components (no argument)
+TAIL = u'tail'  # Trailing `/**`, one or more components (no argument)
+
+_SLASH = u'/'
+_BINARY_SLASH = b'/'
+
+
+class SegmentMatcher(object):
+    def __init__(self, program, binary=False):
+        u"""
+        Compiles a program to a list of component matchers.
+
+        :type program: typing.Sequence[typing.Tuple[text_type, typing.Any]]
+        :param program: A list of `(instruction, argument)` pairs
+        :type binary: bool
+        :param binary: Match bytes paths, the arguments are bytes
+        :rtype: None
+        """
+        self.binary = binary
+        matchers = []  # Component matchers, `DEEP` for the wild stars
+        for index, (instruction, arg) in enumerate(program):
+            if instruction == TAIL:
+                if index != len(program) - 1:
+                    raise ValueError(u'`TAIL` must be the last instruction')
+                # One or more components: any component followed by zero or more components
+                matchers.append(_component_matcher(ANY, None))
+                matchers.append(DEEP)
+            elif instruction == DEEP:
+                matchers.append(DEEP)
+            else:
+                matchers.append(_component_matcher(instruction, arg))
+
+        self._matchers = tuple(matchers)
+        final_state = len(matchers)
+        # States of the subtree queries (see `start_states`): bit masks of the indexes of the next
+        # matchers. The closure of a state adds the states reached by skipping wild stars.
+        closures = []
+        for state in range(final_state + 1):
+            closure = 1 << state
+            while state < final_state and matchers[state] is DEEP:
+                state += 1
+                closure |= 1 << state
+            closures.append(closure)
+        self._closures = tuple(closures)
+        self._continue_mask = (1 << final_state) - 1  # Every state except the final state
+        # The remaining matchers accept any non-empty list of components if they contain a wild
+        # star and at most one other matcher, matching any component.
+        self._accepts_all_mask = sum(1 << state for state in range(final_state + 1)
+                                     if _accepts_all(matchers[state:]))
+
+        # The components before the first wild star and after the last one have a fixed
+        # position: they are matched first, the first mismatch rejects the path.
+        deep_indexes = [index for index, match in enumerate(matchers) if match is DEEP]
+        if len(deep_indexes) == 0:
+            self._head = tuple(matchers)
+            self._tail = ()
+            self._middle = None  # Only paths with the same number of components can match
+        else:
+            first, last = deep_indexes[0], deep_indexes[-1]
+            self._head = tuple(matchers[:first])
+            self._tail = tuple(reversed(matchers[last + 1:]))  # Matched from the end
+            # Wild stars and floating component matchers, empty if it matches any components
+            middle = tuple(matchers[first:last + 1])
+            self._middle = middle if len(deep_indexes) < len(middle) else ()
+        self._min_count = len(matchers) - len(deep_indexes)
+
+        # Necessary prefix and suffix of the whole paths, tested before splitting them
+        slash = _BINARY_SLASH if binary else _SLASH
+        self._text_prefix = self._text_suffix = slash[:0]
+        if self._min_count > 1:  # The first and last components are distinct
+            instruction, arg = program[0]
+            if instruction == LITERAL:
+                self._text_prefix = arg + slash
+            elif instruction == PREFIX:
+                self._text_prefix = arg
+            instruction, arg = program[-1]
+            if instruction == LITERAL:
+                self._text_suffix = slash + arg
+            elif instruction == SUFFIX:
+                self._text_suffix = arg
+
+    def match(self, text):
+        u"""
+        Matches a whole path against this program.
+
+        :type text: text_type | binary_type
+        :rtype: bool
+        """
+        if not text.endswith(self._text_suffix) or not text.startswith(self._text_prefix):
+            return False
+        return self.match_segments(text.split(_BINARY_SLASH if self.binary else _SLASH))
+
+    def match_segments(self, segments):
+        u"""
+        Matches a path split on its slashes against this program.
+
+        :type segments: typing.Sequence[text_type | binary_type]
+        :param segments: Components of the path, for example `['src', 'main.py']` for
+                         `src/main.py`
+        :rtype: bool
+        """
+        count = len(segments)
+        if count < self._min_count or (self._middle is None and count != self._min_count):
+            return False
+        index = 0
+        for match in self._head:
+            if not match(segments[index]):
+                return False
+            index += 1
+        end = count
+        for match in self._tail:
+            end -= 1
+            if not match(segments[end]):
+                return False
+        return not self._middle or _match_middle(self._middle, segments, index, end)
+
+    def may_match_under(self, segments):
+        u"""
+        Tests if a path inside a directory may match this program: `False` if no path inside the
+        directory matches.
+
+        :type segments: typing.Sequence[text_type | binary_type]
+        :param segments: Components of the directory path
+        :rtype: bool
+        """
+        return self.may_continue(self._states_after(segments))
+
+    def matches_all_under(self, segments):
+        u"""
+        Tests if every path inside a directory matches this program. `False` is a conservative
+        answer: some paths may not match.
+
+        :type segments: typing.Sequence[text_type | binary_type]
+        :param segments: Components of the directory path
+        :rtype: bool
+        """
+        return self.accepts_all(self._states_after(segments))
+
+    def start_states(self):
+        u"""
+        Returns the states of the program before matching the first component of a path. The
+        states are a bit mask of the indexes of the next matchers, `next_states` advances them by
+        one component: a directory walker updates the states of a directory from the states of
+        its parent.
+
+        :rtype: int
+        """
+        return self._closures[0]
+
+    def next_states(self, states, segment):
+        u"""
+        Returns the states of the program after matching one more component.
+
+        :type states: int
+        :param states: States after the previous components (see `start_states`)
+        :type segment: text_type | binary_type
+        :rtype: int
+        """
+        matchers = self._matchers
+        closures = self._closures
+        following = 0
+        remaining = states & self._continue_mask
+        while remaining != 0:
+            lowest = remaining & -remaining
+            remaining ^= lowest
+            state = lowest.bit_length() - 1
+            match = matchers[state]
+            if match is DEEP:
+                following |= closures[state]  # The wild star consumes the component
+            elif match(segment):
+                following |= closures[state + 1]
+        return following
+
+    def may_continue(self, states):
+        u"""
+        Tests if a path starting with the components matched by `states` and at least one more
+        component may match this program.
+
+        :type states: int
+        :rtype: bool
+        """
+        # A state that is not the final state can consume at least one more component
+        return states & self._continue_mask != 0
+
+    def accepts_all(self, states):
+        u"""
+        Tests if every path starting with the components matched by `states` and at least one more
+        component matches this program. `False` is a conservative answer.
+
+        :type states: int
+        :rtype: bool
+        """
+        return states & self._accepts_all_mask != 0
+
+    def _states_after(self, segments):
+        u"""
+        Returns the states of the program after matching the leading components of a path.
+
+        :type segments: typing.Sequence[text_type | binary_type]
+        :rtype: int
+        """
+        states = self.start_states()
+        for segment in segments:
+            if states == 0:
+                break
+            states = self.next_states(states, segment)
+        return states
+
+
+def directory_segments(dir_path, binary=False):
+    u"""
+    Splits the path of a directory on its slashes, ignoring its trailing slash: `src/lib/` gives
+    `['src', 'lib']` and the empty path gives no components.
+
+    :type dir_path: text_type | binary_type
+    :type binary: bool
+    :param binary: `dir_path` is a bytes path
+    :rtype: typing.List[text_type | binary_type]
+    """
+    slash = _BINARY_SLASH if binary else _SLASH
+    if dir_path.endswith(slash):
+        dir_path = dir_path[:-1]
+    return dir_path.split(slash) if len(dir_path) > 0 else []
+
+
+def _match_middle(matchers, segments, start, end):
+    u"""
+    Matches the components `segments[start:end]` against matchers starting and ending with a
+    wild star.
+
+    The wild stars are matched with a single backtracking point, as for `*` in glob matching: the
+    last wild star extends its match by one component when the following matchers fail.
+
+    :type matchers: typing.Sequence[typing.Callable[[text_type], bool] | text_type]
+    :type segments: typing.Sequence[text_type]
+    :type start: int
+    :type end: int
+    :rtype: bool
+    """
+    matcher_count = len(matchers) - 1  # The last matcher is a wild star
+    matcher_index = 0
+    segment_index = start
+    deep_index = -1  # Index of the last `DEEP` matcher
+    deep_segment_index = start  # Index of the first component not matched by this `DEEP`
+    while segment_index < end:
+        if matcher_index < matcher_count:
+            match = matchers[matcher_index]
+            if match is DEEP:
+                deep_index = matcher_index
+                deep_segment_index = segment_index
+                matcher_index += 1
+                continue
+            if match(segments[segment_index]):
+                matcher_index += 1
+                segment_index += 1
+                continue
+        elif matcher_index == matcher_count:
+            return True  # The last wild star matches the remaining components
+        # Backtrack: the last `DEEP` matches one more component
+        matcher_index = deep_index + 1
+        deep_segment_index += 1
+        segment_index = deep_segment_index
+    while matcher_index < matcher_count and matchers[matcher_index] is DEEP:
+        matcher_index += 1
+    return matcher_index == matcher_count
+
+
+def _component_matcher(instruction, arg):
+    u"""
+    Returns a function matching a single component.
+
+    :type instruction: text_type
+    :rtype: typing.Callable[[text_type], bool]
+    """
+    if instruction == LITERAL:
+        return lambda segment: segment == arg
+    elif instruction == ANY:
+        return _any_component
+    elif instruction == PREFIX:
+        return lambda segment: segment.startswith(arg)
+    elif instruction == SUFFIX:
+        return lambda segment: segment.endswith(arg)
+    elif instruction == CONTAINS:
+        return lambda segment: arg in segment
+    elif instruction == REGEX:
+        regex_match = arg.match
+        return lambda segment: regex_match(segment) is not None
+    raise ValueError(u'Unknown instruction: {}'.format(repr(instruction)))
+
+
+def _any_component(segment):
+    u"""
+    Matches any component.
+
+    :type segment: text_type
+    :rtype: bool
+    """
+    return True
+
+
+def _accepts_all(matchers):
+    u"""
+    Tests if a list of component matchers accepts any non-empty list of components. `False` is a
+    conservative answer.
+
+    :type matchers: typing.Sequence[typing.Callable[[text_type], bool] | text_type]
+    :rtype: bool
+    """
+    others = [match for match in matchers if match is not DEEP]
+    return len(others) < len(matchers) and len(others) <= 1 and \
+        all(match is _any_component for match in others)
@@ -0,0 +1,95 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes the filtering of binary streams of paths, such as the output of
+`git ls-files -z` or `find -print0`.
+
+The streams are read in large chunks split with `bytes.split`: the paths are never read nor
+written one at a time. Use NUL separators for the paths containing newlines. The paths are bytes,
+they must be matched by bytes patterns (see `WildmatchPattern`).
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+# noinspection PyCompatibility
+import typing
+
+from six import binary_type
+from six.moves import filter as lazy_filter, filterfalse
+
+# Separators of the paths
+NEWLINE = b'\n'
+NUL = b'\0'
+
+# Default size of the chunks read from the streams, in bytes
+CHUNK_SIZE = 1 << 20
+
+
+def read_paths(source, separator=NEWLINE, chunk_size=None):
+    u"""
+    Returns a generator yielding the paths of a binary stream, by batches. Each batch holds the
+    paths completed by a chunk of the stream. The last path may lack its separator.
+
+    :type source: typing.BinaryIO
+    :param source: The binary stream to read
+    :type separator: binary_type
+    :param separator: The separator of the paths, `NEWLINE` or `NUL`
+    :type chunk_size: int | None
+    :param chunk_size: Size of the chunks read from the stream, `CHUNK_SIZE` by default
+    :rtype: typing.Generator[typing.List[binary_type]]
+    """
+    if chunk_size is None:
+        chunk_size = CHUNK_SIZE
+    read = source.read
+    remainder = b''  # Incomplete last path of the previous chunk
+    while True:
+        chunk = read(chunk_size)
+        if len(chunk) == 0:
+            break
+        paths = (remainder + chunk if len(remainder) > 0 else chunk).split(separator)
+        remainder = paths.pop()
+        if len(paths) > 0:
+            yield paths
+    if len(remainder) > 0:
+        yield [remainder]
+
+
+def filter_stream(match, source, output, separator=NEWLINE, output_separator=None,
+                  invert=False, chunk_size=None):
+    u"""
+    Writes the paths of a binary stream accepted by `match` to `output`, each one followed by
+    `output_separator`. The paths of each chunk are written at once.
+
+    :type match: typing.Callable[[binary_type], bool]
+    :param match: The matcher of a single path, for example `PathspecList.match`
+    :type source: typing.BinaryIO
+    :param source: The binary stream to read
+    :type output: typing.BinaryIO
+    :param output: The binary stream receiving the matched paths
+    :type separator: binary_type
+    :param separator: The separator of the paths of `source`, `NEWLINE` or `NUL`
+    :type output_separator: binary_type | None
+    :param output_separator: The separator of the written paths, `separator` by default
+    :type invert: bool
+    :param invert: Write the paths rejected by `match` instead
+    :type chunk_size: int | None
+    :param chunk_size: Size of the chunks read from `source`, `CHUNK_SIZE` by default
+    :rtype: int
+    :return: The number of written paths
+    """
+    if output_separator is None:
+        output_separator = separator
+    select = filterfalse if invert else lazy_filter
+    write = output.write
+    count = 0
+    for paths in read_paths(source, separator, chunk_size):
+        selected = list(select(match, paths))
+        if len(selected) > 0:
+            count += len(selected)
+            selected.append(b'')  # Trailing separator
+            write(output_separator.join(selected))
+    return count
@@ -0,0 +1,469 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes the parser of wildmatch patterns and the immutable syntax tree it produces.
+
+A parsed pattern is a tuple of nodes: `Literal`, `Asterisk`, `QuestionMark`, `WildStar` and
+`BracketExpression`. The items of a bracket expression are `CollatingElement`, `EquivalenceClass`,
+`CharacterClass` and `Range` nodes. The nodes are hashable and compare by type and value, the
+backends of the `wildmatch` module (regular expression, fast path, native engine and required
+literals) all consume them.
+
+The parser makes a single pass over the pattern: runs of literal characters are consumed at once,
+and the bracket expressions are memoized by source text since rule files repeat the same
+expressions (`[Bb]in`, `*.py[cod]`...).
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+from collections import namedtuple
+import re
+# noinspection PyCompatibility
+import typing
+
+from six import text_type
+
+
+_SLASH = u'/'  # Path separator
+_ASTERISK = u'*'
+_WILD_STAR = u'**'
+_QUESTION_MARK = u'?'
+_ESCAPE = u'\\'
+
+# Bracket expression
+_BE_OPEN = u'['
+_BE_NON_MATCHING = u'!'  # Characters negating the bracket expression
+_BE_NON_MATCHING2 = u'^'  # POSIX allows to use it as an alternative (git's `wildmatch` uses it)
+_BE_CLOSE = u']'
+_BE_CS_OPEN = u'[.'  # Collating symbol
+_BE_ECE_OPEN = u'[='  # Equivalence class expression
+_BE_CCE_OPEN = u'[:'  # Character class expression
+_BE_CS_CLOSE = u'.]'  # Collating symbol
+_BE_ECE_CLOSE = u'=]'  # Equivalence class expression
+_BE_CCE_CLOSE = u':]'  # Character class expression
+_BE_RANGE = u'-'
+
+# Runs of characters without special meaning, with and without backslash escaping
+_LITERAL_RUN = re.compile(u'[^\\\\*?\\[]+')
+_NO_ESCAPE_LITERAL_RUN = re.compile(u'[^*?\\[]+')
+
+# Likely source of a bracket expression, only used to look up the memoized bracket expressions
+_BE_SOURCE = re.compile(u'\\[[!^]?\\]?'
+                        u'(?:\\[\\..*?\\.\\]|\\[=.*?=\\]|\\[:.*?:\\]|\\\\.|[^\\]])*\\]',
+                        re.DOTALL)
+
+# Parsed bracket expressions by `(source, no_escape)`, cleared when it reaches its maximum size
+_MAX_MEMOIZED_BRACKET_EXPRESSIONS = 4096
+_bracket_expressions = {}  # type: typing.Dict[typing.Tuple[text_type, bool], BracketExpression]
+
+# Dash of a bracket expression before the resolution of the ranges
+_UNMATCHED_RANGE = object()
+
+
+class Node(object):
+    u"""
+    Base class of the nodes: the nodes of different types never compare equal.
+    """
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return type(self) is type(other) and tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self).__name__,) + tuple(self))
+
+
+class Literal(Node, namedtuple(u'Literal', [u'text'])):
+    u"""
+    Consecutive characters matching themselves (escape sequences are resolved).
+    """
+    __slots__ = ()
+
+
+class Asterisk(Node, namedtuple(u'Asterisk', [])):
+    u"""
+    `*`: any sequence of characters (without slashes with the `path_name` flag).
+    """
+    __slots__ = ()
+
+
+class QuestionMark(Node, namedtuple(u'QuestionMark', [])):
+    u"""
+    `?`: any single character (except a slash with the `path_name` flag).
+    """
+    __slots__ = ()
+
+
+class WildStar(Node, namedtuple(u'WildStar', [u'trailing'])):
+    u"""
+    `**`: any number of directories. A trailing wild star (`foo/**`) matches any text, the other
+    wild stars (`**/foo`, `foo/**/bar`) include the following slash.
+    """
+    __slots__ = ()
+
+
+class BracketExpression(Node, namedtuple(u'BracketExpression', [u'matching', u'items'])):
+    u"""
+    `[...]`: a single character (or collating element) from a set, `matching` is `False` for a
+    negated expression (`[!...]`). The `items` are a tuple of `CollatingElement`,
+    `EquivalenceClass`, `CharacterClass` and `Range` nodes.
+    """
+    __slots__ = ()
+
+
+class CollatingElement(Node, namedtuple(u'CollatingElement', [u'sequence'])):
+    u"""
+    A character, or a multi-character collating symbol (`[.ch.]`).
+    """
+    __slots__ = ()
+
+
+class EquivalenceClass(Node, namedtuple(u'EquivalenceClass', [u'representant'])):
+    u"""
+    `[=e=]`, equivalence classes are not supported: it only matches its representant.
+    """
+    __slots__ = ()
+
+
+class CharacterClass(Node, namedtuple(u'CharacterClass', [u'name'])):
+    u"""
+    `[:alpha:]`, see the `charclass` module.
+    """
+    __slots__ = ()
+
+
+class Range(Node, namedtuple(u'Range', [u'start', u'end'])):
+    u"""
+    `a-z`, an inclusive range between two collating elements.
+    """
+    __slots__ = ()
+
+
+_ASTERISK_NODE = Asterisk()
+_QUESTION_MARK_NODE = QuestionMark()
+
+
+def parse(pattern, no_escape=False, wild_star=True):
+    u"""
+    Parses a wildmatch pattern into a tuple of nodes (literals, asterisks, question marks, bracket
+    expressions and wild stars). Consecutive literal characters are merged in a single node.
+
+    :type pattern: text_type
+    :param pattern: A wildmatch pattern (bytes patterns are decoded by the caller)
+    :type no_escape: bool
+    :param no_escape: Disable backslash escaping
+    :type wild_star: bool
+    :param wild_star: Parse the double-asterisk `**` as a wild star
+    :rtype: typing.Tuple[Node, ...]
+    """
+    nodes = []
+    literal = []  # Pending literal characters
+    literal_run = _NO_ESCAPE_LITERAL_RUN if no_escape else _LITERAL_RUN
+    size = len(pattern)
+
+    i = 0
+    while i < size:
+        char = pattern[i]
+
+        if char == _ESCAPE and not no_escape:  # Literal escape \
+            i += 1
+            if i >= size:
+                raise ValueError(u'Invalid pattern, incomplete escape sequence')
+            literal.append(pattern[i])
+            i += 1
+            continue
+
+        if char != _BE_OPEN and char != _ASTERISK and char != _QUESTION_MARK:  # Literal
+            run = literal_run.match(pattern, i)
+            literal.append(run.group())
+            i = run.end()
+            continue
+
+        if len(literal) > 0:
+            nodes.append(Literal(u''.join(literal)))
+            literal = []
+
+        if char == _BE_OPEN:  # Bracket expression [a]
+            be, be_len = _parse_memoized_bracket_expression(pattern, i, no_escape)
+            nodes.append(be)
+            i += be_len
+        elif wild_star and pattern.startswith(_WILD_STAR, i):  # Wild star (before asterisk)
+            if i > 0 and pattern[i - 1] != _SLASH:
+                raise ValueError(u'Invalid pattern: wild star ** can only start pattern or '
+                                 u'follow a slash')
+            i += len(_WILD_STAR)
+            trailing = False  # Wild star at the end of the string
+            while True:  # Consume stars, example: foo/**/****/***/bar is equivalent to foo/**/bar
+                if i == size:
+                    trailing = True
+                    break
+                if pattern[i] == _ASTERISK:
+                    i += len(_ASTERISK)
+                elif pattern[i] == _SLASH:
+                    if pattern.startswith(_WILD_STAR, i + len(_SLASH)):
+                        i += len(_SLASH) + len(_WILD_STAR)
+                    else:
+                        i += len(_SLASH)
+                        break
+                else:
+                    raise ValueError(u'Invalid pattern: wild star ** can only end pattern or '
+                                     u'be followed by a slash')
+            # Pattern like ** or foo/** (trailing), or like **/foo or foo/**/bar (the slash
+            # following ** is already consumed)
+            nodes.append(WildStar(trailing))
+        elif char == _ASTERISK:  # Asterisk *
+            nodes.append(_ASTERISK_NODE)
+            i += len(_ASTERISK)
+        else:  # Question mark ?
+            nodes.append(_QUESTION_MARK_NODE)
+            i += len(_QUESTION_MARK)
+
+    if len(literal) > 0:
+        nodes.append(Literal(u''.join(literal)))
+
+    return tuple(nodes)
+
+
+def _parse_memoized_bracket_expression(pattern, start, no_escape):
+    u"""
+    Returns `parse_bracket_expression(pattern, start, no_escape)`, using the memoized expressions.
+
+    The parser never reads past the end of the expression: if a memoized source starts at
+    `start`, it is the source of the expression. `_BE_SOURCE` only guesses the source to look up.
+
+    :rtype: typing.Tuple[BracketExpression, int]
+    """
+    source = _BE_SOURCE.match(pattern, start)
+    if source is not None:
+        be = _bracket_expressions.get((source.group(), no_escape))
+        if be is not None:
+            return be, source.end() - start
+
+    be, be_len = parse_bracket_expression(pattern, start, no_escape=no_escape)
+    if len(_bracket_expressions) >= _MAX_MEMOIZED_BRACKET_EXPRESSIONS:
+        _bracket_expressions.clear()
+    _bracket_expressions[(pattern[start:start + be_len], no_escape)] = be
+    return be, be_len
+
+
+def parse_bracket_expression(pattern, start=0, no_escape=False):
+    u"""
+    Parses the bracket expression starting at the index `start` of `pattern`.
+
+    :type pattern: text_type
+    :param pattern: A wildmatch pattern
+    :type start: int
+    :param start: Index of the opening bracket
+    :type no_escape: bool
+    :param no_escape: Disable backslash escaping
+    :rtype: typing.Tuple[BracketExpression, int]
+    :return: The bracket expression and the length of its source
+    """
+    i = start
+    size = len(pattern)
+
+    if not pattern.startswith(_BE_OPEN, i):
+        raise ValueError(u'Expected {}'.format(repr(_BE_OPEN)))
+    i += len(_BE_OPEN)
+
+    # fnmatch builds on top of POSIX, but uses `!` while POSIX uses `^`
+    if pattern.startswith(_BE_NON_MATCHING, i):
+        matching = False
+        i += len(_BE_NON_MATCHING)
+    elif pattern.startswith(_BE_NON_MATCHING2, i):
+        matching = False
+        i += len(_BE_NON_MATCHING2)
+    else:
+        matching = True
+
+    # We iterate other the items twice, first we get the tokens and parse most of it except for
+    # ranges. Then, we resolve ranges by joining collating elements separated by an empty range
+    # marker
+
+    # Items in this bracket expression
+    items = []
+
+    # First pass: tokenize
+    while len(items) == 0 or not pattern.startswith(_BE_CLOSE, i):
+        char = pattern[i:i + 1]
+        if char == _ESCAPE and not no_escape:  # Literal escape \a
+            i += len(_ESCAPE)
+            if i >= size:
+                raise ValueError(u'Invalid pattern, incomplete escape sequence')
+            items.append(CollatingElement(pattern[i]))
+            i += 1
+        elif char == _BE_OPEN and pattern.startswith(_BE_CS_OPEN, i):  # Collating symbol [.ab.]
+            cs, i = _parse_delimited(pattern, i, _BE_CS_OPEN, _BE_CS_CLOSE,
+                                     u'collating symbol')
+            items.append(CollatingElement(cs))
+        elif char == _BE_OPEN and pattern.startswith(_BE_ECE_OPEN, i):  # Equivalence class [=a=]
+            ec_repr, i = _parse_delimited(pattern, i, _BE_ECE_OPEN, _BE_ECE_CLOSE,
+                                          u'equivalence class expression')
+            items.append(EquivalenceClass(ec_repr))
+        elif char == _BE_OPEN and pattern.startswith(_BE_CCE_OPEN, i):  # Character class [:a:]
+            cc_name, i = _parse_delimited(pattern, i, _BE_CCE_OPEN, _BE_CCE_CLOSE,
+                                          u'character class expression')
+            items.append(CharacterClass(cc_name))
+        elif char == _BE_RANGE:  # Range a-c
+            items.append(_UNMATCHED_RANGE)
+            i += len(_BE_RANGE)
+        else:  # Single-character collating element
+            items.append(CollatingElement(char))
+            i += 1
+
+        if i >= size:
+            raise ValueError(u'InvalidPattern, end of bracket expression not found')
+    i += len(_BE_CLOSE)
+
+    # Second pass: resolve ranges
+    items_with_ranges = []
+    j = 0
+    while j < len(items):
+        item = items[j]
+        if item is not _UNMATCHED_RANGE:
+            items_with_ranges.append(item)
+        else:
+            # From here, the current item is an unmatched range, we try to get the previous and next
+            # item if they are collating elements
+            if j == 0:
+                prev_elem = None
+            else:
+                prev_elem = items_with_ranges[-1]
+                if type(prev_elem) is not CollatingElement:
+                    prev_elem = None
+            if j == len(items) - 1:
+                next_elem = None
+            else:
+                next_elem = items[j + 1]
+                # case [a--], [---] or [[.a.]--]
+                if prev_elem is not None and next_elem is _UNMATCHED_RANGE:
+                    next_elem = CollatingElement(_BE_RANGE)
+                elif type(next_elem) is not CollatingElement:
+                    next_elem = None
+
+            # Unmatched dash between two collating elements
+            if prev_elem is not None and next_elem is not None:
+                # Note that we allow ranges between multi-character collating elements
+                items_with_ranges[-1] = Range(prev_elem.sequence, next_elem.sequence)
+                j += 1  # Skip the next item (corresponds to the end of the range)
+            # Add the dash as a collating element
+            else:
+                items_with_ranges.append(CollatingElement(_BE_RANGE))
+        j += 1
+
+    return BracketExpression(matching, tuple(items_with_ranges)), i - start
+
+
+def validate(nodes):
+    u"""
+    Raises `ValueError` for the bracket expressions accepted by the parser but rejected by the
+    backends: ranges between multi-character collating elements or with bounds in the wrong order,
+    empty collating elements and negated expressions with multi-character collating elements.
+
+    The lazy patterns are validated when they are parsed, before their translation.
+
+    :type nodes: typing.Iterable[Node]
+    :param nodes: Nodes returned by `parse`
+    :rtype: None
+    """
+    for node in nodes:
+        if isinstance(node, BracketExpression):
+            _validate_bracket_expression(node)
+
+
+def _validate_bracket_expression(bracket_expression):
+    u"""
+    :type bracket_expression: BracketExpression
+    :rtype: None
+    """
+    multi_chars = False
+    for item in bracket_expression.items:
+        if isinstance(item, Range):
+            if len(item.start) != 1 or len(item.end) != 1:
+                raise ValueError(u'Ranges are only supported between single-char collating elems')
+            if item.start > item.end:
+                raise ValueError(u'Invalid range, wrong order of bounds: {}'.format(
+                    (item.start, item.end)))
+        elif isinstance(item, (CollatingElement, EquivalenceClass)):
+            sequence = item.sequence if isinstance(item, CollatingElement) else item.representant
+            if len(sequence) == 0:
+                raise ValueError(u'Empty string is not a valid collating element')
+            multi_chars = multi_chars or len(sequence) > 1
+    if multi_chars and not bracket_expression.matching:
+        raise ValueError(u'Cannot perform negative match on bracket expression containing '
+                         u'multi-character collating elements')
+
+
+def _parse_delimited(pattern, start, opening, closing, description):
+    u"""
+    Parses the collating symbols (`[.ch.]`), equivalence class expressions (`[=e=]`) and
+    character class expressions (`[:alpha:]`).
+
+    POSIX allows to define local-dependent digraphs and other groups of characters that should be
+    treated as a single character (collating symbols), and equivalences between collating symbols
+    (for example, 'e', 'é', 'è' and 'ê' are members of the same equivalence class in the french
+    locale). These are locale dependent behaviors: we do not support them. A collating symbol
+    or an equivalence class expression only matches its own sequence.
+
+    :type pattern: text_type
+    :type start: int
+    :param start: Index of the opening delimiter
+    :type opening: text_type
+    :type closing: text_type
+    :type description: text_type
+    :param description: Name of the expression, for the error messages
+    :rtype: typing.Tuple[text_type, int]
+    :return: The content between the delimiters and the index following the closing delimiter
+    """
+    content_start = start + len(opening)
+    content_end = pattern.find(closing, content_start)
+    if content_end < 0:
+        raise ValueError(u'Invalid pattern, end of {} not found'.format(description))
+    return pattern[content_start:content_end], content_end + len(closing)
+
+
+# Node types by name, for `load`
+_NODE_TYPES = dict((text_type(node_type.__name__), node_type) for node_type in (
+    Literal, Asterisk, QuestionMark, WildStar, BracketExpression, CollatingElement,
+    EquivalenceClass, CharacterClass, Range))
+
+
+def dump(nodes):
+    u"""
+    Converts parsed nodes to nested tuples of builtin values (for example to serialize them with
+    `marshal`): each node becomes a tuple of its type name and its fields.
+
+    :type nodes: typing.Iterable[Node]
+    :rtype: tuple
+    """
+    return tuple(_dump_node(node) for node in nodes)
+
+
+def load(data):
+    u"""
+    Converts the result of `dump` back to nodes.
+
+    :type data: typing.Iterable[tuple]
+    :rtype: typing.Tuple[Node, ...]
+    """
+    return tuple(_load_node(node_data) for node_data in data)
+
+
+def _dump_node(node):
+    if isinstance(node, BracketExpression):
+        return text_type(type(node).__name__), node.matching, dump(node.items)
+    return (text_type(type(node).__name__),) + tuple(node)
+
+
+def _load_node(node_data):
+    node_type = _NODE_TYPES[node_data[0]]
+    if node_type is BracketExpression:
+        return BracketExpression(node_data[1], load(node_data[2]))
+    return node_type(*node_data[1:])
@@ -0,0 +1,157 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the aio module (Python 3.6+)
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from pathmatch import walker
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.pathspec import Pathspec, PathspecList
+
+try:
+    import asyncio
+    from pathmatch import aio
+except (ImportError, SyntaxError):  # Python 2
+    asyncio = aio = None
+
+
+_PATHS = [u'src/main.py', u'src/main.pyc', u'build/lib/main.py', u'docs/index.rst', u'setup.py',
+          u'node_modules/a/index.js', u'README.md', u'src/build/gen.py']
+
+
+def _gitignore(*rules):
+    return PathspecList(Pathspec(GitmatchPattern(rule.lstrip(u'!')), rule.startswith(u'!'))
+                        for rule in rules)
+
+
+def _collect(loop, async_iterable):
+    u"""
+    Returns the items of an asynchronous iterable (`async for` is not valid Python 2 syntax).
+    """
+    iterator = async_iterable.__aiter__()
+    items = []
+    while True:
+        try:
+            items.append(loop.run_until_complete(iterator.__anext__()))
+        except StopAsyncIteration:
+            return items
+
+
+class _AsyncList(object):
+    u"""
+    Asynchronous iterable over the items of a list.
+    """
+
+    def __init__(self, items):
+        self.items = iter(items)
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        future = asyncio.get_event_loop().create_future()
+        try:
+            future.set_result(next(self.items))
+        except StopIteration:
+            future.set_exception(StopAsyncIteration())
+        return future
+
+
+@unittest.skipIf(aio is None, u'asyncio is not available')
+class TestAfilter(unittest.TestCase):
+    u"""
+    TestCase for the afilter function
+    """
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def test_afilter(self):
+        pathspecs = _gitignore(u'*.py', u'!/build/')
+        paths = _PATHS * 300
+        expected = list(pathspecs.filter(paths))
+        self.assertEqual(expected, _collect(self.loop, pathspecs.afilter(paths)))
+        self.assertEqual(expected, _collect(self.loop, pathspecs.afilter(_AsyncList(paths))))
+        pattern = GitmatchPattern(u'*.py')
+        self.assertEqual(list(pattern.filter(paths)), _collect(self.loop, pattern.afilter(paths)))
+
+    def test_time_slice(self):
+        ticks = []
+
+        def tick():
+            ticks.append(time.time())
+            self.loop.call_soon(tick)
+
+        def slow_match(path):
+            time.sleep(0.0001)
+            return False
+
+        for paths in (_PATHS * 200, _AsyncList(_PATHS * 200)):
+            del ticks[:]
+            self.loop.call_soon(tick)
+            start = time.time()
+            # A single step: no path is matched
+            self.assertEqual([], _collect(self.loop, aio.afilter(slow_match, paths, 0.002)))
+            elapsed = time.time() - start
+            self.assertGreater(len(ticks), 1)
+            self.assertLess(max(b - a for a, b in zip(ticks, ticks[1:])), elapsed)
+
+
+@unittest.skipIf(aio is None or walker.scandir is None, u'asyncio is not available')
+class TestAwalk(unittest.TestCase):
+    u"""
+    TestCase for the awalk function
+    """
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.root = tempfile.mkdtemp()
+        for path in _PATHS + [u'src/pkg{}/mod{}.py'.format(i % 5, i) for i in range(50)]:
+            full_path = os.path.join(self.root, *path.split(u'/'))
+            if not os.path.isdir(os.path.dirname(full_path)):
+                os.makedirs(os.path.dirname(full_path))
+            with open(full_path, u'w'):
+                pass
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def test_awalk(self):
+        for pathspecs in (_gitignore(u'*'), _gitignore(u'*.py', u'!/build/', u'!pkg3/')):
+            expected = sorted(walker.walk(self.root, pathspecs))
+            for concurrency in (1, 4):
+                actual = _collect(self.loop, aio.awalk(self.root, pathspecs,
+                                                       concurrency=concurrency))
+                self.assertEqual(expected, sorted(actual))
+
+    def test_errors(self):
+        errors = []
+        paths = aio.awalk(os.path.join(self.root, u'missing'), _gitignore(u'*'),
+                          onerror=errors.append)
+        self.assertEqual([], _collect(self.loop, paths))
+        self.assertEqual(1, len(errors))
+        with self.assertRaises(ValueError):
+            _collect(self.loop, aio.awalk(self.root, _gitignore(u'*'), concurrency=0))
+
+
+if __name__ == u'__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the batch module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import unittest
+
+from pathmatch import batch
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.pathspec import Pathspec, PathspecList
+from pathmatch.wildmatch import WildmatchPattern
+
+
+_PATHS = [
+    u'',
+    u'build',
+    u'build/',
+    u'build/lib/main.pyc',
+    u'src/build',
+    u'src/build/a',
+    u'src/main.py',
+    u'main.py',
+    u'main.pyc',
+    u'node_modules',
+    u'a/node_modules/b.js',
+    u'x.egg-info/PKG-INFO',
+    u'src/x.egg-info',
+    u'docs/index.md',
+]
+
+_WILDMATCH_PATTERNS = [
+    u'build', u'*.py', u'main*', u'**/main.py', u'**/build/**', u'**/*.md', u'src/*',
+    u'*/build', u'**', u'b?ild',
+]
+
+_GITMATCH_RULES = [
+    u'build', u'*.pyc', u'node_modules/', u'*.egg-info/', u'/src', u'**/*.py', u'main*',
+    u'*build*', u'src/*.py',
+]
+
+
+def _as_list(mask):
+    return [bool(item) for item in mask]
+
+
+class TestMatchMany(unittest.TestCase):
+    u"""
+    TestCase for the `match_many` methods
+    """
+
+    def _check(self, pattern, paths):
+        expected = [pattern.match(path) for path in _PATHS]
+        self.assertEqual(expected, _as_list(pattern.match_many(paths)), pattern.pattern)
+
+    def test_wildmatch(self):
+        for pattern in _WILDMATCH_PATTERNS:
+            for path_name in (True, False):
+                compiled = WildmatchPattern(pattern, path_name=path_name,
+                                            wild_star=path_name)
+                self._check(compiled, _PATHS)
+
+    def test_gitmatch(self):
+        for rule in _GITMATCH_RULES:
+            self._check(GitmatchPattern(rule), _PATHS)
+
+    def test_pathspec_list(self):
+        pathspecs = PathspecList([
+            Pathspec(GitmatchPattern(u'*.py')),
+            Pathspec(GitmatchPattern(u'build')),
+            Pathspec(GitmatchPattern(u'main.py'), negated=True),
+            Pathspec(GitmatchPattern(u'**/b[a-z]ild/lib')),
+        ])
+        expected = [pathspecs.match(path) for path in _PATHS]
+        self.assertEqual(expected, _as_list(pathspecs.match_many(_PATHS)))
+        if batch.numpy is not None:
+            mask = pathspecs.match_many(batch.numpy.array(_PATHS))
+            self.assertEqual(expected, _as_list(mask))
+        self.assertEqual([False] * len(_PATHS), _as_list(PathspecList([]).match_many(_PATHS)))
+
+    def test_mask_type(self):
+        mask = WildmatchPattern(u'*.py').match_many(_PATHS)
+        if batch.numpy is None:
+            self.assertIsInstance(mask, bytearray)
+        else:
+            self.assertEqual(batch.numpy.bool_, mask.dtype.type)
+            self.assertEqual(len(_PATHS), len(mask))
+
+    @unittest.skipIf(batch.numpy is None, u'NumPy is not installed')
+    def test_numpy_arrays(self):
+        numpy = batch.numpy
+        paths = numpy.array(_PATHS)
+        for pattern in _WILDMATCH_PATTERNS:
+            for path_name in (True, False):
+                compiled = WildmatchPattern(pattern, path_name=path_name,
+                                            wild_star=path_name)
+                self._check(compiled, paths)
+        for rule in _GITMATCH_RULES:
+            self._check(GitmatchPattern(rule), paths)
+        for rule in _GITMATCH_RULES:
+            self._check(GitmatchPattern(rule), numpy.array(_PATHS, dtype=object))
+
+    @unittest.skipIf(batch.numpy is None, u'NumPy is not installed')
+    def test_numpy_indexing(self):
+        paths = batch.numpy.array(_PATHS)
+        selected = paths[GitmatchPattern(u'*.py').match_many(paths)]
+        self.assertEqual([u'src/main.py', u'main.py'], selected.tolist())
+
+
+    @unittest.skipIf(batch.numpy is None, u'NumPy is not installed')
+    def test_numpy_bytes_arrays(self):
+        paths = [path.encode(u'utf-8') for path in _PATHS] + [b'\xff/build']
+        array = batch.numpy.array(paths)
+        for rule in _GITMATCH_RULES:
+            pattern = GitmatchPattern(rule.encode(u'utf-8'))
+            expected = [pattern.match(path) for path in paths]
+            self.assertEqual(expected, _as_list(pattern.match_many(array)), rule)
+        pathspecs = PathspecList([Pathspec(GitmatchPattern(b'build')),
+                                  Pathspec(GitmatchPattern(b'/src/build'), negated=True)])
+        expected = [pathspecs.match(path) for path in paths]
+        self.assertEqual(expected, _as_list(pathspecs.match_many(array)))
+
+if __name__ == u'__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the cache module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import unittest
+
+from pathmatch import cache
+import pathmatch.gitmatch as gitmatch
+import pathmatch.wildmatch as wildmatch
+
+
+class TestPatternCache(unittest.TestCase):
+    u"""
+    TestCase for the PatternCache class
+    """
+
+    def test_hits_and_misses(self):
+        pattern_cache = cache.PatternCache(max_size=2)
+        self.assertEqual(u'A', pattern_cache.get(u'a', lambda: u'A'))
+        self.assertEqual(u'A', pattern_cache.get(u'a', lambda: u'unexpected'))
+        self.assertEqual(cache.CacheInfo(1, 1, 0, 1, 2), pattern_cache.info())
+
+    def test_eviction(self):
+        pattern_cache = cache.PatternCache(max_size=2)
+        pattern_cache.get(u'a', lambda: u'A')
+        pattern_cache.get(u'b', lambda: u'B')
+        pattern_cache.get(u'a', lambda: u'A')  # `b` is now the least recently used entry
+        pattern_cache.get(u'c', lambda: u'C')
+        self.assertEqual(cache.CacheInfo(1, 3, 1, 2, 2), pattern_cache.info())
+        self.assertEqual(u'A', pattern_cache.get(u'a', lambda: u'unexpected'))
+        self.assertEqual(u'B2', pattern_cache.get(u'b', lambda: u'B2'))
+
+    def test_resize_and_clear(self):
+        pattern_cache = cache.PatternCache(max_size=3)
+        for key in (u'a', u'b', u'c'):
+            pattern_cache.get(key, lambda: key.upper())
+        pattern_cache.max_size = 1
+        self.assertEqual(cache.CacheInfo(0, 3, 2, 1, 1), pattern_cache.info())
+        pattern_cache.clear()
+        self.assertEqual(cache.CacheInfo(0, 0, 0, 0, 1), pattern_cache.info())
+
+    def test_disabled(self):
+        pattern_cache = cache.PatternCache(max_size=0)
+        pattern_cache.get(u'a', lambda: u'A')
+        pattern_cache.get(u'a', lambda: u'A')
+        self.assertEqual(cache.CacheInfo(0, 2, 0, 0, 0), pattern_cache.info())
+        with self.assertRaises(ValueError):
+            pattern_cache.max_size = -1
+
+    def test_errors_are_not_cached(self):
+        pattern_cache = cache.PatternCache()
+
+        def factory():
+            raise ValueError(u'Invalid pattern')
+
+        with self.assertRaises(ValueError):
+            pattern_cache.get(u'a', factory)
+        self.assertEqual(0, pattern_cache.info().size)
+
+
+class TestSharedCache(unittest.TestCase):
+    u"""
+    TestCase for the shared cache used by the module functions
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_wildmatch_functions(self):
+        self.assertTrue(wildmatch.match(u'*.py', u'setup.py'))
+        self.assertFalse(wildmatch.match(u'*.py', u'setup.pyc'))
+        self.assertEqual([u'setup.py'], list(wildmatch.filter(u'*.py', [u'setup.py', u'a.txt'])))
+        # `match` and `filter` use different default flags
+        self.assertEqual((1, 2), cache.info()[:2])
+
+    def test_gitmatch_functions(self):
+        self.assertTrue(gitmatch.match(u'build', u'src/build/a.txt'))
+        self.assertEqual([u'build'], list(gitmatch.filter(u'build', [u'build', u'src'])))
+        self.assertIs(gitmatch.translate(u'build'), gitmatch.translate(u'build'))
+        self.assertEqual((3, 1), cache.info()[:2])
+
+    def test_open_regex(self):
+        pattern = wildmatch.WildmatchPattern(u'foo/*')
+        self.assertIs(pattern.translate(closed_regex=False), pattern.translate(closed_regex=False))
+
+
+if __name__ == u'__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the charclass module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import unittest
+
+from pathmatch import charclass
+from pathmatch import wildmatch
+from pathmatch.wildmatch import WildmatchPattern
+
+
+class TestCharacterClasses(unittest.TestCase):
+    u"""
+    TestCase for the character class tables
+    """
+
+    def contains(self, name, char, binary=False, case_fold=False):
+        ranges = charclass.character_class_ranges(name, binary=binary, case_fold=case_fold)
+        return any(start <= char <= end for start, end in ranges)
+
+    def test_unicode_classes(self):
+        self.assertTrue(self.contains(u'alpha', u'\xe9'))
+        self.assertTrue(self.contains(u'alpha', u'中'))
+        self.assertFalse(self.contains(u'alpha', u'1'))
+        self.assertTrue(self.contains(u'digit', u'٣'))  # Arabic-Indic digit three
+        self.assertFalse(self.contains(u'digit', u'\xb2'))  # Superscript two
+        self.assertTrue(self.contains(u'upper', u'\xc9'))
+        self.assertFalse(self.contains(u'upper', u'\xe9'))
+        self.assertTrue(self.contains(u'upper', u'\xe9', case_fold=True))
+        self.assertTrue(self.contains(u'space', u'　'))
+        self.assertTrue(self.contains(u'space', u'\n'))
+        self.assertTrue(self.contains(u'blank', u'\xa0'))
+        self.assertFalse(self.contains(u'blank', u'\n'))
+        self.assertTrue(self.contains(u'punct', u'\xab'))
+        self.assertTrue(self.contains(u'punct', u'+'))
+        self.assertFalse(self.contains(u'xdigit', u'Ａ'))  # Fullwidth A
+        self.assertFalse(self.contains(u'graph', u' '))
+        self.assertTrue(self.contains(u'print', u' '))
+        self.assertFalse(self.contains(u'print', u'\ud800'))
+
+    def test_ascii_classes(self):
+        self.assertFalse(self.contains(u'alpha', u'\xe9', binary=True))
+        self.assertTrue(self.contains(u'alpha', u'e', binary=True))
+        self.assertFalse(self.contains(u'space', u'\x85', binary=True))
+        self.assertTrue(self.contains(u'lower', u'E', binary=True, case_fold=True))
+
+    def test_shared_tables(self):
+        ranges = charclass.character_class_ranges(u'alnum')
+        self.assertIs(ranges, charclass.character_class_ranges(u'alnum'))
+        self.assertEqual(ranges, charclass.merge_ranges(ranges))
+
+    def test_unknown_class(self):
+        self.assertFalse(charclass.is_character_class(u'spaci'))
+        with self.assertRaises(ValueError):
+            charclass.character_class_ranges(u'spaci')
+
+    def test_merge_ranges(self):
+        self.assertEqual(((u'a', u'f'), (u'x', u'z')),
+                         charclass.merge_ranges([(u'x', u'z'), (u'd', u'f'), (u'a', u'c')]))
+        self.assertEqual(((u'a', u'z'),), charclass.merge_ranges([(u'a', u'z'), (u'b', u'c')]))
+        self.assertEqual((), charclass.merge_ranges([(u'z', u'a')]))
+
+    def test_bracket_expressions(self):
+        for engine in (wildmatch.ENGINE_REGEX, wildmatch.ENGINE_NATIVE):
+            alpha = WildmatchPattern(u'[[:alpha:]]*', engine=engine)
+            self.assertTrue(alpha.match(u'\xe9t\xe9'))
+            self.assertFalse(alpha.match(u'1.txt'))
+            self.assertTrue(WildmatchPattern(u'[![:digit:]]', engine=engine).match(u'a'))
+            self.assertFalse(WildmatchPattern(u'[![:digit:]]', engine=engine).match(u'٣'))
+            # The path_name flag removes the slash from the classes
+            self.assertFalse(WildmatchPattern(u'a[[:punct:]]b', engine=engine).match(u'a/b'))
+            self.assertTrue(WildmatchPattern(u'a[[:punct:]]b', engine=engine).match(u'a-b'))
+            # An unknown class never matches, even negated
+            self.assertFalse(WildmatchPattern(u'[![:spaci:]]', engine=engine).match(u'a'))
+
+    def test_single_character_set(self):
+        self.assertNotIn(u'|', wildmatch.translate(u'[a-c[:digit:]x-z]').pattern)
+        # The supplementary planes of large classes are tested in a second set
+        self.assertLessEqual(wildmatch.translate(u'[[:alpha:][:digit:]]').pattern.count(u'|'), 1)
+        for pattern in (u'[[:alpha:]]', u'[![:alpha:]]'):
+            regex = wildmatch.translate(pattern)
+            native_matcher = WildmatchPattern(pattern, engine=wildmatch.ENGINE_NATIVE)
+            for text in (u'a', u'1', u'/', u'\U00020000', u'\U0001f600'):
+                self.assertEqual(native_matcher.match(text), regex.match(text) is not None,
+                                 (pattern, text))
+
+
+if __name__ == u'__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the cli module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from pathmatch import cli
+from pathmatch import stream
+
+
+_PATHS = b'src/main.py\nsrc/main.pyc\nbuild/lib/main.py\ndocs/index.rst\nsetup.py\nREADME.md\n'
+
+
+class TestMain(unittest.TestCase):
+    u"""
+    TestCase for the main function
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_main(self, argv, data=_PATHS):
+        u"""
+        Returns the exit status and the output of the command.
+        """
+        stdout = io.BytesIO()
+        status = cli.main(argv, stdin=io.BytesIO(data), stdout=stdout)
+        return status, stdout.getvalue()
+
+    def write_file(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, u'wb') as output:
+            output.write(data)
+        return path
+
+    def test_wildmatch(self):
+        self.assertEqual((0, b'src/main.py\nbuild/lib/main.py\nsetup.py\n'),
+                         self.run_main([u'**/*.py']))
+        self.assertEqual((0, b'setup.py\n'), self.run_main([u'*.py']))
+        self.assertEqual((0, b'src/main.py\nsetup.py\n'), self.run_main([u'*.py', u'src/*.py']))
+        self.assertEqual((1, b''), self.run_main([u'*.txt']))
+        self.assertEqual((0, b'README.md\n'), self.run_main([u'--case-fold', u'readme.MD']))
+
+    def test_flags(self):
+        self.assertEqual((0, b'src/main.py\nbuild/lib/main.py\nsetup.py\n'),
+                         self.run_main([u'--no-wild-star', u'--no-path-name', u'*.py']))
+        self.assertEqual((0, b'*.py\n'), self.run_main([u'\\*.py'], b'*.py\nsetup.py\n'))
+        self.assertEqual((0, b'\\a.py\n'),
+                         self.run_main([u'--no-escape', u'\\*.py'], b'\\a.py\na.py\n'))
+
+    def test_gitmatch(self):
+        self.assertEqual((0, b'src/main.py\nbuild/lib/main.py\nsetup.py\n'),
+                         self.run_main([u'--gitmatch', u'*.py']))
+        self.assertEqual((0, b'src/main.pyc\ndocs/index.rst\nREADME.md\n'),
+                         self.run_main([u'-g', u'-v', u'*.py']))
+
+    def test_rules(self):
+        rules = self.write_file(u'.gitignore', b'# Comment\n\n*.py  \n!/build/\n\\#main.py\n')
+        self.assertEqual((0, b'src/main.py\nsetup.py\n#main.py\n'),
+                         self.run_main([u'-R', u'--rules', rules], _PATHS + b'#main.py\n'))
+        self.assertEqual((0, b'src/main.py\nbuild/lib/main.py\nsetup.py\n'),
+                         self.run_main([u'-R', u'--rules', rules, u'-g', u'/build/**']))
+        self.assertEqual((0, b'src/main.py\nbuild/lib/main.py\nsetup.py\n'),
+                         self.run_main([u'--rules', rules]))
+        self.assertEqual((2, b''), self.run_main([u'--rules', rules + u'.missing']))
+
+    def test_inputs(self):
+        first = self.write_file(u'first', b'a.py\nb.txt\n')
+        second = self.write_file(u'second', b'c.py')  # Without trailing newline
+        self.assertEqual((0, b'a.py\nsetup.py\nc.py\n'),
+                         self.run_main([u'*.py', u'-i', first, u'-i', u'-', u'-i', second]))
+        self.assertEqual((2, b''), self.run_main([u'*.py', u'-i', first + u'.missing']))
+        self.assertEqual((2, b''), self.run_main([]))
+
+    def test_chunks(self):
+        data = b''.join(b'dir/file' + str(i).encode(u'ascii') + b'.py\n' for i in range(10000))
+        original_chunk_size = stream.CHUNK_SIZE
+        stream.CHUNK_SIZE = 1000  # Lines span the chunks
+        try:
+            self.assertEqual((0, data), self.run_main([u'**/*.py'], data))
+            self.assertEqual((1, b''), self.run_main([u'-v', u'**/*.py'], data))
+        finally:
+            stream.CHUNK_SIZE = original_chunk_size
+
+    def test_null(self):
+        data = b'src/a\nb.py\0setup.py\0README.md\0'
+        self.assertEqual((0, b'src/a\nb.py\0setup.py\0'), self.run_main([u'-z', u'**/*.py'], data))
+        self.assertEqual((0, b'src/a\nb.py\0README.md\0'),
+                         self.run_main([u'--null', u'-v', u'*.py'], data))
+
+    def test_broken_pipe(self):
+        read_descriptor, write_descriptor = os.pipe()
+        os.close(read_descriptor)  # The reader exited, as `pathmatch '*.py' | head -1`
+        stderr = sys.stderr
+        sys.stderr = io.StringIO()
+        try:
+            with io.open(write_descriptor, u'wb') as stdout:
+                self.assertEqual(0, cli.main([u'**/*.py'], stdin=io.BytesIO(_PATHS),
+                                             stdout=stdout))
+                self.assertEqual(u'', sys.stderr.getvalue())
+                stdout.write(b'setup.py\n')
+                stdout.flush()  # Discarded by the null device
+        finally:
+            sys.stderr = stderr
+
+    def test_bytes(self):
+        self.assertEqual((0, b'\xff\xfe.txt\n'), self.run_main([u'*.txt'], b'\xff\xfe.txt\na\n'))
+
+
+if __name__ == u'__main__':
+    unittest.main()
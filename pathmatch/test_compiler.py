@@ -0,0 +1,63 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the compiler module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import re
+import unittest
+
+from pathmatch import compiler
+from pathmatch import fastpath
+from pathmatch import syntax
+
+
+class TestCompiler(unittest.TestCase):
+    u"""
+    TestCase for the compilation of parsed patterns
+    """
+
+    def test_regex_source(self):
+        nodes = syntax.parse(u'src/*.py[co]')
+        source, flags = compiler.regex_source_from_nodes(nodes, path_name=True, closed_regex=True)
+        regex = re.compile(source, flags)
+        self.assertTrue(regex.match(u'src/main.pyc'))
+        self.assertFalse(regex.match(u'src/a/main.pyc'))
+        self.assertIs(regex.match(u'src/main.pyc\n'), None)
+        self.assertEqual(u'(?:.*\\/)?[^/]*', compiler.pattern_from_nodes(syntax.parse(u'**/*'),
+                                                                        path_name=True))
+
+    def test_binary(self):
+        text_pattern, binary = compiler.decode_pattern(b'**/*\xe9')
+        self.assertTrue(binary)
+        self.assertEqual((u'**/*\xe9', False), compiler.decode_pattern(text_pattern))
+        nodes = syntax.parse(text_pattern)
+        source, flags = compiler.regex_source_from_nodes(nodes, path_name=True, closed_regex=True,
+                                                         binary=True)
+        self.assertTrue(re.compile(source, flags).match(b'a/t\xe9'))
+        fast_path = compiler.fast_path_from_nodes(nodes, path_name=True)
+        self.assertEqual(fastpath.FastPath(fastpath.SUFFIX, u'\xe9', False), fast_path)
+        self.assertEqual(b'\xe9', compiler.encode_fast_path(fast_path).operand)
+        self.assertEqual((b'\xe9',),
+                         compiler.encode_literals(compiler.required_literals_from_nodes(nodes)))
+
+    def test_compile_matcher(self):
+        nodes = syntax.parse(u'*.[ch]')
+        regex = re.compile(*compiler.regex_source_from_nodes(nodes, path_name=True,
+                                                             closed_regex=True))
+        for engine in (compiler.ENGINE_REGEX, compiler.ENGINE_NATIVE):
+            match = compiler.compile_matcher(nodes, lambda: regex, None, path_name=True,
+                                             engine=engine)
+            self.assertTrue(match(u'main.c'))
+            self.assertFalse(match(u'src/main.c'))
+        self.assertIs(None, compiler.compile_matcher(nodes, lambda: regex, None, path_name=True,
+                                                     lazy=True))
+
+
+if __name__ == u'__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the diskcache module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from pathmatch import diskcache
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.pathspec import Pathspec, PathspecList
+from pathmatch.wildmatch import ENGINE_NATIVE, ENGINE_SEGMENT, WildmatchPattern
+
+
+_PATHS = [u'setup.py', u'src/main.py', u'src/main.pyc', u'build/lib/main.py', u'Build/README',
+          u'docs/index.RST', u'docs/', u'a/b/c/d.txt', b'src/main.py']
+
+
+def _results(pattern):
+    results = []
+    for path in _PATHS:
+        try:
+            results.append(pattern.match(path))
+        except TypeError:
+            results.append(None)
+    return results
+
+
+class TestSerialization(unittest.TestCase):
+    u"""
+    TestCase for the serialization of the compiled patterns
+    """
+
+    def assertSameMatcher(self, expected, actual):
+        self.assertIs(type(expected), type(actual))
+        self.assertEqual(expected.pattern, actual.pattern)
+        self.assertEqual(expected.regex.pattern, actual.regex.pattern)
+        self.assertEqual(expected.fast_path, actual.fast_path)
+        self.assertEqual(expected.required_literals(), actual.required_literals())
+        self.assertEqual(_results(expected), _results(actual))
+
+    def test_wildmatch_pattern(self):
+        patterns = [WildmatchPattern(u'**/*.py'), WildmatchPattern(u'src/*.py[co]'),
+                    WildmatchPattern(u'**/b*/**', case_fold=True),
+                    WildmatchPattern(u'*/[[:upper:]]*', engine=ENGINE_NATIVE),
+                    WildmatchPattern(b'src/*.py')]
+        for pattern in patterns:
+            restored = diskcache.loads(diskcache.dumps(pattern))
+            self.assertSameMatcher(pattern, restored)
+            self.assertEqual(pattern.flags, restored.flags)
+            self.assertEqual(pattern.engine, restored.engine)
+            self.assertEqual(pattern.translate(closed_regex=False),
+                             restored.translate(closed_regex=False))
+
+    def test_gitmatch_pattern(self):
+        patterns = [GitmatchPattern(u'*.py'), GitmatchPattern(u'/build/'),
+                    GitmatchPattern(u'docs/*.rst', case_fold=True), GitmatchPattern(b'*.py'),
+                    GitmatchPattern(u'src/*/[a-c]*.py', engine=ENGINE_SEGMENT)]
+        for pattern in patterns:
+            restored = diskcache.loads(diskcache.dumps(pattern))
+            self.assertSameMatcher(pattern, restored)
+            self.assertEqual(pattern.case_fold, restored.case_fold)
+            self.assertEqual(pattern.engine, restored.engine)
+
+    def test_lazy_regex(self):
+        restored = diskcache.loads(diskcache.dumps(WildmatchPattern(u'src/*/[a-c]*.py')))
+        self.assertIsNone(restored._regex)
+        self.assertTrue(restored.match(u'src/lib/bar.py'))
+        self.assertIsNotNone(restored._regex)
+        self.assertIs(restored._regex, restored.translate())
+
+    def test_pathspec_list(self):
+        for prefilter in (False, True):
+            pathspecs = PathspecList([Pathspec(GitmatchPattern(u'*.py')),
+                                      Pathspec(GitmatchPattern(u'setup.py'), negated=True),
+                                      Pathspec(WildmatchPattern(u'build/**'))],
+                                     prefilter=prefilter)
+            restored = diskcache.loads(diskcache.dumps(pathspecs))
+            self.assertEqual(prefilter, restored._prefilter is not None)
+            self.assertEqual([spec.negated for spec in pathspecs.pathspecs],
+                             [spec.negated for spec in restored.pathspecs])
+            self.assertEqual(list(pathspecs.filter(_PATHS[:-1])),
+                             list(restored.filter(_PATHS[:-1])))
+
+    def test_pickle(self):
+        pathspecs = PathspecList([Pathspec(GitmatchPattern(u'*.py')),
+                                  Pathspec(WildmatchPattern(u'src/**'), negated=True)],
+                                 prefilter=True)
+        restored = pickle.loads(pickle.dumps(pathspecs))
+        self.assertEqual(list(pathspecs.filter(_PATHS[:-1])), list(restored.filter(_PATHS[:-1])))
+
+    def test_unsupported_type(self):
+        with self.assertRaises(TypeError):
+            diskcache.dumps(object())
+
+
+class TestDiskCache(unittest.TestCase):
+    u"""
+    TestCase for the DiskCache class
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = diskcache.DiskCache(os.path.join(self.directory, u'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_hit(self):
+        rules = (u'*.py', u'!setup.py')
+        compile_rules = lambda: [GitmatchPattern(rule) for rule in rules]
+        first = self.cache.get((u'gitignore', rules), compile_rules)
+        self.assertTrue(os.path.isfile(self.cache.path((u'gitignore', rules))))
+        second = self.cache.get((u'gitignore', rules), lambda: self.fail(u'Unexpected miss'))
+        self.assertEqual([pattern.pattern for pattern in first],
+                         [pattern.pattern for pattern in second])
+        self.assertTrue(second[0].match(u'src/main.py'))
+
+    def test_key(self):
+        keys = [(u'*.py', False), (u'*.py', True), (u'*.py', 1), (b'*.py', False),
+                (u'*.py', None), ((u'*.py',), False), ([u'*.py', False],)]
+        paths = set(self.cache.path(key) for key in keys)
+        self.assertEqual(len(keys), len(paths))
+        self.assertEqual(self.cache.path((u'*.py', True)), self.cache.path((u'*.py', True)))
+
+    def test_corrupted_entry(self):
+        key = (u'*.py',)
+        self.cache.get(key, lambda: GitmatchPattern(u'*.py'))
+        with open(self.cache.path(key), u'wb') as cache_file:
+            cache_file.write(b'\x00corrupted')
+        pattern = self.cache.get(key, lambda: GitmatchPattern(u'*.txt'))
+        self.assertEqual(u'*.txt', pattern.pattern)
+        self.assertEqual(u'*.txt', self.cache.get(key, lambda: None).pattern)
+
+    def test_write_error(self):
+        # The cache directory cannot be created below a file
+        blocker = os.path.join(self.directory, u'file')
+        with open(blocker, u'wb'):
+            pass
+        cache = diskcache.DiskCache(os.path.join(blocker, u'cache'))
+        calls = []
+        for _ in range(2):
+            pattern = cache.get((u'*.py',), lambda: calls.append(1) or GitmatchPattern(u'*.py'))
+            self.assertTrue(pattern.match(u'src/main.py'))
+        self.assertEqual(2, len(calls))
+
+    def test_clear(self):
+        self.cache.clear()  # The directory does not exist yet
+        self.cache.get((u'*.py',), lambda: GitmatchPattern(u'*.py'))
+        self.cache.clear()
+        self.assertEqual([], os.listdir(self.cache.directory))
+
+
+if __name__ == u'__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the fastpath module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import unittest
+
+from pathmatch import fastpath
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.helpers import generate_tests
+import pathmatch.wildmatch as wildmatch
+from pathmatch.wildmatch import WildmatchPattern
+
+
+_PATHS = [
+    u'',
+    u'/',
+    u'build',
+    u'build/',
+    u'/build',
+    u'build/a.txt',
+    u'src/build',
+    u'src/build/',
+    u'src/build/a.txt',
+    u'src/builds/a.txt',
+    u'src/rebuild',
+    u'dist',
+    u'dist/',
+    u'dist/pkg/a.whl',
+    u'src/dist/a.whl',
+    u'a.pyc',
+    u'.pyc',
+    u'src/a.pyc',
+    u'src/a.pyc/b.txt',
+    u'src/a.pyco',
+    u'node_modules',
+    u'a/node_modules/b/c.js',
+    u'a/xnode_modules/b',
+    u'foo/bar',
+    u'x/foo/bar',
+    u'x/foo/bar/y',
+    u'x/foo//bar',
+]
+
+# Mixed-case paths, including non-ASCII characters folded to ASCII letters by the regex engine
+_CASE_FOLD_PATHS = _PATHS + [
+    u'BUILD',
+    u'Build/A.txt',
+    u'src/Build',
+    u'Src/BUILD/a.txt',
+    u'A.PYC',
+    u'src/a.Pyc',
+    u'Dist/Pkg',
+    u'A/Node_Modules/b.js',
+    u'Foo/Bar',
+    u'x/FOO/bar/y',
+    u'\u212a.pyc',  # Kelvin sign, folded to `k`
+    u'src/bui\u0131ld',
+    u'\xe9/build',
+    u'\xc9T\xc9/BUILD',
+]
+
+
+@generate_tests(
+    wildmatch_fast_path=[
+        (u'build', fastpath.EQUALS),
+        (u'foo/bar', fastpath.EQUALS),
+        (u'', fastpath.EQUALS),
+        (u'*.pyc', fastpath.SUFFIX),
+        (u'*', fastpath.SUFFIX),
+        (u'*/bar', fastpath.SUFFIX),
+        (u'build*', fastpath.PREFIX),
+        (u'dist/**', fastpath.PREFIX),
+        (u'**', fastpath.PREFIX),
+        (u'**/build', fastpath.DEEP_EQUALS),
+        (u'**/foo/bar', fastpath.DEEP_EQUALS),
+        (u'**/', fastpath.DEEP_EQUALS),
+        (u'**/*.pyc', fastpath.SUFFIX),
+        (u'**/*', fastpath.SUFFIX),
+        (u'**/dist/**', fastpath.DEEP_TREE),
+        (u'**/*.pyc/**', fastpath.CONTAINS),
+        (u'**/build*', None),
+        (u'src/*.pyc', None),
+        (u'*.py[cod]', None),
+        (u'b?ild', None),
+        (u'foo/**/bar', None),
+    ],
+    gitmatch_fast_path=[
+        (u'build', fastpath.DEEP_DIR_EQUALS),
+        (u'foo/bar', fastpath.DEEP_DIR_EQUALS),
+        (u'/build', fastpath.DIR_EQUALS),
+        (u'*.pyc', fastpath.DEEP_DIR_SUFFIX),
+        (u'build/', fastpath.DEEP_TREE),
+        (u'/build/', fastpath.PREFIX),
+        (u'dist/**', fastpath.DEEP_TREE),
+        (u'*.pyc/', fastpath.CONTAINS),
+        (u'**', fastpath.PREFIX),
+        (u'**/node_modules', fastpath.DEEP_DIR_EQUALS),
+        (u'build*', None),
+        (u'*.py[cod]', None),
+    ],
+    wildmatch_flags=[
+        (u'*.pyc', False),
+        (u'*/bar', False),
+        (u'build*', False),
+        (u'*', False),
+    ],
+)
+class TestFastPath(unittest.TestCase):
+    u"""
+    TestCase for the fast paths: they must be equivalent to the regex
+    """
+
+    def assert_equivalent(self, pattern):
+        for path in _PATHS:
+            expected = pattern.regex.match(path) is not None
+            msg = u'Expect match({}, {}) to be {}'.format(repr(pattern.pattern), repr(path),
+                                                          repr(expected))
+            self.assertEqual(expected, pattern.match(path), msg)
+
+    def wildmatch_fast_path(self, pattern, kind):
+        compiled = WildmatchPattern(pattern)
+        self.assertEqual(kind, None if compiled.fast_path is None else compiled.fast_path.kind)
+        self.assert_equivalent(compiled)
+
+    def gitmatch_fast_path(self, pattern, kind):
+        compiled = GitmatchPattern(pattern)
+        self.assertEqual(kind, None if compiled.fast_path is None else compiled.fast_path.kind)
+        self.assert_equivalent(compiled)
+
+    def wildmatch_flags(self, pattern, path_name):
+        compiled = WildmatchPattern(pattern, path_name=path_name, wild_star=False)
+        self.assertIsNotNone(compiled.fast_path)
+        self.assert_equivalent(compiled)
+
+    def test_case_fold(self):
+        patterns = [WildmatchPattern(pattern, case_fold=True)
+                    for pattern in [u'build', u'*.pyc', u'*.PYC', u'build*', u'dist/**',
+                                    u'**/build', u'**/foo/bar', u'**/dist/**', u'**/*.pyc/**',
+                                    u'*.k', u'\xe9t\xe9', u'**/\xe9t\xe9']]
+        patterns += [GitmatchPattern(pattern, case_fold=True)
+                     for pattern in [u'build', u'/build', u'*.pyc', u'build/', u'/build/',
+                                     u'dist/**', u'*.pyc/', u'node_modules', u'FOO/bar', u'k']]
+        for pattern in patterns:
+            self.assertIsNone(pattern.fast_path)
+            self.assertEqual((), pattern.required_literals())
+            for path in _CASE_FOLD_PATHS + [u'\u212a', u'src/\u212a', u'\xc9T\xc9']:
+                expected = pattern.regex.match(path) is not None
+                msg = u'Expect match({}, {}) to be {}'.format(repr(pattern.pattern), repr(path),
+                                                              repr(expected))
+                self.assertEqual(expected, pattern.match(path), msg)
+
+    def test_binary_case_fold(self):
+        for pattern in [b'build', b'*.pyc', b'build/', b'/build', b'**/dist/**']:
+            compiled = GitmatchPattern(pattern, case_fold=True)
+            for path in _CASE_FOLD_PATHS:
+                path = path.encode(u'utf-8')
+                expected = compiled.regex.match(path) is not None
+                self.assertEqual(expected, compiled.match(path), (pattern, path))
+
+    def test_classify(self):
+        self.assertEqual(fastpath.FastPath(fastpath.SUFFIX, u'.pyc', True),
+                         wildmatch.classify(u'*.pyc'))
+        self.assertEqual(fastpath.FastPath(fastpath.DEEP_DIR_EQUALS, u'build', True),
+                         wildmatch.classify(u'**/build', dir_suffix=True))
+        self.assertIsNone(wildmatch.classify(u'*.py[cod]'))
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            fastpath.compile_matcher(fastpath.FastPath(u'unknown', u'', True))
+
+
+if __name__ == u'__main__':
+    unittest.main()
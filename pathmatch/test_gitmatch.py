@@ -9,9 +9,15 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import itertools
+import pickle
+import posixpath
 import unittest
+import warnings
 
 import pathmatch.gitmatch as gitmatch
+import pathmatch.wildmatch as wildmatch
+from pathmatch.gitmatch import GitmatchPattern
 from pathmatch.helpers import generate_tests
 
 
@@ -38,6 +44,12 @@ from pathmatch.helpers import generate_tests
         (u'build/**', u'build', False),
         (u'build/**', u'build/', True),
         (u'build/**', u'build/README.md', True),
+        # Paths containing newlines
+        (u'build', u'build/a\nb', True),
+        (u'build', u'a\nb/build', True),
+        (u'*.py', u'a\nb/c\nd.py', True),
+        (u'/src/**', u'/src/a\n/b', True),
+        (u'b*ld/', u'x\ny/b\nld/z', True),
     ]
 )
 class TestWildmatchFunctions(unittest.TestCase):
@@ -58,6 +70,161 @@ class TestWildmatchFunctions(unittest.TestCase):
             self.assertTrue(gitmatch.match(pattern, path))
         else:
             self.assertFalse(gitmatch.match(pattern, path))
+        self.assertEqual(expected, gitmatch.translate(pattern).match(path) is not None)
+        lazy_pattern = GitmatchPattern(pattern, lazy=True)
+        self.assertEqual(expected, lazy_pattern.match(path))
+        self.assertEqual(gitmatch.translate(pattern).pattern, lazy_pattern.translate().pattern)
+        segment_pattern = GitmatchPattern(pattern, engine=wildmatch.ENGINE_SEGMENT)
+        self.assertEqual(expected, segment_pattern.match(path))
+        self.assertEqual(expected, segment_pattern.match_segments(path.split(u'/')))
+
+    def test_lazy(self):
+        self.assertFalse(GitmatchPattern(u'build/', lazy=True).is_compiled())
+        pattern = GitmatchPattern(u'src/*/[a-c]*.py', lazy=True)
+        self.assertFalse(pattern.is_compiled())
+        self.assertTrue(pattern.match(u'src/lib/bar.py/x'))
+        self.assertTrue(pattern.is_compiled())
+        for text in (u'src/*/[a-c]*.py', u'b*ld'):
+            lazy_pattern = GitmatchPattern(text, lazy=True)
+            matches = lazy_pattern.filter([u'src/lib/bar.py', u'a/build/x', u'main.py'])
+            self.assertTrue(lazy_pattern.is_compiled())
+            self.assertNotIn(lazy_pattern._match, (lazy_pattern._compile_and_match,
+                                                   lazy_pattern._compile_component_and_match))
+            self.assertEqual(1, len(list(matches)))
+        for invalid in (u'src/[a', u'[z-a]x', u'[![.ab.]]x', u'[[.ab.]-c]x'):
+            with self.assertRaises(ValueError):
+                GitmatchPattern(invalid, lazy=True)
+
+
+class TestBinaryGitmatch(TestWildmatchFunctions):
+    u"""
+    Runs the gitmatch test suite against bytes patterns and paths
+    """
+
+    def match(self, pattern, path, expected):
+        pattern = pattern.encode(u'utf-8')
+        path = path.encode(u'utf-8')
+        self.assertEqual(expected, gitmatch.match(pattern, path))
+        self.assertEqual(expected, gitmatch.translate(pattern).match(path) is not None)
+
+    def test_binary_pattern(self):
+        pattern = GitmatchPattern(b'node_modules/')
+        self.assertTrue(pattern.binary)
+        self.assertIsInstance(pattern.translate().pattern, bytes)
+        self.assertEqual((b'node_modules/',), pattern.required_literals())
+        self.assertTrue(pattern.match(b'a/node_modules/\xff.js'))
+        self.assertTrue(GitmatchPattern(b'*.\xe9').match(b'src/\xff.\xe9/a'))
+        self.assertFalse(GitmatchPattern(b'/src/[a-z]*.py').match(b'src/\xffa.py'))
+        with warnings.catch_warnings():
+            # No comparison of the non-ASCII bytes with text (UnicodeWarning on Python 2). The
+            # warnings already emitted by the module would be ignored.
+            warnings.simplefilter(u'error')
+            getattr(gitmatch, u'__warningregistry__', {}).clear()
+            self.assertTrue(GitmatchPattern(b'\xe9').match(b'src/\xe9'))
+
+
+class TestComponentMatcher(unittest.TestCase):
+    u"""
+    TestCase for the component matcher of the slash-free gitmatch patterns
+    """
+
+    def test_equivalence(self):
+        components = [u'', u'build', u'Build', u'a.pyc', u'.x.swp', u'x', u'b-ld', u'b\nld']
+        paths = [u'/'.join(parts) for depth in range(1, 4)
+                 for parts in itertools.product(components, repeat=depth)]
+        patterns = [u'*.py[cod]', u'b*ld', u'b*ld/', u'[Bb]uild', u'.*.sw?', u'?',
+                    u'[!a]*/', u'\\b?ld']
+        for pattern, case_fold, binary in itertools.product(patterns, (False, True),
+                                                            (False, True)):
+            compiled = GitmatchPattern(pattern.encode(u'utf-8') if binary else pattern,
+                                       case_fold=case_fold)
+            self.assertIsNotNone(compiled._component_nodes, pattern)
+            # The full regex is only compiled by `regex`
+            self.assertTrue(compiled.is_compiled())
+            self.assertIsNone(compiled._regex, pattern)
+            texts = [path.encode(u'utf-8') for path in paths] if binary else paths
+            for path in texts:
+                self.assertEqual(compiled.regex.match(path) is not None, compiled.match(path),
+                                 (pattern, path, case_fold))
+            restored = pickle.loads(pickle.dumps(compiled))
+            self.assertIsNotNone(restored._component_nodes)
+            self.assertEqual([compiled.match(path) for path in texts[:50]],
+                             [restored.match(path) for path in texts[:50]])
+
+    def test_other_patterns(self):
+        for pattern in (u'/build', u'a/b*', u'a\\/b*', u'build', u'*.pyc', u'*/'):
+            self.assertIsNone(GitmatchPattern(pattern)._component_nodes, pattern)
+        segment_pattern = GitmatchPattern(u'b*ld', engine=wildmatch.ENGINE_SEGMENT)
+        self.assertIsNone(segment_pattern._component_nodes)
+
+
+def _reference_normalize_path(path, base_path, is_dir):
+    u"""
+    The original implementation of `normalize_path`, normalizing the base path and calling
+    `relpath` for each path.
+    """
+    slash = b'/' if isinstance(path, bytes) else u'/'
+    path = posixpath.normpath(path)
+    base_path = posixpath.normpath(base_path)
+    if base_path[-1:] != slash:
+        base_path += slash
+    if path.startswith(base_path):
+        path = slash + posixpath.relpath(path, base_path)
+    elif path.startswith(slash):
+        raise ValueError(path)
+    if is_dir is None:
+        return path
+    elif is_dir and path[-1:] != slash:
+        return path + slash
+    elif not is_dir and path[-1:] == slash:
+        return path[:-1]
+    return path
+
+
+class TestPathNormalizer(unittest.TestCase):
+    u"""
+    TestCase for the PathNormalizer class
+    """
+
+    def assertNormalize(self, base_path, paths, is_dir):
+        normalizer = gitmatch.PathNormalizer(base_path)
+        for path in paths:
+            try:
+                expected = _reference_normalize_path(path, base_path, is_dir)
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    normalizer.normalize(path, is_dir)
+                with self.assertRaises(ValueError):
+                    normalizer.normalize_many([path], is_dir)
+                continue
+            self.assertEqual(expected, normalizer.normalize(path, is_dir), repr((path, base_path)))
+            self.assertEqual([expected], normalizer.normalize_many([path], is_dir))
+
+    def test_exhaustive(self):
+        paths = [u''.join(chars) for length in range(6)
+                 for chars in itertools.product(u'a./', repeat=length)]
+        for base_path in (u'/', u'/a', u'/a/', u'/a/./a', u'a', u'a/', u'.', u'..', u'//a'):
+            for is_dir in (None, True, False):
+                self.assertNormalize(base_path, paths, is_dir)
+
+    def test_normalize_many(self):
+        normalizer = gitmatch.PathNormalizer(u'/home/project')
+        paths = [u'src/main.py', u'src/', u'/home/project/src/lib/a.py', u'./setup.py',
+                 u'src//lib/../main.py', u'src/.hidden']
+        self.assertEqual([u'src/main.py', u'src', u'/src/lib/a.py', u'setup.py', u'src/main.py',
+                          u'src/.hidden'], normalizer.normalize_many(paths))
+        self.assertEqual([u'src/main.py/', u'src/', u'/src/lib/a.py/', u'setup.py/',
+                          u'src/main.py/', u'src/.hidden/'],
+                         normalizer.normalize_many(paths, is_dir=True))
+        with self.assertRaises(ValueError):
+            normalizer.normalize_many([u'src/main.py', u'/home/other/a.py'])
+
+    def test_binary(self):
+        paths = [b''.join(chars) for length in range(5)
+                 for chars in itertools.product([b'a', b'.', b'/', b'\xff'], repeat=length)]
+        for base_path in (b'/', b'/a', b'a/.'):
+            self.assertNormalize(base_path, paths, None)
+        self.assertEqual(b'/\xff/a', gitmatch.PathNormalizer(b'/base').normalize(b'/base/\xff/a'))
 
 
 if __name__ == u'__main__':
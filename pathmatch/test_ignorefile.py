@@ -0,0 +1,129 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the ignorefile module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pathmatch import ignorefile
+from pathmatch.ignorefile import Rule
+
+
+class TestIterRules(unittest.TestCase):
+    u"""
+    TestCase for the iter_rules function
+    """
+
+    def test_syntax(self):
+        data = (u'# Comment\n'
+                u'\n'
+                u'*.pyc\n'
+                u'!main.pyc\n'
+                u'\\#notes.txt\n'
+                u'\\!important\n'
+                u'  # indented\n'
+                u'build/   \n'
+                u'trailing\\ \n'
+                u'two\\ \\  \n'
+                u'escaped\\\\  \n'
+                u'   \n'
+                u'crlf\r\n'
+                u'last')
+        self.assertEqual([
+            Rule(u'*.pyc', False, 3),
+            Rule(u'main.pyc', True, 4),
+            Rule(u'\\#notes.txt', False, 5),
+            Rule(u'\\!important', False, 6),
+            Rule(u'  # indented', False, 7),
+            Rule(u'build/', False, 8),
+            Rule(u'trailing\\ ', False, 9),
+            Rule(u'two\\ \\ ', False, 10),
+            Rule(u'escaped\\\\', False, 11),
+            Rule(u'crlf', False, 13),
+            Rule(u'last', False, 14),
+        ], list(ignorefile.iter_rules(data)))
+
+    def test_binary(self):
+        data = b'\xef\xbb\xbf*.o\n!\xff.o \n#\xfe\n'
+        self.assertEqual([Rule(b'*.o', False, 1), Rule(b'\xff.o', True, 2)],
+                         list(ignorefile.iter_rules(data)))
+        self.assertEqual([Rule(u'*.o', False, 1)], list(ignorefile.iter_rules(u'\ufeff*.o')))
+
+
+class TestParse(unittest.TestCase):
+    u"""
+    TestCase for the parse and load functions
+    """
+
+    def test_match(self):
+        pathspecs = ignorefile.parse(u'*.log\n!keep.log\n\\!bang\n\\#hash\nspace\\ \nbuild/\n')
+        self.assertTrue(pathspecs.match(u'src/debug.log'))
+        self.assertFalse(pathspecs.match(u'src/keep.log'))
+        self.assertTrue(pathspecs.match(u'!bang'))
+        self.assertTrue(pathspecs.match(u'docs/#hash'))
+        self.assertTrue(pathspecs.match(u'space '))
+        self.assertFalse(pathspecs.match(u'space'))
+        self.assertTrue(pathspecs.match(u'a/build/main.o'))
+        self.assertFalse(pathspecs.match(u'a/build'))
+
+    def test_lazy_and_shared(self):
+        pathspecs = ignorefile.parse(b'*.pyc\n!/src/[a-z]*.pyc\nbuild/\n/src/[a-z]*.pyc\n',
+                                     prefilter=True)
+        self.assertEqual(4, len(pathspecs.pathspecs))
+        self.assertIs(pathspecs.pathspecs[1].pattern, pathspecs.pathspecs[3].pattern)
+        self.assertEqual(0, pathspecs.compiled_count())
+        self.assertTrue(pathspecs.match(b'src/a/main.pyc'))
+        self.assertTrue(pathspecs.match(b'/src/main.pyc'))
+        self.assertEqual(2, pathspecs.compiled_count())  # The shared pattern of the rules 1 and 3
+
+    def test_shadowed_duplicates(self):
+        pathspecs = ignorefile.parse(u'*.log\n!debug.log\n*.log\n!debug.log\n*.log\n')
+        self.assertEqual([(u'!debug.log', True), (u'*.log', False)],
+                         [(u'!' + spec.pattern.pattern if spec.negated else spec.pattern.pattern,
+                           spec.negated) for spec in pathspecs.pathspecs])
+        self.assertTrue(pathspecs.match(u'debug.log'))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError) as context:
+            ignorefile.parse(u'*.o\n\n/src/**a\n')
+        self.assertIn(u'<rules>:3:', u'{}'.format(context.exception))
+        # Rejected after parsing, the rules are still validated when they are loaded
+        for rules in (u'*.o\n[z-a]*\n', u'*.o\n[![.ab.]]\n', b'*.o\n[[.ab.]-c]\n'):
+            with self.assertRaises(ValueError) as context:
+                ignorefile.parse(rules)
+            self.assertIn(u'<rules>:2:', u'{}'.format(context.exception))
+
+    def test_load(self):
+        directory = tempfile.mkdtemp()
+        try:
+            exclude_path = os.path.join(directory, u'exclude')
+            gitignore_path = os.path.join(directory, u'.gitignore')
+            with open(exclude_path, u'wb') as exclude_file:
+                exclude_file.write(b'*.tmp\n!keep.o\n')
+            with open(gitignore_path, u'wb') as gitignore_file:
+                gitignore_file.write(b'*.o\n\xc3\xa9t\xc3\xa9/\n')
+            pathspecs = ignorefile.load([exclude_path, gitignore_path])
+            self.assertTrue(pathspecs.match(u'a.tmp'))
+            self.assertTrue(pathspecs.match(u'keep.o'))  # The rules of .gitignore come last
+            self.assertTrue(pathspecs.match(u'\xe9t\xe9/a'))
+            binary_pathspecs = ignorefile.load(gitignore_path, binary=True, prefilter=True)
+            self.assertTrue(binary_pathspecs.match(b'\xc3\xa9t\xc3\xa9/a'))
+            with self.assertRaises(ValueError):
+                with open(exclude_path, u'wb') as exclude_file:
+                    exclude_file.write(b'[a\n')
+                ignorefile.load(exclude_path)
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == u'__main__':
+    unittest.main()
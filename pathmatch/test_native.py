@@ -0,0 +1,117 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the native module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import unittest
+
+from six import unichr
+
+from pathmatch import compiler
+from pathmatch import native
+from pathmatch import syntax
+import pathmatch.test_wildmatch as test_wildmatch
+import pathmatch.wildmatch as wildmatch
+from pathmatch.wildmatch import WildmatchPattern
+
+
+def _native_match(pattern, text, path_name=True, wild_star=True):
+    nodes = syntax.parse(pattern, wild_star=wild_star)
+    program = compiler.native_program_from_nodes(nodes, path_name=path_name or wild_star)
+    return native.NativeMatcher(program).match(text)
+
+
+class TestNativeWildmatch(test_wildmatch.TestWildmatchFunctions):
+    u"""
+    Runs the wildmatch test suite against the native engine
+    """
+
+    def match_wild_star(self, pattern, text, result):
+        if result is None:  # Expect error
+            with self.assertRaises(Exception):
+                _native_match(pattern, text)
+        else:
+            msg = u'Expect match({}, {}) to be {}'.format(repr(pattern), repr(text), repr(result))
+            self.assertEqual(result, _native_match(pattern, text), msg)
+
+
+class TestNativeMatcher(unittest.TestCase):
+    u"""
+    TestCase for the NativeMatcher class
+    """
+
+    def test_path_name(self):
+        self.assertTrue(_native_match(u'foo*bar', u'foo/baz/bar', path_name=False,
+                                      wild_star=False))
+        self.assertTrue(_native_match(u'foo?bar', u'foo/bar', path_name=False, wild_star=False))
+        self.assertTrue(_native_match(u'foo[/]bar', u'foo/bar', path_name=False, wild_star=False))
+        self.assertFalse(_native_match(u'foo[/]bar', u'foo/bar'))
+        self.assertFalse(_native_match(u'foo[!a]bar', u'foo/bar'))
+
+    def test_multi_character_collating_element(self):
+        self.assertTrue(_native_match(u'e[[.ch.]]o', u'echo'))
+        self.assertTrue(_native_match(u'e[a[.ch.]]o', u'eao'))
+        self.assertTrue(_native_match(u'*[[.ch.]]', u'abcch'))
+        self.assertFalse(_native_match(u'e[[.ch.]]o', u'eco'))
+        with self.assertRaises(ValueError):
+            _native_match(u'e[![.ch.]]o', u'eao')
+
+    def test_backtracking(self):
+        # These inputs take exponential time with the regex engine
+        pattern = WildmatchPattern(u'*a*a*a*a*a*a*a*a*a*a*a*a*b', engine=wildmatch.ENGINE_NATIVE)
+        self.assertFalse(pattern.match(u'a' * 2000))
+        self.assertTrue(pattern.match(u'a' * 2000 + u'b'))
+
+        pattern = WildmatchPattern(u'**/x/**/x/**/x/**/x/**/y', engine=wildmatch.ENGINE_NATIVE)
+        self.assertFalse(pattern.match(u'x/' * 1000))
+        self.assertTrue(pattern.match(u'x/' * 1000 + u'y'))
+
+    def test_case_fold(self):
+        for pattern in [u'f[o]o', u'*.P[yY]', u'[B-a]?', u'[!a-z]x', u'\xe9*']:
+            regex_pattern = WildmatchPattern(pattern, case_fold=True)
+            native_pattern = WildmatchPattern(pattern, case_fold=True,
+                                              engine=wildmatch.ENGINE_NATIVE)
+            for text in [u'foo', u'FOO', u'fOo', u'a.py', u'A.PY', u'aX', u'AX', u'1x',
+                         u'\xc9t\xe9', u'\xe9T\xc9']:
+                self.assertEqual(regex_pattern.match(text), native_pattern.match(text),
+                                 (pattern, text))
+
+    def test_case_fold_parity(self):
+        # Non-ASCII case folding: the Kelvin sign folds to `k`, the long s to `s`, the
+        # ypogegrammeni to iota, the dotted capital I to `i`... in the literals and the bracket
+        # expressions. The wide ranges are not folded character by character.
+        chars = [unichr(code_point) for code_point in range(0x250)]
+        chars += [u'\u0345', u'\u0390', u'\u03b9', u'\u03bc', u'\u1e9e', u'\u1fbe', u'\u1fd3',
+                  u'\u2126', u'\u212a', u'\u212b', u'\u2c65', u'\ufb05', u'\ufb06']
+        patterns = [u'k', u's', u'\xb5', u'\xe5', u'\u03b9', u'\u0130', u'\u0131', u'\u212a',
+                    u'\u017f', u'\u1e9e', u'*\u0130[B-D]', u'[k]', u'[a-z]', u'[!a-z]',
+                    u'[a-\u2100]', u'[!a-\u2100]', u'[\u0130-\u0131]', u'[\u212a]',
+                    u'[\u017f]', u'[[:upper:]]', u'[\u1e9e\u0390]', u'[[.ss.]]']
+        for pattern in patterns:
+            regex_pattern = WildmatchPattern(pattern, case_fold=True)
+            native_pattern = WildmatchPattern(pattern, case_fold=True,
+                                              engine=wildmatch.ENGINE_NATIVE)
+            segment_pattern = WildmatchPattern(pattern, case_fold=True,
+                                               engine=wildmatch.ENGINE_SEGMENT)
+            for text in chars + [u'SS', u'\u017fS', u'kiB', u'k\u0130d', u'KIb']:
+                expected = regex_pattern.match(text)
+                self.assertEqual(expected, native_pattern.match(text), (pattern, text))
+                self.assertEqual(expected, segment_pattern.match(text), (pattern, text))
+
+    def test_engine_option(self):
+        pattern = WildmatchPattern(u'f[o]o', engine=wildmatch.ENGINE_NATIVE)
+        self.assertEqual(wildmatch.ENGINE_NATIVE, pattern.engine)
+        self.assertTrue(pattern.match(u'foo'))
+        self.assertEqual([u'foo'], list(pattern.filter([u'foo', u'fob'])))
+        with self.assertRaises(ValueError):
+            WildmatchPattern(u'foo', engine=u'unknown')
+
+
+if __name__ == u'__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the parallel module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import unittest
+
+from pathmatch import parallel
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.pathspec import Pathspec, PathspecList
+from pathmatch.wildmatch import WildmatchPattern
+
+
+_PATHS = [u'src/main.py', u'src/main.pyc', u'build/lib/main.py', u'docs/index.rst', u'setup.py',
+          u'node_modules/a/index.js', u'README.md', u'src/build/gen.py']
+
+
+def _pathspecs():
+    return PathspecList([Pathspec(GitmatchPattern(u'*.py')),
+                         Pathspec(GitmatchPattern(u'/build/'), negated=True),
+                         Pathspec(WildmatchPattern(u'docs/**'))], prefilter=True)
+
+
+@unittest.skipIf(parallel.futures is None, u'concurrent.futures is not available')
+class TestParallelFilter(unittest.TestCase):
+    u"""
+    TestCase for the parallel_filter function
+    """
+
+    def assertParallelFilter(self, pathspecs, paths, **kwargs):
+        expected = list(pathspecs.filter(paths))
+        self.assertEqual(expected, list(pathspecs.parallel_filter(iter(paths), **kwargs)))
+
+    def test_executors(self):
+        paths = _PATHS * 500
+        pathspecs = _pathspecs()
+        for executor in (parallel.EXECUTOR_THREAD, parallel.EXECUTOR_PROCESS):
+            self.assertParallelFilter(pathspecs, paths, executor=executor, workers=2)
+            self.assertParallelFilter(pathspecs, paths, executor=executor, workers=2,
+                                      chunk_size=7)
+        self.assertParallelFilter(pathspecs, [], executor=parallel.EXECUTOR_THREAD)
+
+    def test_existing_executor(self):
+        paths = _PATHS * 100
+        pathspecs = _pathspecs()
+        with parallel.futures.ThreadPoolExecutor(2) as executor:
+            self.assertParallelFilter(pathspecs, paths, executor=executor, chunk_size=10)
+        with parallel.futures.ProcessPoolExecutor(2) as executor:
+            self.assertParallelFilter(pathspecs, paths, executor=executor, chunk_size=100)
+            # The rules are loaded once per worker
+            self.assertParallelFilter(pathspecs, paths, executor=executor, chunk_size=100)
+
+    def test_worker_rules(self):
+        pathspecs = _pathspecs()
+        loaded = parallel._load_rules(u'first', parallel._dumps(pathspecs))
+        self.assertEqual(list(pathspecs.filter(_PATHS)), list(loaded.filter(_PATHS)))
+        self.assertIs(loaded, parallel._load_rules(u'first', None))
+        # Only the last rules are kept
+        other = PathspecList([Pathspec(GitmatchPattern(u'*.md'))])
+        parallel._load_rules(u'second', parallel._dumps(other))
+        self.assertEqual(u'second', parallel._worker_rules[0])
+        self.assertIsNot(loaded, parallel._load_rules(u'first', parallel._dumps(pathspecs)))
+
+    def test_binary(self):
+        pathspecs = PathspecList([Pathspec(GitmatchPattern(b'*.py'))])
+        paths = [b'src/main.py', b'src/main.pyc', b'\xff.py']
+        self.assertParallelFilter(pathspecs, paths, executor=parallel.EXECUTOR_PROCESS, workers=2)
+
+    def test_close(self):
+        results = _pathspecs().parallel_filter(_PATHS * 1000, executor=parallel.EXECUTOR_THREAD,
+                                               workers=2, chunk_size=10)
+        self.assertEqual(u'src/main.py', next(results))
+        results.close()
+
+    def test_chunk_size(self):
+        self.assertEqual(1024, parallel._next_chunk_size(256, 256, 0))
+        self.assertEqual(1000, parallel._next_chunk_size(1000, 1000, parallel._TARGET_CHUNK_TIME))
+        self.assertEqual(parallel._MIN_CHUNK_SIZE, parallel._next_chunk_size(1000, 1000, 10))
+        with self.assertRaises(ValueError):
+            _pathspecs().parallel_filter(_PATHS, chunk_size=0)
+        with self.assertRaises(ValueError):
+            _pathspecs().parallel_filter(_PATHS, executor=u'fiber')
+
+
+if __name__ == u'__main__':
+    unittest.main()
@@ -13,7 +13,7 @@ import unittest
 
 import pathmatch.gitmatch as gitmatch
 from pathmatch.gitmatch import GitmatchPattern
-from pathmatch.pathspec import Pathspec, PathspecList
+from pathmatch.pathspec import EXCLUDED, INCLUDED, UNDECIDED, Pathspec, PathspecList
 
 
 class TestPathspec(unittest.TestCase):
@@ -87,6 +87,33 @@ class TestPathspecList(unittest.TestCase):
         }
         self.assertEqual(expected, actual)
 
+    def test_compiled_count(self):
+        rules = [u'*.txt', u'build/', u'/src/*/[a-c]*.py', u'doc/**/[!_]*.rst']
+        psl = PathspecList(Pathspec(GitmatchPattern(rule, lazy=True)) for rule in rules)
+        self.assertEqual(0, psl.compiled_count())
+        self.assertTrue(psl.match(u'/src/lib/bar.py'))
+        # The patterns are evaluated from the end: the last one is not matched
+        self.assertEqual(2, psl.compiled_count())
+        self.assertTrue(psl.match(u'notes.txt'))
+        self.assertEqual(2, psl.compiled_count())
+        eager = PathspecList([Pathspec(GitmatchPattern(u'*.txt'))])
+        self.assertEqual(1, eager.compiled_count())
+
+    def test_subtree_verdict(self):
+        psl = PathspecList([
+            Pathspec(GitmatchPattern(u'*')),
+            Pathspec(GitmatchPattern(u'node_modules/'), negated=True),
+            Pathspec(GitmatchPattern(u'/build/'), negated=True),
+            Pathspec(GitmatchPattern(u'/build/*.txt')),
+        ])
+        self.assertEqual(EXCLUDED, psl.subtree_verdict(u'/src/node_modules'))
+        self.assertEqual(UNDECIDED, psl.subtree_verdict(u'/build'))
+        self.assertEqual(EXCLUDED, psl.subtree_verdict(u'/build/lib'))
+        self.assertEqual(UNDECIDED, psl.subtree_verdict(u'/src'))
+        self.assertEqual(INCLUDED, PathspecList([Pathspec(GitmatchPattern(u'/src/'))])
+                         .subtree_verdict(u'/src'))
+        self.assertEqual(EXCLUDED, PathspecList([]).subtree_verdict(u'/src'))
+
 
 if __name__ == u'__main__':
     unittest.main()
@@ -0,0 +1,99 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the patternset module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import unittest
+
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.patternset import WildmatchSet
+from pathmatch.wildmatch import WildmatchPattern
+
+
+_PATHS = [
+    u'',
+    u'setup.py',
+    u'src/main.py',
+    u'src/main.pyc',
+    u'build/lib/main.pyc',
+    u'README.md',
+    u'docs/index.md',
+]
+
+
+class TestWildmatchSet(unittest.TestCase):
+    u"""
+    TestCase for the WildmatchSet class
+    """
+
+    def test_matches(self):
+        patterns = [u'*.py', u'**/*.py', u'**/*.py[cod]', u'build/**', u'*.md', u'src/*']
+        pattern_set = WildmatchSet(patterns)
+        compiled = [WildmatchPattern(pattern) for pattern in patterns]
+        self.assertEqual(len(patterns), len(pattern_set))
+        for path in _PATHS:
+            expected = [i for i, pattern in enumerate(compiled) if pattern.match(path)]
+            self.assertEqual(expected, pattern_set.matches(path), path)
+            self.assertEqual(len(expected) > 0, pattern_set.any(path), path)
+            self.assertEqual(len(expected) > 0, pattern_set.match(path), path)
+
+    def test_gitmatch_rules(self):
+        rules = [u'build', u'*.pyc', u'node_modules/', u'*.egg-info/', u'/dist', u'docs/_build/',
+                 u'*.py[cod]', u'build*', u'**/main.pyc', u'*', u'src', u'lib/']
+        paths = _PATHS + [u'node_modules', u'a/node_modules/b.js', u'x.egg-info/PKG-INFO',
+                          u'x.egg-info', u'dist/a', u'src/dist', u'docs/_build/index.html']
+        patterns = [GitmatchPattern(rule) for rule in rules]
+        pattern_set = WildmatchSet(patterns)
+        for path in paths:
+            expected = [i for i, pattern in enumerate(patterns) if pattern.match(path)]
+            self.assertEqual(expected, pattern_set.matches(path), path)
+            self.assertEqual(len(expected) > 0, pattern_set.any(path), path)
+
+    def test_pattern_instances(self):
+        pattern_set = WildmatchSet([GitmatchPattern(u'build'), u'*.md'])
+        self.assertEqual([0], pattern_set.matches(u'build/lib/main.pyc'))
+        self.assertEqual([1], pattern_set.matches(u'README.md'))
+        self.assertEqual([], pattern_set.matches(u'setup.py'))
+        self.assertEqual([u'README.md', u'build/lib/main.pyc'],
+                         list(pattern_set.filter(sorted(_PATHS))))
+        self.assertIsNotNone(pattern_set.translate().match(u'build'))
+
+    def test_many_patterns(self):
+        # More patterns than capturing groups in a single regex
+        pattern_set = WildmatchSet([u'file{}.txt'.format(i) for i in range(250)] + [u'*.txt'])
+        self.assertEqual([123, 250], pattern_set.matches(u'file123.txt'))
+        self.assertEqual([250], pattern_set.matches(u'other.txt'))
+        self.assertFalse(pattern_set.any(u'file123.md'))
+
+    def test_empty(self):
+        pattern_set = WildmatchSet([])
+        self.assertEqual([], pattern_set.matches(u'foo'))
+        self.assertFalse(pattern_set.any(u'foo'))
+        self.assertIsNone(pattern_set.translate().match(u''))
+
+
+    def test_binary_patterns(self):
+        rules = [u'build', u'*.pyc', u'node_modules/', u'/dist', u'*.py[cod]', u'**/main.pyc']
+        paths = [path.encode(u'utf-8') for path in _PATHS] + [b'a/node_modules/\xff.js']
+        patterns = [GitmatchPattern(rule.encode(u'utf-8')) for rule in rules]
+        pattern_set = WildmatchSet(patterns)
+        self.assertTrue(pattern_set.binary)
+        for path in paths:
+            expected = [i for i, pattern in enumerate(patterns) if pattern.match(path)]
+            self.assertEqual(expected, pattern_set.matches(path), path)
+            self.assertEqual(len(expected) > 0, pattern_set.any(path), path)
+            self.assertEqual(len(expected) > 0, pattern_set.translate().match(path) is not None)
+        self.assertEqual([0], WildmatchSet([b'*.p[y]']).matches(b'\xff.py'))
+
+    def test_mixed_types(self):
+        with self.assertRaises(ValueError):
+            WildmatchSet([u'*.py', b'*.pyc'])
+
+if __name__ == u'__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the prefilter module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import unittest
+
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.pathspec import Pathspec, PathspecList
+from pathmatch.patternset import WildmatchSet
+from pathmatch.prefilter import AhoCorasick, LiteralPrefilter
+from pathmatch.wildmatch import WildmatchPattern
+
+
+_RULES = [u'build', u'*.pyc', u'node_modules/', u'!important.pyc', u'*.egg-info/', u'/dist',
+          u'docs/_build/', u'*', u'!src', u'**/test_*.py', u'lib/**/*.so', u'*.py[cod]']
+
+_PATHS = [
+    u'',
+    u'setup.py',
+    u'src/main.py',
+    u'src/main.pyc',
+    u'src/important.pyc',
+    u'build/lib/main.pyc',
+    u'node_modules',
+    u'a/node_modules/b.js',
+    u'x.egg-info/PKG-INFO',
+    u'dist/a',
+    u'src/dist',
+    u'docs/_build/index.html',
+    u'tests/test_api.py',
+    u'lib/a/b/c.so',
+]
+
+
+class TestAhoCorasick(unittest.TestCase):
+    u"""
+    TestCase for the AhoCorasick class
+    """
+
+    def test_search(self):
+        automaton = AhoCorasick([u'he', u'she', u'his', u'hers'])
+        self.assertEqual({0, 1, 3}, automaton.search(u'ushers'))
+        self.assertEqual({2}, automaton.search(u'this'))
+        self.assertEqual(set(), automaton.search(u''))
+        self.assertEqual(set(), automaton.search(u'xyz'))
+
+    def test_overlapping(self):
+        automaton = AhoCorasick([u'aa', u'aaa', u'ab', u'b'])
+        self.assertEqual({0, 1}, automaton.search(u'aaa'))
+        self.assertEqual({0, 2, 3}, automaton.search(u'aab'))
+
+    def test_empty_keyword(self):
+        self.assertRaises(ValueError, AhoCorasick, [u'a', u''])
+
+
+class TestLiteralPrefilter(unittest.TestCase):
+    u"""
+    TestCase for the LiteralPrefilter class
+    """
+
+    def test_candidates(self):
+        patterns = [WildmatchPattern(pattern) for pattern in [u'*.py', u'*', u'src/*', u'**/*.md']]
+        prefilter = LiteralPrefilter(patterns)
+        self.assertEqual([0, 1, 2], prefilter.candidates(u'src/main.py'))
+        self.assertEqual([1, 3], prefilter.candidates(u'README.md'))
+        self.assertEqual([1], prefilter.candidates(u'LICENSE'))
+
+    def test_no_false_negatives(self):
+        patterns = [GitmatchPattern(rule.lstrip(u'!')) for rule in _RULES]
+        prefilter = LiteralPrefilter(patterns)
+        for path in _PATHS:
+            candidates = prefilter.candidates(path)
+            for index, pattern in enumerate(patterns):
+                if pattern.match(path):
+                    self.assertIn(index, candidates, u'{} {}'.format(_RULES[index], path))
+
+
+class TestPrefilterOption(unittest.TestCase):
+    u"""
+    TestCase for the `prefilter` option of the pattern collections
+    """
+
+    def test_pathspec_list(self):
+        pathspecs = [Pathspec(GitmatchPattern(rule.lstrip(u'!')), rule.startswith(u'!'))
+                     for rule in _RULES]
+        for count in range(len(pathspecs) + 1):
+            plain = PathspecList(pathspecs[:count])
+            prefiltered = PathspecList(pathspecs[:count], prefilter=True)
+            for path in _PATHS:
+                self.assertEqual(plain.match(path), prefiltered.match(path), path)
+
+    def test_wildmatch_set(self):
+        patterns = [GitmatchPattern(rule.lstrip(u'!')) for rule in _RULES]
+        plain = WildmatchSet(patterns)
+        prefiltered = WildmatchSet(patterns, prefilter=True)
+        for path in _PATHS:
+            self.assertEqual(plain.matches(path), prefiltered.matches(path), path)
+            self.assertEqual(plain.any(path), prefiltered.any(path), path)
+
+
+    def test_binary_pathspec_list(self):
+        pathspecs = [Pathspec(GitmatchPattern(rule.lstrip(u'!').encode(u'utf-8')),
+                              rule.startswith(u'!'))
+                     for rule in _RULES]
+        plain = PathspecList(pathspecs)
+        prefiltered = PathspecList(pathspecs, prefilter=True)
+        for path in _PATHS + [u'\xff/node_modules/a']:
+            path = path.encode(u'latin-1')
+            self.assertEqual(plain.match(path), prefiltered.match(path), path)
+
+if __name__ == u'__main__':
+    unittest.main()
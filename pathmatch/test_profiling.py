@@ -0,0 +1,91 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the profiling module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import unittest
+
+from pathmatch import profiling
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.pathspec import EXCLUDED, INCLUDED, Pathspec, PathspecList
+from pathmatch.wildmatch import WildmatchPattern
+
+
+_PATHS = [u'src/main.py', u'src/main.pyc', u'/build/lib/main.py', u'docs/index.rst', u'setup.py',
+          u'README.md']
+
+
+def _pathspecs(prefilter=False):
+    return PathspecList([Pathspec(GitmatchPattern(u'*.py')),
+                         Pathspec(GitmatchPattern(u'/build/'), negated=True),
+                         Pathspec(WildmatchPattern(u'docs/**'))], prefilter=prefilter)
+
+
+class TestProfiledPathspecList(unittest.TestCase):
+    u"""
+    TestCase for the ProfiledPathspecList class
+    """
+
+    def test_match(self):
+        for prefilter in (False, True):
+            pathspecs = _pathspecs(prefilter)
+            profiled = pathspecs.profiled()
+            self.assertIsInstance(profiled, profiling.ProfiledPathspecList)
+            self.assertIs(pathspecs.pathspecs[0], profiled.pathspecs[0])
+            self.assertEqual(list(pathspecs.filter(_PATHS)), list(profiled.filter(_PATHS)))
+            self.assertEqual(list(pathspecs.match_many(_PATHS)),
+                             list(profiled.match_many(_PATHS)))
+
+    def test_stats(self):
+        profiled = _pathspecs().profiled()
+        list(profiled.filter(_PATHS))
+        self.assertEqual(len(_PATHS), profiled.paths)
+        self.assertEqual(2, profiled.unmatched)  # src/main.pyc, README.md
+        docs, build, python = profiled.stats[2], profiled.stats[1], profiled.stats[0]
+        self.assertEqual((6, 1, INCLUDED), (docs.evaluations, docs.hits, docs.verdict))
+        self.assertEqual((5, 1, EXCLUDED), (build.evaluations, build.hits, build.verdict))
+        self.assertEqual((4, 2, INCLUDED), (python.evaluations, python.hits, python.verdict))
+        self.assertGreater(docs.time, 0)
+        self.assertAlmostEqual(docs.time / 6, docs.mean_time)
+
+        profiled.reset()
+        self.assertEqual((0, 0, 0), (profiled.paths, profiled.stats[0].evaluations,
+                                     profiled.stats[0].hits))
+
+    def test_prefilter_stats(self):
+        profiled = _pathspecs(prefilter=True).profiled()
+        list(profiled.filter(_PATHS))
+        # Only the candidate rules are evaluated
+        self.assertLess(profiled.stats[2].evaluations, len(_PATHS))
+        self.assertEqual(1, profiled.stats[2].hits)
+
+    def test_report(self):
+        profiled = _pathspecs().profiled()
+        list(profiled.filter(_PATHS))
+        by_evaluations = profiled.sorted_stats(profiling.SORT_EVALUATIONS)
+        self.assertEqual([2, 1, 0], [rule_stats.index for rule_stats in by_evaluations])
+        by_hits = profiled.sorted_stats(profiling.SORT_HITS)
+        self.assertEqual([0, 1, 2], [rule_stats.index for rule_stats in by_hits])
+        report = profiled.report(sort=profiling.SORT_HITS, limit=2)
+        lines = report.splitlines()
+        self.assertEqual(u'6 paths, 2 matched by no rule, 3 rules', lines[0])
+        self.assertEqual(6, len(lines))
+        self.assertTrue(lines[4].endswith(u'*.py'))
+        self.assertTrue(lines[5].endswith(u'!/build/'))
+        with self.assertRaises(ValueError):
+            profiled.sorted_stats(u'name')
+
+    def test_binary(self):
+        profiled = PathspecList([Pathspec(GitmatchPattern(b'*.py'))]).profiled()
+        self.assertTrue(profiled.match(b'\xff.py'))
+        self.assertTrue(profiled.report().endswith(u'*.py'))
+
+
+if __name__ == u'__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the segment module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import itertools
+import unittest
+
+from pathmatch import segment
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.wildmatch import ENGINE_SEGMENT, WildmatchPattern
+
+_PATTERNS = [
+    u'', u'*', u'**', u'a', u'a/b', u'/a', u'a/', u'*.py', u'test_*', u'*test*', u'[ab]*/c',
+    u'a/*/c', u'a/**', u'**/c', u'a/**/c', u'**/a/**', u'a/**/b/**/c', u'**/b/**/', u'a?/b[!x]',
+    u'**/*.[ch]', u'a/**/', u'*/*', u'/**/a', u'a*b*c/d',
+]
+
+_PATHS = [
+    u'', u'/', u'a', u'b', u'c', u'a/', u'/a', u'a/b', u'a/c', u'a/b/c', u'a/x/y/c', u'a/b/b/c',
+    u'x/a/b/c', u'a/b/', u'src/main.py', u'test_main', u'a_test_b', u'b1/c', u'a1/bz', u'ax/bx',
+    u'src/main.h', u'a/b/x/b/c', u'aXbYc/d', u'a//c', u'x/b/y/',
+]
+
+
+class TestSegmentMatcher(unittest.TestCase):
+    u"""
+    TestCase for the SegmentMatcher class
+    """
+
+    def test_instructions(self):
+        matcher = segment.SegmentMatcher([(segment.LITERAL, u'src'), (segment.DEEP, None),
+                                          (segment.SUFFIX, u'.py')])
+        self.assertTrue(matcher.match(u'src/main.py'))
+        self.assertTrue(matcher.match(u'src/a/b/main.py'))
+        self.assertFalse(matcher.match(u'lib/src/main.py'))
+        self.assertTrue(matcher.match_segments([u'src', u'a', u'main.py']))
+        tail = segment.SegmentMatcher([(segment.PREFIX, u'build'), (segment.TAIL, None)])
+        self.assertTrue(tail.match(u'build-1/a/b'))
+        self.assertTrue(tail.match(u'build/'))
+        self.assertFalse(tail.match(u'build'))
+        with self.assertRaises(ValueError):
+            segment.SegmentMatcher([(segment.TAIL, None), (segment.ANY, None)])
+        optional_tree = segment.SegmentMatcher([(segment.LITERAL, u'a'), (segment.DEEP, None)])
+        self.assertTrue(optional_tree.match(u'a'))
+        self.assertTrue(optional_tree.match(u'a/b'))
+        self.assertFalse(optional_tree.match(u'ab/c'))
+
+    def test_depth(self):
+        matcher = segment.SegmentMatcher([(segment.ANY, None), (segment.CONTAINS, u'test')])
+        self.assertTrue(matcher.match_segments([u'src', u'a_test']))
+        self.assertFalse(matcher.match_segments([u'src', u'lib', u'a_test']))
+        self.assertFalse(matcher.match_segments([u'a_test']))
+
+    def test_binary(self):
+        matcher = segment.SegmentMatcher([(segment.LITERAL, b'src'), (segment.SUFFIX, b'.\xe9')],
+                                         binary=True)
+        self.assertTrue(matcher.match(b'src/\xff.\xe9'))
+        self.assertFalse(matcher.match(b'src/a/\xff.\xe9'))
+
+
+class TestSegmentEngine(unittest.TestCase):
+    u"""
+    TestCase comparing the segment engine with the regex engine
+    """
+
+    def test_wildmatch(self):
+        for pattern, case_fold in itertools.product(_PATTERNS, (False, True)):
+            regex = WildmatchPattern(pattern, case_fold=case_fold).translate()
+            segment_pattern = WildmatchPattern(pattern, case_fold=case_fold,
+                                               engine=ENGINE_SEGMENT)
+            for path in _PATHS + [path.upper() for path in _PATHS]:
+                msg = u'{} {} {}'.format(repr(pattern), repr(path), case_fold)
+                expected = regex.match(path) is not None
+                self.assertEqual(expected, segment_pattern.match(path), msg)
+                self.assertEqual(expected, segment_pattern.match_segments(path.split(u'/')), msg)
+
+    def test_gitmatch(self):
+        for pattern in _PATTERNS:
+            if len(pattern) == 0:
+                continue
+            regex = GitmatchPattern(pattern).translate()
+            segment_pattern = GitmatchPattern(pattern, engine=ENGINE_SEGMENT)
+            for path in _PATHS:
+                msg = u'{} {}'.format(repr(pattern), repr(path))
+                expected = regex.match(path) is not None
+                self.assertEqual(expected, segment_pattern.match(path), msg)
+                self.assertEqual(expected, segment_pattern.match_segments(path.split(u'/')), msg)
+
+    def test_subtree(self):
+        directories = [u'', u'a', u'b', u'a/b', u'x/a', u'a/b/b', u'src', u'a/x/y']
+        children = [u'', u'c', u'a', u'b', u'b/c', u'main.py', u'x/a/b/c']
+        for pattern in _PATTERNS[1:]:
+            for pattern_obj in (GitmatchPattern(pattern),
+                                WildmatchPattern(pattern, engine=ENGINE_SEGMENT)):
+                for directory in directories:
+                    msg = u'{} {}'.format(repr(pattern_obj), repr(directory))
+                    prefix = directory + u'/' if len(directory) > 0 else u''
+                    results = [pattern_obj.match(prefix + child) for child in children]
+                    if not pattern_obj.may_match_under(directory):
+                        self.assertFalse(any(results), msg)
+                    if pattern_obj.matches_all_under(directory):
+                        self.assertTrue(all(results), msg)
+                        self.assertTrue(pattern_obj.matches_all_under(directory + u'/'), msg)
+
+    def test_subtree_examples(self):
+        self.assertTrue(GitmatchPattern(u'node_modules/').matches_all_under(u'a/node_modules'))
+        self.assertFalse(GitmatchPattern(u'node_modules/').matches_all_under(u'a/b'))
+        self.assertTrue(GitmatchPattern(u'node_modules/').may_match_under(u'a/b'))
+        self.assertFalse(GitmatchPattern(u'/src/*.py').may_match_under(u'/lib'))
+        self.assertFalse(GitmatchPattern(u'/src/*.py').may_match_under(u'/src/lib'))
+        self.assertTrue(GitmatchPattern(u'/src/*.py').may_match_under(u'/src'))
+        self.assertTrue(GitmatchPattern(u'*.py').matches_all_under(u'x.py'))
+        self.assertTrue(GitmatchPattern(b'build/').matches_all_under(b'build/'))
+        pattern = WildmatchPattern(u'src/**', path_name=True, wild_star=True)
+        self.assertTrue(pattern.matches_all_under(u'src'))
+        self.assertFalse(pattern.may_match_under(u'lib'))
+        pattern = WildmatchPattern(u'src/*', path_name=False, wild_star=False)
+        self.assertTrue(pattern.may_match_under(u'lib'))
+        self.assertFalse(pattern.matches_all_under(u'src'))
+
+    def test_engine_errors(self):
+        with self.assertRaises(ValueError):
+            WildmatchPattern(u'*.py', path_name=False, wild_star=False, engine=ENGINE_SEGMENT)
+        with self.assertRaises(ValueError):
+            GitmatchPattern(u'*.py', engine=u'native')
+
+
+if __name__ == u'__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the stream module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import unittest
+
+from pathmatch import stream
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.pathspec import Pathspec, PathspecList
+from pathmatch.wildmatch import WildmatchPattern
+
+
+_PATHS = [b'src/main.py', b'src/main.pyc', b'build/lib/main.py', b'docs/index.rst', b'setup.py',
+          b'README.md', b'docs/new\nline.py', b'\xff\xfe.py']
+
+
+class TestReadPaths(unittest.TestCase):
+    u"""
+    TestCase for the read_paths function
+    """
+
+    def read(self, data, separator, chunk_size):
+        batches = list(stream.read_paths(io.BytesIO(data), separator, chunk_size))
+        for paths in batches:
+            self.assertGreater(len(paths), 0)
+        return [path for paths in batches for path in paths]
+
+    def test_read_paths(self):
+        data = b'\0'.join(_PATHS)
+        for chunk_size in (1, 2, 7, 1000):
+            self.assertEqual(_PATHS, self.read(data + b'\0', stream.NUL, chunk_size))
+            # Without trailing separator
+            self.assertEqual(_PATHS, self.read(data, stream.NUL, chunk_size))
+            self.assertEqual([b'a', b'', b'b'], self.read(b'a\n\nb\n', stream.NEWLINE, chunk_size))
+        self.assertEqual([], self.read(b'', stream.NEWLINE, None))
+
+    def test_batches(self):
+        data = b''.join(b'file' + str(i).encode(u'ascii') + b'.py\n' for i in range(1000))
+        batches = list(stream.read_paths(io.BytesIO(data), chunk_size=100))
+        self.assertGreater(len(batches), 50)
+        self.assertLessEqual(max(len(paths) for paths in batches), 15)
+
+
+class TestFilterStream(unittest.TestCase):
+    u"""
+    TestCase for the filter_stream function
+    """
+
+    def filter(self, matcher, data, **kwargs):
+        output = io.BytesIO()
+        count = matcher.filter_stream(io.BytesIO(data), output, **kwargs)
+        return count, output.getvalue()
+
+    def test_filter_stream(self):
+        pattern = GitmatchPattern(b'*.py')
+        data = b'\0'.join(_PATHS) + b'\0'
+        expected = [path for path in _PATHS if pattern.match(path)]
+        self.assertEqual((5, b'\0'.join(expected) + b'\0'),
+                         self.filter(pattern, data, separator=stream.NUL))
+        self.assertEqual((3, b'src/main.pyc\ndocs/index.rst\nREADME.md\n'),
+                         self.filter(pattern, data, separator=stream.NUL,
+                                     output_separator=stream.NEWLINE, invert=True))
+        self.assertEqual((0, b''), self.filter(pattern, b''))
+
+    def test_pathspecs(self):
+        pathspecs = PathspecList([Pathspec(GitmatchPattern(b'*.py')),
+                                  Pathspec(GitmatchPattern(b'/build/'), negated=True),
+                                  Pathspec(WildmatchPattern(b'docs/**'))], prefilter=True)
+        data = b'\n'.join(_PATHS[:6]).replace(b'build/', b'/build/')
+        self.assertEqual((3, b'src/main.py\ndocs/index.rst\nsetup.py\n'),
+                         self.filter(pathspecs, data))
+
+    def test_chunk_size(self):
+        pattern = WildmatchPattern(b'**/*.py')
+        data = b'\n'.join(_PATHS)
+        for chunk_size in (1, 3, 1000):
+            output = io.BytesIO()
+            count = stream.filter_stream(pattern.match, io.BytesIO(data), output,
+                                         chunk_size=chunk_size)
+            self.assertEqual(
+                (5, b'src/main.py\nbuild/lib/main.py\nsetup.py\nline.py\n\xff\xfe.py\n'),
+                (count, output.getvalue()))
+
+
+if __name__ == u'__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the syntax module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import unittest
+
+from pathmatch import syntax
+
+
+class TestParse(unittest.TestCase):
+    u"""
+    TestCase for the wildmatch parser
+    """
+
+    def test_parse(self):
+        self.assertEqual((), syntax.parse(u''))
+        self.assertEqual((syntax.Literal(u'foo/bar.txt'),), syntax.parse(u'foo/bar.txt'))
+        self.assertEqual(
+            (
+                syntax.WildStar(False),
+                syntax.Literal(u'src/'),
+                syntax.Asterisk(),
+                syntax.Literal(u'.py'),
+                syntax.BracketExpression(True, (syntax.CollatingElement(u'c'),
+                                                syntax.CollatingElement(u'o'))),
+                syntax.QuestionMark(),
+                syntax.Literal(u'/'),
+                syntax.WildStar(True),
+            ),
+            syntax.parse(u'**/src/*.py[co]?/**'))
+
+    def test_escape(self):
+        self.assertEqual((syntax.Literal(u'a*b[c]\\'),), syntax.parse(u'a\\*b\\[c]\\\\'))
+        self.assertEqual((syntax.Literal(u'a\\'), syntax.Asterisk()),
+                         syntax.parse(u'a\\*', no_escape=True))
+        with self.assertRaises(ValueError):
+            syntax.parse(u'foo\\')
+
+    def test_wild_star(self):
+        self.assertEqual((syntax.Literal(u'a/'), syntax.WildStar(False), syntax.Literal(u'b')),
+                         syntax.parse(u'a/**/****/**/b'))
+        self.assertEqual((syntax.Asterisk(), syntax.Asterisk()),
+                         syntax.parse(u'**', wild_star=False))
+        with self.assertRaises(ValueError):
+            syntax.parse(u'a**')
+        with self.assertRaises(ValueError):
+            syntax.parse(u'**a')
+
+    def test_nodes(self):
+        self.assertNotEqual(syntax.Asterisk(), syntax.QuestionMark())
+        self.assertNotEqual(syntax.Literal(u'a'), syntax.CollatingElement(u'a'))
+        self.assertNotEqual(hash(syntax.Literal(u'a')), hash(syntax.CollatingElement(u'a')))
+        self.assertEqual(len({syntax.Range(u'a', u'z'), syntax.Range(u'a', u'z')}), 1)
+        with self.assertRaises(AttributeError):
+            syntax.Literal(u'a').text = u'b'
+
+    def test_memoized_bracket_expressions(self):
+        first = syntax.parse(u'*.py[cod]')[-1]
+        second = syntax.parse(u'[cod]')[0]
+        self.assertIs(first, second)
+        # The escaping flag is part of the memoization key
+        escaped = (syntax.BracketExpression(True, (syntax.CollatingElement(u']'),)),)
+        not_escaped = (syntax.BracketExpression(True, (syntax.CollatingElement(u'\\'),)),
+                       syntax.Literal(u']'))
+        for repetition in range(2):
+            self.assertEqual(escaped, syntax.parse(u'[\\]]'))
+            self.assertEqual(not_escaped, syntax.parse(u'[\\]]', no_escape=True))
+
+    def test_bracket_expression_errors(self):
+        for pattern in (u'[', u'[!', u'[]', u'[a[.b]', u'[[:alpha]', u'[a\\'):
+            with self.assertRaises(ValueError):
+                syntax.parse(pattern)
+
+    def test_validate(self):
+        syntax.validate(syntax.parse(u'[a-z][[.ab.]][!/][[:alpha:]-]'))
+        for pattern in (u'[z-a]', u'[![.ab.]]', u'[[.ab.]-c]', u'[[..]]', u'x[![=ab=]y]'):
+            nodes = syntax.parse(pattern)  # Accepted by the parser
+            with self.assertRaises(ValueError):
+                syntax.validate(nodes)
+
+
+if __name__ == u'__main__':
+    unittest.main()
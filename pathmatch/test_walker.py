@@ -0,0 +1,194 @@
+# -*- coding: utf8 -*-
+
+u"""
+Unit-test for the walker module
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from pathmatch import walker
+from pathmatch.gitmatch import GitmatchPattern
+from pathmatch.pathspec import Pathspec, PathspecList
+from pathmatch.wildmatch import WildmatchPattern
+
+
+_FILES = [
+    u'setup.py', u'README.md', u'build', u'src/main.py', u'src/main.pyc', u'src/build/gen.py',
+    u'build_dir/lib/main.py', u'node_modules/a/index.js', u'src/node_modules/b/index.js',
+    u'docs/index.rst', u'docs/build/index.html',
+]
+
+
+def _gitignore(*rules):
+    return PathspecList(Pathspec(GitmatchPattern(rule.lstrip(u'!')), rule.startswith(u'!'))
+                        for rule in rules)
+
+
+@unittest.skipIf(walker.scandir is None, u'scandir is not available')
+class TestWalk(unittest.TestCase):
+    u"""
+    TestCase for the walk function
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for path in _FILES:
+            full_path = os.path.join(self.root, *path.split(u'/'))
+            if not os.path.isdir(os.path.dirname(full_path)):
+                os.makedirs(os.path.dirname(full_path))
+            with open(full_path, u'w'):
+                pass
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def assertWalk(self, expected, pathspecs, **kwargs):
+        actual = list(walker.walk(self.root, pathspecs, **kwargs))
+        self.assertEqual(sorted(expected), sorted(actual))
+        self.assertEqual(len(actual), len(set(actual)))
+        # Same result as filtering all the paths
+        rooted = kwargs.get(u'rooted', True)
+        all_paths = [u'/' + path if rooted else path for path in _FILES]
+        filtered = [path[1:] if rooted else path for path in pathspecs.filter(all_paths)]
+        self.assertEqual(sorted(filtered), sorted(actual))
+
+    def test_walk(self):
+        self.assertWalk(_FILES, _gitignore(u'*'))
+        self.assertWalk([], _gitignore())
+        self.assertWalk([u'setup.py', u'src/main.py', u'src/build/gen.py',
+                         u'build_dir/lib/main.py'], _gitignore(u'*.py'))
+
+    def test_directory_semantics(self):
+        # `build/` does not match the file `build`, `build` matches both
+        self.assertWalk([u'src/build/gen.py', u'docs/build/index.html'], _gitignore(u'build/'))
+        self.assertWalk([u'build', u'src/build/gen.py', u'docs/build/index.html'],
+                        _gitignore(u'build'))
+        self.assertWalk([u'docs/build/index.html'], _gitignore(u'/docs/build/'))
+
+    def test_negation(self):
+        pathspecs = _gitignore(u'*', u'!node_modules/', u'!build/', u'/src/node_modules/b/')
+        self.assertWalk([u'setup.py', u'README.md', u'build', u'src/main.py', u'src/main.pyc',
+                         u'build_dir/lib/main.py', u'src/node_modules/b/index.js',
+                         u'docs/index.rst'], pathspecs)
+
+    def test_pruning(self):
+        listed = []
+        original_scandir = walker.scandir
+
+        def scandir(path):
+            listed.append(os.path.relpath(path, self.root))
+            return original_scandir(path)
+
+        walker.scandir = scandir
+        try:
+            self.assertWalk([u'docs/index.rst'], _gitignore(u'/docs/', u'!build/'))
+        finally:
+            walker.scandir = original_scandir
+        self.assertEqual({u'.', u'docs'}, set(listed))
+
+    def test_wildmatch(self):
+        pathspecs = PathspecList([Pathspec(WildmatchPattern(u'src/**/*.py'))])
+        self.assertWalk([u'src/main.py', u'src/build/gen.py'], pathspecs, rooted=False)
+
+    def test_binary(self):
+        pathspecs = PathspecList([Pathspec(GitmatchPattern(b'/src/*.py'))])
+        actual = list(walker.walk(self.root.encode(u'utf8'), pathspecs))
+        self.assertEqual([b'src/main.py'], actual)
+
+    def test_scanner(self):
+        scanner = walker.Scanner(_gitignore(u'*', u'!/node_modules/', u'!*.pyc'))
+        paths, subdirectories = scanner.scan(scanner.root(self.root))
+        self.assertEqual([u'README.md', u'build', u'setup.py'], sorted(paths))
+        self.assertEqual([u'/build_dir/', u'/docs/', u'/src/'],
+                         sorted(prefix for _, prefix, _ in subdirectories))
+        binary_scanner = walker.Scanner(PathspecList([Pathspec(GitmatchPattern(b'*'))]),
+                                        binary=True, rooted=False)
+        paths, _ = binary_scanner.scan(binary_scanner.root(self.root.encode(u'utf8')))
+        self.assertIn(b'setup.py', paths)
+
+    def test_onerror(self):
+        errors = []
+        actual = list(walker.walk(os.path.join(self.root, u'missing'), _gitignore(u'*'),
+                                  onerror=errors.append))
+        self.assertEqual([], actual)
+        self.assertEqual(1, len(errors))
+        self.assertIsInstance(errors[0], OSError)
+
+    @unittest.skipIf(not hasattr(os, u'symlink'), u'Symbolic links are not supported')
+    def test_follow_links(self):
+        os.symlink(os.path.join(self.root, u'docs'), os.path.join(self.root, u'link'))
+        pathspecs = _gitignore(u'link', u'link/')
+        self.assertEqual([u'link'], list(walker.walk(self.root, pathspecs)))
+        self.assertEqual(sorted([u'link/index.rst', u'link/build/index.html']),
+                         sorted(walker.walk(self.root, pathspecs, follow_links=True)))
+
+
+@unittest.skipIf(walker.scandir is None, u'scandir is not available')
+class TestParallelWalk(unittest.TestCase):
+    u"""
+    TestCase for the parallel_walk function
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.files = list(_FILES)
+        self.files.extend(u'src/pkg{}/mod{}/file{}.py'.format(i % 5, i % 7, i) for i in range(100))
+        for path in self.files:
+            full_path = os.path.join(self.root, *path.split(u'/'))
+            if not os.path.isdir(os.path.dirname(full_path)):
+                os.makedirs(os.path.dirname(full_path))
+            with open(full_path, u'w'):
+                pass
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_same_paths(self):
+        for pathspecs in (_gitignore(u'*'), _gitignore(u'*.py', u'!/src/pkg1/'),
+                          _gitignore(u'*', u'!node_modules/', u'!mod3/')):
+            expected = list(walker.walk(self.root, pathspecs))
+            for threads, max_pending in ((1, None), (4, None), (4, 1), (16, 2)):
+                ordered = list(walker.parallel_walk(self.root, pathspecs, threads=threads,
+                                                    ordered=True, max_pending=max_pending))
+                self.assertEqual(expected, ordered)
+                unordered = list(walker.parallel_walk(self.root, pathspecs, threads=threads,
+                                                      max_pending=max_pending))
+                self.assertEqual(sorted(expected), sorted(unordered))
+
+    def test_close(self):
+        thread_count = threading.active_count()
+        paths = walker.parallel_walk(self.root, _gitignore(u'*'), threads=4)
+        next(paths)
+        self.assertEqual(thread_count + 4, threading.active_count())
+        paths.close()
+        self.assertEqual(thread_count, threading.active_count())
+
+    def test_errors(self):
+        errors = []
+        paths = walker.parallel_walk(os.path.join(self.root, u'missing'), _gitignore(u'*'),
+                                     ordered=True, onerror=errors.append)
+        self.assertEqual([], list(paths))
+        self.assertEqual(1, len(errors))
+
+        def fail(path):
+            raise RuntimeError(u'Match failure')
+
+        pathspecs = _gitignore(u'*')
+        pathspecs.match = fail
+        with self.assertRaises(RuntimeError):
+            list(walker.parallel_walk(self.root, pathspecs))
+        with self.assertRaises(ValueError):
+            walker.parallel_walk(self.root, pathspecs, threads=0)
+
+
+if __name__ == u'__main__':
+    unittest.main()
@@ -11,8 +11,10 @@ from __future__ import unicode_literals
 
 import unittest
 
+from pathmatch import syntax
 import pathmatch.wildmatch as wildmatch
 from pathmatch.helpers import generate_tests
+from pathmatch.wildmatch import WildmatchPattern
 
 
 # TODO: convert all tests to parametrized generated tests
@@ -49,12 +51,12 @@ class TestWildmatchFunctions(unittest.TestCase):
         # print(repr(pattern))
         if expected_matching is None:
             with self.assertRaises(Exception):
-                wildmatch._parse_bracket_expression(pattern)
+                syntax.parse_bracket_expression(pattern)
         else:
-            be, be_len = wildmatch._parse_bracket_expression(pattern)
-            actual_matching, actual_items = wildmatch._read_bracket_expression(be)
-            self.assertEqual(expected_matching, actual_matching)
-            self.assertEqual(tuple(expected_items), tuple(actual_items))
+            be, be_len = syntax.parse_bracket_expression(pattern)
+            self.assertEqual(expected_matching, be.matching)
+            self.assertEqual(tuple(expected_items), be.items)
+            self.assertEqual(len(pattern), be_len)
 
     def match_wild_star(self, pattern, text, result):
         if result is None:  # Expect error
@@ -62,12 +64,21 @@ class TestWildmatchFunctions(unittest.TestCase):
             # print(msg)
             with self.assertRaises(Exception):
                 wildmatch.translate(pattern, wild_star=True)
+            # The lazy patterns validate the syntax when they are created
+            with self.assertRaises(ValueError):
+                WildmatchPattern(pattern, lazy=True)
         else:
             # msg = u'Expect match({}, {}) to be {}'.format(repr(pattern), repr(text), repr(result))
             # print(msg)
             regex = wildmatch.translate(pattern, wild_star=True)
             # print(repr(regex.pattern))
             self.assertEqual(result, regex.match(text) is not None)
+            lazy_pattern = WildmatchPattern(pattern, lazy=True)
+            self.assertEqual(result, lazy_pattern.match(text))
+            self.assertEqual(regex.pattern, lazy_pattern.translate().pattern)
+            segment_pattern = WildmatchPattern(pattern, engine=wildmatch.ENGINE_SEGMENT)
+            self.assertEqual(result, segment_pattern.match(text))
+            self.assertEqual(result, segment_pattern.match_segments(text.split(u'/')))
 
     def match(self, pattern, text, result):
         msg = u'Expect match({}, {}) to be {}'.format(repr(pattern), repr(text), repr(result))
@@ -76,6 +87,9 @@ class TestWildmatchFunctions(unittest.TestCase):
     def match_case_fold(self, pattern, text, result):
         msg = u'Expect match({}, {}) to be {}'.format(repr(pattern), repr(text), repr(result))
         self.assertEqual(result, wildmatch.match(pattern, text, case_fold=True), msg)
+        segment_pattern = WildmatchPattern(pattern, case_fold=True,
+                                           engine=wildmatch.ENGINE_SEGMENT)
+        self.assertEqual(result, segment_pattern.match_segments(text.split(u'/')), msg)
 
     def translate(self, pattern, regex_pattern):
         translated = wildmatch.translate(pattern)
@@ -184,23 +198,23 @@ class TestWildmatchFunctions(unittest.TestCase):
 
         # Character class tests
         #
-        # self.match_wild_star(u'[[:alpha:]][[:digit:]][[:upper:]]', u'a1B', True)
-        # self.match_wild_star(u'[[:digit:][:upper:][:space:]]', u'a', False)
-        # self.match_wild_star(u'[[:digit:][:upper:][:space:]]', u'A', True)
-        # self.match_wild_star(u'[[:digit:][:upper:][:space:]]', u'1', True)
-        # self.match_wild_star(u'[[:digit:][:upper:][:spaci:]]', u'1', False)
-        # self.match_wild_star(u'[[:digit:][:upper:][:space:]]', u' ', True)
-        # self.match_wild_star(u'[[:digit:][:upper:][:space:]]', u'.', False)
-        # self.match_wild_star(u'[[:digit:][:punct:][:space:]]', u'.', True)
-        # self.match_wild_star(u'[[:xdigit:]]', u'5', True)
-        # self.match_wild_star(u'[[:xdigit:]]', u'f', True)
-        # self.match_wild_star(u'[[:xdigit:]]', u'D', True)
-        # self.match_wild_star(u'[[:alnum:][:alpha:][:blank:][:cntrl:][:digit:][:graph:][:lower:][:print:][:punct:][:space:][:upper:][:xdigit:]]', u'_', True)
-        # self.match_wild_star(u'[^[:alnum:][:alpha:][:blank:][:cntrl:][:digit:][:lower:][:space:][:upper:][:xdigit:]]', u'.', True)
-        # self.match_wild_star(u'[a-c[:digit:]x-z]', u'5', True)
-        # self.match_wild_star(u'[a-c[:digit:]x-z]', u'b', True)
-        # self.match_wild_star(u'[a-c[:digit:]x-z]', u'y', True)
-        # self.match_wild_star(u'[a-c[:digit:]x-z]', u'q', False)
+        self.match_wild_star(u'[[:alpha:]][[:digit:]][[:upper:]]', u'a1B', True)
+        self.match_wild_star(u'[[:digit:][:upper:][:space:]]', u'a', False)
+        self.match_wild_star(u'[[:digit:][:upper:][:space:]]', u'A', True)
+        self.match_wild_star(u'[[:digit:][:upper:][:space:]]', u'1', True)
+        self.match_wild_star(u'[[:digit:][:upper:][:spaci:]]', u'1', False)
+        self.match_wild_star(u'[[:digit:][:upper:][:space:]]', u' ', True)
+        self.match_wild_star(u'[[:digit:][:upper:][:space:]]', u'.', False)
+        self.match_wild_star(u'[[:digit:][:punct:][:space:]]', u'.', True)
+        self.match_wild_star(u'[[:xdigit:]]', u'5', True)
+        self.match_wild_star(u'[[:xdigit:]]', u'f', True)
+        self.match_wild_star(u'[[:xdigit:]]', u'D', True)
+        self.match_wild_star(u'[[:alnum:][:alpha:][:blank:][:cntrl:][:digit:][:graph:][:lower:][:print:][:punct:][:space:][:upper:][:xdigit:]]', u'_', True)
+        self.match_wild_star(u'[^[:alnum:][:alpha:][:blank:][:cntrl:][:digit:][:lower:][:space:][:upper:][:xdigit:]]', u'.', True)
+        self.match_wild_star(u'[a-c[:digit:]x-z]', u'5', True)
+        self.match_wild_star(u'[a-c[:digit:]x-z]', u'b', True)
+        self.match_wild_star(u'[a-c[:digit:]x-z]', u'y', True)
+        self.match_wild_star(u'[a-c[:digit:]x-z]', u'q', False)
 
         # Additional tests, including some malformed wildmatch patterns
 
@@ -302,37 +316,37 @@ class TestWildmatchFunctions(unittest.TestCase):
     #     self.match(u'*/*X*/*/*i', u'ab/cXd/efXg/hi', True)
     #     self.match(u'*Xg*i', u'ab/cXd/efXg/hi', True)
     #
-    #     # Case-sensitivy features
-    #
-    #     self.match_wild_star(u'[A-Z]', u'a', False)
-    #     self.match_wild_star(u'[A-Z]', u'A', True)
-    #     self.match_wild_star(u'[a-z]', u'A', False)
-    #     self.match_wild_star(u'[a-z]', u'a', True)
-    #     self.match_wild_star(u'[[:upper:]]', u'a', False)
-    #     self.match_wild_star(u'[[:upper:]]', u'A', True)
-    #     self.match_wild_star(u'[[:lower:]]', u'A', False)
-    #     self.match_wild_star(u'[[:lower:]]', u'a', True)
-    #     self.match_wild_star(u'[B-Za]', u'A', False)
-    #     self.match_wild_star(u'[B-Za]', u'a', True)
-    #     self.match_wild_star(u'[B-a]', u'A', False)
-    #     self.match_wild_star(u'[B-a]', u'a', True)
-    #     self.match_wild_star(u'[Z-y]', u'z', False)
-    #     self.match_wild_star(u'[Z-y]', u'Z', True)
-    #
-    #     self.match_case_fold(u'[A-Z]', u'a', True)
-    #     self.match_case_fold(u'[A-Z]', u'A', True)
-    #     self.match_case_fold(u'[a-z]', u'A', True)
-    #     self.match_case_fold(u'[a-z]', u'a', True)
-    #     self.match_case_fold(u'[[:upper:]]', u'a', True)
-    #     self.match_case_fold(u'[[:upper:]]', u'A', True)
-    #     self.match_case_fold(u'[[:lower:]]', u'A', True)
-    #     self.match_case_fold(u'[[:lower:]]', u'a', True)
-    #     self.match_case_fold(u'[B-Za]', u'A', True)
-    #     self.match_case_fold(u'[B-Za]', u'a', True)
-    #     self.match_case_fold(u'[B-a]', u'A', True)
-    #     self.match_case_fold(u'[B-a]', u'a', True)
-    #     self.match_case_fold(u'[Z-y]', u'z', True)
-    #     self.match_case_fold(u'[Z-y]', u'Z', True)
+        # Case-sensitivy features
+
+        self.match_wild_star(u'[A-Z]', u'a', False)
+        self.match_wild_star(u'[A-Z]', u'A', True)
+        self.match_wild_star(u'[a-z]', u'A', False)
+        self.match_wild_star(u'[a-z]', u'a', True)
+        self.match_wild_star(u'[[:upper:]]', u'a', False)
+        self.match_wild_star(u'[[:upper:]]', u'A', True)
+        self.match_wild_star(u'[[:lower:]]', u'A', False)
+        self.match_wild_star(u'[[:lower:]]', u'a', True)
+        self.match_wild_star(u'[B-Za]', u'A', False)
+        self.match_wild_star(u'[B-Za]', u'a', True)
+        self.match_wild_star(u'[B-a]', u'A', False)
+        self.match_wild_star(u'[B-a]', u'a', True)
+        self.match_wild_star(u'[Z-y]', u'z', False)
+        self.match_wild_star(u'[Z-y]', u'Z', True)
+
+        self.match_case_fold(u'[A-Z]', u'a', True)
+        self.match_case_fold(u'[A-Z]', u'A', True)
+        self.match_case_fold(u'[a-z]', u'A', True)
+        self.match_case_fold(u'[a-z]', u'a', True)
+        self.match_case_fold(u'[[:upper:]]', u'a', True)
+        self.match_case_fold(u'[[:upper:]]', u'A', True)
+        self.match_case_fold(u'[[:lower:]]', u'A', True)
+        self.match_case_fold(u'[[:lower:]]', u'a', True)
+        self.match_case_fold(u'[B-Za]', u'A', True)
+        self.match_case_fold(u'[B-Za]', u'a', True)
+        self.match_case_fold(u'[B-a]', u'A', True)
+        self.match_case_fold(u'[B-a]', u'a', True)
+        self.match_case_fold(u'[Z-y]', u'z', True)
+        self.match_case_fold(u'[Z-y]', u'Z', True)
 
         # Additional tests
 
@@ -348,6 +362,19 @@ class TestWildmatchFunctions(unittest.TestCase):
         self.match_wild_star(u'foo/**/bar', u'foo//bar', True)
         self.match_wild_star(u'foo]bar', u'foo]bar', True)
         self.match_wild_star(u'foo[bar', u'foo[bar', None)
+        # The wildcards match newlines, as the fast paths and the other engines
+        self.match_wild_star(u'*', u'a\nb', True)
+        self.match_wild_star(u'a?b', u'a\nb', True)
+        self.match_wild_star(u'[!a]', u'\n', True)
+        self.match_wild_star(u'**', u'a\n/b\n', True)
+        self.match_wild_star(u'**/b', u'x\ny/b', True)
+        self.match_wild_star(u'a/**/b*', u'a/\n/b\n', True)
+        self.match_wild_star(u'*\n*', u'a\nb', True)
+        # Bracket expressions rejected after parsing, also by the lazy patterns
+        self.match_wild_star(u'[z-a]x', u'x', None)
+        self.match_wild_star(u'[![.ab.]]x', u'x', None)
+        self.match_wild_star(u'[[.ab.]-c]x', u'x', None)
+        self.match_wild_star(u'[[..]]x', u'x', None)
         # self.match_wild_star(u'foo/**bar', u'foo/bar', False)
         # self.match_wild_star(u'foo/**bar', u'foo/x/bar', False)
 
@@ -427,7 +454,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[a]',
             True,
             [
-                wildmatch._create_be_collating_element(u'a'),
+                syntax.CollatingElement(u'a'),
             ])
 
         # Multiple characters
@@ -435,9 +462,9 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[abc]',
             True,
             [
-                wildmatch._create_be_collating_element(u'a'),
-                wildmatch._create_be_collating_element(u'b'),
-                wildmatch._create_be_collating_element(u'c'),
+                syntax.CollatingElement(u'a'),
+                syntax.CollatingElement(u'b'),
+                syntax.CollatingElement(u'c'),
             ])
 
         # Range expression
@@ -445,7 +472,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[a-b]',
             True,
             [
-                wildmatch._create_be_range(u'a', u'b'),
+                syntax.Range(u'a', u'b'),
             ])
 
         # Multi-character collating element
@@ -453,7 +480,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[[.ab.]]',
             True,
             [
-                wildmatch._create_be_collating_element(u'ab'),
+                syntax.CollatingElement(u'ab'),
             ])
 
         # Equivalence class
@@ -461,7 +488,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[[=ab=]]',
             True,
             [
-                wildmatch._create_be_equivalence_class(u'ab'),
+                syntax.EquivalenceClass(u'ab'),
             ])
 
         # Character class
@@ -469,7 +496,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[[:alpha:]]',
             True,
             [
-                wildmatch._create_be_character_class(u'alpha'),
+                syntax.CharacterClass(u'alpha'),
             ])
 
         # Meta characters
@@ -477,9 +504,9 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[]a-]',
             True,
             [
-                wildmatch._create_be_collating_element(u']'),
-                wildmatch._create_be_collating_element(u'a'),
-                wildmatch._create_be_collating_element(u'-'),
+                syntax.CollatingElement(u']'),
+                syntax.CollatingElement(u'a'),
+                syntax.CollatingElement(u'-'),
             ])
 
         # Dash and range
@@ -487,8 +514,8 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[-a-b]',
             True,
             [
-                wildmatch._create_be_collating_element(u'-'),
-                wildmatch._create_be_range(u'a', u'b'),
+                syntax.CollatingElement(u'-'),
+                syntax.Range(u'a', u'b'),
             ])
 
         # Dashes do not create ranges with classes
@@ -496,12 +523,12 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[[:alpha:]-ab-[=c=]]',
             True,
             [
-                wildmatch._create_be_character_class(u'alpha'),
-                wildmatch._create_be_collating_element(u'-'),
-                wildmatch._create_be_collating_element(u'a'),
-                wildmatch._create_be_collating_element(u'b'),
-                wildmatch._create_be_collating_element(u'-'),
-                wildmatch._create_be_equivalence_class(u'c'),
+                syntax.CharacterClass(u'alpha'),
+                syntax.CollatingElement(u'-'),
+                syntax.CollatingElement(u'a'),
+                syntax.CollatingElement(u'b'),
+                syntax.CollatingElement(u'-'),
+                syntax.EquivalenceClass(u'c'),
             ])
 
         # Complex expression
@@ -509,16 +536,16 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[^][:alpha:]-a-[.ch.]--- --[=oe=]-b-]',
             False,
             [
-                wildmatch._create_be_collating_element(u']'),
-                wildmatch._create_be_character_class(u'alpha'),
-                wildmatch._create_be_collating_element(u'-'),
-                wildmatch._create_be_range(u'a', u'ch'),
-                wildmatch._create_be_range(u'-', u'-'),
-                wildmatch._create_be_range(u' ', u'-'),
-                wildmatch._create_be_equivalence_class(u'oe'),
-                wildmatch._create_be_collating_element(u'-'),
-                wildmatch._create_be_collating_element(u'b'),
-                wildmatch._create_be_collating_element(u'-'),
+                syntax.CollatingElement(u']'),
+                syntax.CharacterClass(u'alpha'),
+                syntax.CollatingElement(u'-'),
+                syntax.Range(u'a', u'ch'),
+                syntax.Range(u'-', u'-'),
+                syntax.Range(u' ', u'-'),
+                syntax.EquivalenceClass(u'oe'),
+                syntax.CollatingElement(u'-'),
+                syntax.CollatingElement(u'b'),
+                syntax.CollatingElement(u'-'),
             ])
 
         # Range with escaped literal
@@ -526,7 +553,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[\\\\-^]',
             True,
             [
-                wildmatch._create_be_range(u'\\', u'^'),
+                syntax.Range(u'\\', u'^'),
             ])
 
         # Escaped dash
@@ -534,8 +561,8 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[\\-_]',
             True,
             [
-                wildmatch._create_be_collating_element(u'-'),
-                wildmatch._create_be_collating_element(u'_'),
+                syntax.CollatingElement(u'-'),
+                syntax.CollatingElement(u'_'),
             ])
 
         # Escaped end of bracket expression
@@ -543,7 +570,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[\\]]',
             True,
             [
-                wildmatch._create_be_collating_element(u']'),
+                syntax.CollatingElement(u']'),
             ])
 
         # Incomplete expression
@@ -566,7 +593,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[-]',
             True,
             [
-                wildmatch._create_be_collating_element(u'-'),
+                syntax.CollatingElement(u'-'),
             ])
 
         # Incomplete expression with a and dash
@@ -584,7 +611,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[--A]',
             True,
             [
-                wildmatch._create_be_range(u'-', u'A'),
+                syntax.Range(u'-', u'A'),
             ])
 
         # Range ending with dash
@@ -592,7 +619,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[ --]',
             True,
             [
-                wildmatch._create_be_range(u' ', u'-'),
+                syntax.Range(u' ', u'-'),
             ])
 
         # Chained range: the first range has priority
@@ -600,9 +627,9 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[a-b-c]',
             True,
             [
-                wildmatch._create_be_range(u'a', u'b'),
-                wildmatch._create_be_collating_element(u'-'),
-                wildmatch._create_be_collating_element(u'c'),
+                syntax.Range(u'a', u'b'),
+                syntax.CollatingElement(u'-'),
+                syntax.CollatingElement(u'c'),
             ])
 
         # Range of dashes
@@ -610,7 +637,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[---]',
             True,
             [
-                wildmatch._create_be_range(u'-', u'-'),
+                syntax.Range(u'-', u'-'),
             ])
 
         # Double range of dashes
@@ -618,8 +645,8 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[------]',
             True,
             [
-                wildmatch._create_be_range(u'-', u'-'),
-                wildmatch._create_be_range(u'-', u'-'),
+                syntax.Range(u'-', u'-'),
+                syntax.Range(u'-', u'-'),
             ])
 
         # Negated double range of dashes
@@ -627,8 +654,8 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[!------]',
             False,
             [
-                wildmatch._create_be_range(u'-', u'-'),
-                wildmatch._create_be_range(u'-', u'-'),
+                syntax.Range(u'-', u'-'),
+                syntax.Range(u'-', u'-'),
             ])
 
         # Range with right bracket
@@ -636,7 +663,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[]-a]',
             True,
             [
-                wildmatch._create_be_range(u']', u'a'),
+                syntax.Range(u']', u'a'),
             ])
 
         # Negated range with right bracket
@@ -644,7 +671,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[!]-a]',
             False,
             [
-                wildmatch._create_be_range(u']', u'a'),
+                syntax.Range(u']', u'a'),
             ])
 
         # Negated range with right bracket
@@ -652,7 +679,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[!]-a]',
             False,
             [
-                wildmatch._create_be_range(u']', u'a'),
+                syntax.Range(u']', u'a'),
             ])
 
         # Negation character as collating element
@@ -660,10 +687,10 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[a^bc]',
             True,
             [
-                wildmatch._create_be_collating_element(u'a'),
-                wildmatch._create_be_collating_element(u'^'),
-                wildmatch._create_be_collating_element(u'b'),
-                wildmatch._create_be_collating_element(u'c'),
+                syntax.CollatingElement(u'a'),
+                syntax.CollatingElement(u'^'),
+                syntax.CollatingElement(u'b'),
+                syntax.CollatingElement(u'c'),
             ])
 
         # Incomplete bracket expression caused by escape
@@ -676,7 +703,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[\\\\]',
             True,
             [
-                wildmatch._create_be_collating_element(u'\\'),
+                syntax.CollatingElement(u'\\'),
             ])
 
         # Negated escape matching
@@ -684,7 +711,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[^\\\\]',
             False,
             [
-                wildmatch._create_be_collating_element(u'\\'),
+                syntax.CollatingElement(u'\\'),
             ])
 
         # Range with escape
@@ -692,7 +719,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[A-\\\\]',
             True,
             [
-                wildmatch._create_be_range(u'A', u'\\'),
+                syntax.Range(u'A', u'\\'),
             ])
 
         # Range with punctuation
@@ -700,7 +727,7 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[,-.]',
             True,
             [
-                wildmatch._create_be_range(u',', u'.'),
+                syntax.Range(u',', u'.'),
             ])
 
         # Range similar to nested bracket expression
@@ -708,9 +735,99 @@ class TestWildmatchFunctions(unittest.TestCase):
             u'[[-\\]]',
             True,
             [
-                wildmatch._create_be_range(u'[', u']'),
+                syntax.Range(u'[', u']'),
             ])
 
 
+class TestBinaryWildmatch(TestWildmatchFunctions):
+    u"""
+    Runs the wildmatch test suite against bytes patterns and texts
+    """
+
+    def match_wild_star(self, pattern, text, result):
+        pattern = pattern.encode(u'utf-8')
+        text = text.encode(u'utf-8')
+        if result is None:  # Expect error
+            with self.assertRaises(Exception):
+                wildmatch.translate(pattern, wild_star=True)
+        else:
+            msg = u'Expect match({}, {}) to be {}'.format(repr(pattern), repr(text), repr(result))
+            self.assertEqual(result, WildmatchPattern(pattern).match(text), msg)
+            native_pattern = WildmatchPattern(pattern, engine=wildmatch.ENGINE_NATIVE)
+            self.assertEqual(result, native_pattern.match(text), msg)
+            segment_pattern = WildmatchPattern(pattern, engine=wildmatch.ENGINE_SEGMENT)
+            self.assertEqual(result, segment_pattern.match(text), msg)
+            self.assertEqual(result, segment_pattern.match_segments(text.split(b'/')), msg)
+
+    def test_binary_results(self):
+        pattern = WildmatchPattern(b'src/**/*.py')
+        self.assertTrue(pattern.binary)
+        self.assertIsInstance(pattern.translate().pattern, bytes)
+        self.assertIsInstance(pattern.translate(closed_regex=False).pattern, bytes)
+        self.assertEqual((b'src/', b'.py'), pattern.required_literals())
+        self.assertEqual(b'.py', wildmatch.classify(b'*.py').operand)
+
+    def test_undecodable_paths(self):
+        self.assertTrue(wildmatch.match(b'*.txt', b'\xff\xfe.txt'))
+        self.assertTrue(wildmatch.match(b'caf\xe9', b'caf\xe9'))
+        self.assertFalse(wildmatch.match(b'caf\xe9', b'caf\xc3\xa9'))
+        self.assertTrue(wildmatch.match(b'[\xe0-\xff]?', b'\xe9\x00'))
+        self.assertFalse(wildmatch.match(b'[!\xe9]', b'\xe9'))
+        self.assertTrue(wildmatch.match(b'?', b'\xe9'))
+        self.assertFalse(wildmatch.match(b'?', b'\xc3\xa9'))
+
+    def test_ascii_character_classes(self):
+        self.assertTrue(wildmatch.match(b'[[:alpha:]]', b'e'))
+        self.assertFalse(wildmatch.match(b'[[:alpha:]]', b'\xe9'))
+        self.assertTrue(wildmatch.match(b'[![:alpha:]]', b'\xe9'))
+        self.assertFalse(wildmatch.match(b'[[:space:]]', b'\xa0'))
+        self.assertTrue(wildmatch.match(b'[[:upper:]]', b'e', case_fold=True))
+        self.assertFalse(wildmatch.match(b'[[:upper:]]', b'\xe9', case_fold=True))
+
+
+class TestLazyWildmatchPattern(unittest.TestCase):
+    u"""
+    TestCase for the lazy compilation of WildmatchPattern
+    """
+
+    def test_is_compiled(self):
+        self.assertTrue(WildmatchPattern(u'*.py').is_compiled())
+        # Fast path: the regex is only compiled if it is requested
+        fast_pattern = WildmatchPattern(u'*.py', lazy=True)
+        self.assertTrue(fast_pattern.match(u'setup.py'))
+        self.assertFalse(fast_pattern.is_compiled())
+        self.assertEqual(u'\\A[^/]*\\.py\\Z', fast_pattern.translate().pattern)
+        self.assertTrue(fast_pattern.is_compiled())
+        # Regex: compiled by the first match
+        pattern = WildmatchPattern(u'src/*/[a-c]*.py', lazy=True)
+        self.assertFalse(pattern.is_compiled())
+        self.assertEqual(u'src/', max(pattern.required_literals(), key=len))
+        self.assertFalse(pattern.is_compiled())
+        self.assertFalse(pattern.match(u'src/lib/main.py'))
+        self.assertTrue(pattern.is_compiled())
+        self.assertTrue(pattern.match(u'src/lib/bar.py'))
+
+    def test_case_fold(self):
+        pattern = WildmatchPattern(u'*.s', case_fold=True, lazy=True)
+        self.assertTrue(pattern.match(u'BOOT.S'))
+        self.assertFalse(pattern.is_compiled())
+        # The non-ASCII suffixes are matched by the regex (long s)
+        result = pattern.match(u'boot.\u017f')
+        self.assertTrue(pattern.is_compiled())
+        self.assertEqual(pattern.translate().match(u'boot.\u017f') is not None, result)
+
+    def test_filter(self):
+        texts = [u'src/lib/bar.py', u'src/lib/main.py', u'src/a.py']
+        pattern = WildmatchPattern(u'src/*/[a-c]*.py', lazy=True)
+        matches = pattern.filter(texts)
+        # The matcher is resolved once, the elements do not go through the lazy compilation
+        self.assertTrue(pattern.is_compiled())
+        self.assertNotEqual(pattern._compile_and_match, pattern._match)
+        self.assertEqual([u'src/lib/bar.py'], list(matches))
+        self.assertEqual([True, False, False],
+                         [bool(result) for result in WildmatchPattern(
+                             u'src/*/[a-c]*.py', lazy=True).match_many(texts)])
+
+
 if __name__ == u'__main__':
     unittest.main()
@@ -0,0 +1,403 @@
+# -*- coding: utf8 -*-
+
+u"""
+This module exposes a directory tree walker driven by a list of path specs.
+
+Running `os.walk` and filtering its paths lists every directory, including the ignored ones
+(`node_modules/`, `build/`...). The walker decides for each directory whether its content can
+match before listing it (see `PathspecList.subtree_verdict`): the excluded directories are never
+listed and the content of the included ones is yielded without matching it.
+
+The directories are listed with `scandir`: the type of the entries comes from the listing itself,
+without calling `stat` on every entry. `parallel_walk` lists several directories at a time on a
+pool of threads.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import with_statement
+
+import threading
+# noinspection PyCompatibility
+import typing
+
+from six import binary_type, text_type
+from six.moves import queue
+
+from pathmatch.pathspec import EXCLUDED, INCLUDED, PathspecList
+
+try:
+    from os import scandir
+except ImportError:  # pragma: no cover
+    try:
+        # Python 2: backport of `os.scandir` (`pip install pathmatch[walk]`)
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+
+_SLASH = u'/'
+_BINARY_SLASH = b'/'
+
+
+def walk(root, pathspecs, rooted=True, follow_links=False, onerror=None):
+    u"""
+    Returns a generator yielding the paths of the files inside `root` matched by `pathspecs`.
+
+    The yielded paths are relative to `root` and use forward slashes, for example `src/main.py`.
+    Directories are not yielded themselves: a directory is matched through its content, with the
+    trailing slash semantics of the gitmatch patterns (`build/` matches the content of the
+    directory `build` but not a file named `build`).
+
+    :type root: text_type | binary_type
+    :param root: Path of the directory to walk, a bytes path yields bytes paths
+    :type pathspecs: PathspecList
+    :param pathspecs: The path specs selecting the yielded files
+    :type rooted: bool
+    :param rooted: Match the paths with a leading slash, as returned by `gitmatch.normalize_path`:
+                   the rooted gitmatch patterns (`/build/`) are relative to `root`. Use `False`
+                   to match relative paths, for example against wildmatch patterns.
+    :type follow_links: bool
+    :param follow_links: Walk the symbolic links to directories. By default, they are matched
+                         and yielded like files.
+    :type onerror: typing.Callable[[OSError], None] | None
+    :param onerror: Called with the error when a directory cannot be listed, the directory is
+                    skipped (see `os.walk`).
+    :rtype: typing.Generator[text_type | binary_type]
+    :return: A generator of relative paths, in depth-first order
+    """
+    if scandir is None:  # pragma: no cover
+        raise ImportError(u'`walk` requires `os.scandir` (Python 3.5+) or the `scandir` package')
+    scanner = Scanner(pathspecs, isinstance(root, binary_type), rooted, follow_links)
+    return _walk(root, scanner, onerror)
+
+
+def parallel_walk(root, pathspecs, threads=4, ordered=False, max_pending=None, rooted=True,
+                  follow_links=False, onerror=None):
+    u"""
+    Returns a generator yielding the paths of the files inside `root` matched by `pathspecs`,
+    listing the directories and matching their entries on a pool of threads (see `walk`).
+
+    The directory listings are the main cost on network file systems: the threads keep several
+    listings in flight. At most `max_pending` directories are listed or buffered at a time: the
+    threads wait when the consumer of the generator falls behind.
+
+    :type root: text_type | binary_type
+    :param root: Path of the directory to walk, a bytes path yields bytes paths
+    :type pathspecs: PathspecList
+    :param pathspecs: The path specs selecting the yielded files
+    :type threads: int
+    :param threads: Number of worker threads
+    :type ordered: bool
+    :param ordered: Yield the paths in the order of `walk`. By default, the paths of each
+                    directory are yielded as soon as it is listed.
+    :type max_pending: int | None
+    :param max_pending: Maximum number of directories being listed or waiting to be yielded, four
+                        per thread by default
+    :type rooted: bool
+    :param rooted: See `walk`
+    :type follow_links: bool
+    :param follow_links: See `walk`
+    :type onerror: typing.Callable[[OSError], None] | None
+    :param onerror: See `walk`, it is called on the thread consuming the generator
+    :rtype: typing.Generator[text_type | binary_type]
+    :return: A generator of relative paths
+    """
+    if scandir is None:  # pragma: no cover
+        raise ImportError(u'`parallel_walk` requires `os.scandir` (Python 3.5+) or the `scandir` '
+                          u'package')
+    if threads < 1:
+        raise ValueError(u'`threads` must be positive: {}'.format(threads))
+    if max_pending is None:
+        max_pending = 4 * threads
+    elif max_pending < 1:
+        raise ValueError(u'`max_pending` must be positive: {}'.format(max_pending))
+    scanner = Scanner(pathspecs, isinstance(root, binary_type), rooted, follow_links)
+    walker = _ParallelWalker(scanner, root, threads, max_pending, onerror)
+    return walker.ordered() if ordered else walker.unordered()
+
+
+class Scanner(object):
+    def __init__(self, pathspecs, binary=False, rooted=True, follow_links=False):
+        u"""
+        Lists the directories of a walk and matches their entries. The walkers (`walk`,
+        `parallel_walk` and `aio.awalk`) only differ in the way they schedule the scans.
+
+        :type pathspecs: PathspecList
+        :type binary: bool
+        :param binary: The root is a bytes path, the paths are bytes
+        :type rooted: bool
+        :param rooted: See `walk`
+        :type follow_links: bool
+        :param follow_links: See `walk`
+        :rtype: None
+        """
+        slash = _BINARY_SLASH if binary else _SLASH
+        # Prefix of the matched paths before the relative path (a slash or empty)
+        match_prefix = slash if rooted else slash[:0]
+        self.match = pathspecs.match
+        self.matchers = pathspecs.subtree_matchers()
+        self.subtree_next = pathspecs.subtree_next
+        self.subtree_verdict = pathspecs.subtree_verdict_from_states
+        self.match_prefix = match_prefix
+        self.slash = slash
+        self.follow_links = follow_links
+        self.root_states = pathspecs.subtree_start(self.matchers)
+        if len(match_prefix) > 0:  # The leading slash of the rooted paths is an empty component
+            self.root_states = self.subtree_next(self.matchers, self.root_states,
+                                                 match_prefix[:0])
+
+    def root(self, root):
+        u"""
+        Returns the directory to scan first.
+
+        :type root: text_type | binary_type
+        :rtype: tuple
+        :return: The filesystem path, the matched path prefix and the verdict states of the
+                 directory, `None` if its whole content is included.
+        """
+        return root, self.match_prefix, self.root_states
+
+    def scan(self, directory):
+        u"""
+        Lists a directory, returns its matched files and the subdirectories to scan. The matched
+        path prefix of a directory and its verdict states are computed once for all of its
+        entries, from the ones of its parent.
+
+        :type directory: tuple
+        :param directory: A directory returned by `root` or by a previous scan
+        :rtype: typing.Tuple[list, list]
+        :return: The relative paths of the matched files and the subdirectories to scan, the
+                 excluded subdirectories are pruned
+        :raise OSError: If the directory cannot be listed
+        """
+        fs_path, dir_prefix, states = directory
+        match, matchers, slash = self.match, self.matchers, self.slash
+        prefix_length = len(self.match_prefix)
+        paths = []
+        subdirectories = []
+        # The listing is read at once: no directory stays open while paths are yielded
+        for entry in list(scandir(fs_path)):
+            name = entry.name
+            path = dir_prefix + name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=self.follow_links)
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if states is None:
+                    subdirectories.append((entry.path, path + slash, None))
+                    continue
+                # The directory path is matched without its trailing slash
+                dir_states = self.subtree_next(matchers, states, name)
+                verdict = self.subtree_verdict(matchers, dir_states, path)
+                if verdict != EXCLUDED:
+                    subdirectories.append((entry.path, path + slash,
+                                           None if verdict == INCLUDED else dir_states))
+            elif states is None or match(path):
+                paths.append(path[prefix_length:])
+        return paths, subdirectories
+
+
+def _walk(root, scanner, onerror):
+    u"""
+    Implementation of `walk`.
+
+    :type root: text_type | binary_type
+    :type scanner: Scanner
+    :type onerror: typing.Callable[[OSError], None] | None
+    :rtype: typing.Generator[text_type | binary_type]
+    """
+    stack = [scanner.root(root)]  # Directories to scan
+    while len(stack) > 0:
+        try:
+            paths, subdirectories = scanner.scan(stack.pop())
+        except OSError as error:
+            if onerror is not None:
+                onerror(error)
+            continue
+        for path in paths:
+            yield path
+        subdirectories.reverse()
+        stack.extend(subdirectories)
+
+
+class _ParallelWalker(object):
+    def __init__(self, scanner, root, threads, max_pending, onerror):
+        u"""
+        Coordinates the worker threads of `parallel_walk`, from the thread consuming the paths.
+
+        The workers take `(key, directory)` tasks from an unbounded queue and return `(key,
+        result, error)` on the results queue. The coordinator submits a new task only when less
+        than `max_pending` directories are being scanned or buffered: this bounds both queues.
+
+        :type scanner: Scanner
+        :type root: text_type | binary_type
+        :type threads: int
+        :type max_pending: int
+        :type onerror: typing.Callable[[OSError], None] | None
+        :rtype: None
+        """
+        self.scanner = scanner
+        self.root = root
+        self.thread_count = threads
+        self.max_pending = max_pending
+        self.onerror = onerror
+        self.tasks = queue.Queue()
+        self.results = queue.Queue()
+        self.in_flight = 0  # Number of submitted tasks whose result is not received yet
+
+    def unordered(self):
+        u"""
+        Yields the paths of each directory as soon as it is scanned.
+
+        :rtype: typing.Generator[text_type | binary_type]
+        """
+        threads = self._start()
+        try:
+            pending = [self.scanner.root(self.root)]  # Directories to submit
+            while len(pending) > 0 or self.in_flight > 0:
+                while len(pending) > 0 and self.in_flight < self.max_pending:
+                    self._submit(None, pending.pop())
+                _, result = self._receive()
+                if result is not None:
+                    paths, subdirectories = result
+                    subdirectories.reverse()
+                    pending.extend(subdirectories)
+                    for path in paths:
+                        yield path
+        finally:
+            self._stop(threads)
+
+    def ordered(self):
+        u"""
+        Yields the paths in the order of `walk`: the directories are scanned ahead of the
+        consumer, in the same depth-first order, and their results are buffered.
+
+        :rtype: typing.Generator[text_type | binary_type]
+        """
+        threads = self._start()
+        try:
+            # Directories to yield, as `[key, directory, submitted]` tasks shared with `pending`
+            stack = [[0, self.scanner.root(self.root), False]]
+            pending = list(stack)  # Tasks to submit ahead, the next one to yield at the end
+            done = {}  # Results of the scanned directories, by key
+            next_key = 1
+            while len(stack) > 0:
+                task = stack.pop()
+                self._submit_task(task)  # The next directory to yield is always submitted
+                key = task[0]
+                while True:
+                    # Scan ahead while the consumer processes the buffered results
+                    while len(pending) > 0 and self.in_flight + len(done) < self.max_pending:
+                        self._submit_task(pending.pop())
+                    if key in done:
+                        break
+                    result_key, result = self._receive()
+                    done[result_key] = result
+                result = done.pop(key)
+                if result is None:
+                    continue
+                paths, subdirectories = result
+                children = [[child_key, directory, False]
+                            for child_key, directory in enumerate(subdirectories, next_key)]
+                next_key += len(children)
+                children.reverse()
+                stack.extend(children)
+                pending.extend(children)
+                for path in paths:
+                    yield path
+        finally:
+            self._stop(threads)
+
+    def _start(self):
+        u"""
+        Starts the worker threads.
+
+        :rtype: typing.List[threading.Thread]
+        """
+        threads = []
+        for _ in range(self.thread_count):
+            thread = threading.Thread(target=_work, args=(self.scanner, self.tasks, self.results))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        return threads
+
+    def _stop(self, threads):
+        u"""
+        Stops the worker threads, after their current tasks.
+
+        :type threads: typing.List[threading.Thread]
+        :rtype: None
+        """
+        for _ in threads:
+            self.tasks.put(None)
+        for thread in threads:
+            thread.join()
+
+    def _submit(self, key, directory):
+        u"""
+        Submits the scan of a directory to the workers.
+
+        :type key: int | None
+        :type directory: tuple
+        :rtype: None
+        """
+        self.tasks.put((key, directory))
+        self.in_flight += 1
+
+    def _submit_task(self, task):
+        u"""
+        Submits the scan of a directory of `ordered`, unless it was already submitted.
+
+        :type task: list
+        :param task: `[key, directory, submitted]`
+        :rtype: None
+        """
+        key, directory, submitted = task
+        if not submitted:
+            self._submit(key, directory)
+            task[2] = True
+
+    def _receive(self):
+        u"""
+        Waits for the result of a scan. The listing errors are reported to `onerror`, the other
+        errors are raised.
+
+        :rtype: typing.Tuple[int | None, tuple | None]
+        :return: The key of the directory and the result of its scan, `None` on error
+        """
+        key, result, error = self.results.get()
+        self.in_flight -= 1
+        if error is not None:
+            if not isinstance(error, OSError):
+                raise error
+            if self.onerror is not None:
+                self.onerror(error)
+        return key, result
+
+
+def _work(scanner, tasks, results):
+    u"""
+    Main function of the worker threads of `parallel_walk`: scans the directories of `tasks`
+    until it receives `None`.
+
+    :type scanner: Scanner
+    :type tasks: queue.Queue
+    :type results: queue.Queue
+    :rtype: None
+    """
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        key, directory = task
+        try:
+            result = scanner.scan(directory)
+        except Exception as error:  # Reported by the coordinator
+            results.put((key, None, error))
+        else:
+            results.put((key, result, None))
@@ -21,332 +21,19 @@ import re
 # noinspection PyCompatibility
 import typing
 
-from six import text_type, unichr
-
+from six import binary_type, text_type
+
+from pathmatch import batch
+from pathmatch import cache
+from pathmatch import compiler
+from pathmatch import fastpath
+from pathmatch import segment
+from pathmatch import syntax
+from pathmatch.compiler import ENGINE_NATIVE, ENGINE_REGEX, ENGINE_SEGMENT, RegexType
 from pathmatch.pattern import Pattern
 
-
-RegexType = type(re.compile(u''))
-
-
-# POSIX character classes for ASCII.
-# This is currently not used, ideally we would support unicode character classes
-# http://pubs.opengroup.org/onlinepubs/9699919799/functions/wctype.html
-# http://pubs.opengroup.org/onlinepubs/009695399/basedefs/xbd_chap09.html#tag_09_03_05
-_CHARACTER_CLASSES = {
-    u'alnum': u'[a-zA-Z0-9]',
-    u'alpha': u'[a-zA-Z]',
-    u'blank': u'[ \\t]',
-    u'cntrl': u'[\\x00-\\x1f\\x7f]',  # ASCII C0 (ECMA-48) characters and DEL (0x7f)
-    u'digit': u'[0-9]',
-    u'graph': u'[\\x21-\\x7e]',  # ASCII graphical characters (without C0, DEL and SP)
-    u'lower': u'[a-z]',
-    u'print': u'[\\x20-\\x7e]',  # ASCII printable characters (without C0 and DEL)
-    u'punct': u'[!"#$%&\'()*+,\\-./:;<=>?@[\\\\\\]^_`{|}~]',  # Escaped characters: -\]
-    u'space': u'[ \\t\\r\\n\\v\\f]',  # ASCII: SP, HT, CR, LF, VT, FF
-    u'upper': u'[A-Z]',
-    u'xdigit': u'[A-Fa-f0-9]',
-}
-
-# When inserted in a pattern, this prevents the pattern from matching anything.
-_PY_IMPOSSIBLE_MATCH = u'(?:a\\A)'
-
-# Wildmatch special characters
 _SLASH = u'/'  # Path separator
-_PERIOD = u'.'
-_ASTERISK = u'*'
-_WILD_STAR = u'**'
-_QUESTION_MARK = u'?'
-_ESCAPE = u'\\'
-
-# Bracket expression
-_BE_OPEN = u'['
-_BE_NON_MATCHING = u'!'  # Characters negating the bracket expression
-_BE_NON_MATCHING2 = u'^'  # POSIX allows to use it as an alternative (git's `wildmatch` uses it)
-_BE_CLOSE = u']'
-_BE_CS_OPEN = u'[.'  # Collating symbol
-_BE_ECE_OPEN = u'[='  # Equivalence class expression
-_BE_CCE_OPEN = u'[:'  # Character class expression
-_BE_CS_CLOSE = u'.]'  # Collating symbol
-_BE_ECE_CLOSE = u'=]'  # Equivalence class expression
-_BE_CCE_CLOSE = u':]'  # Character class expression
-_BE_RANGE = u'-'
-
-
-class _BracketExpression(object):
-    u"""
-
-    items contains one of the following:
-    text_type: literal match, can be a multi-character string to represent some collating elements
-    Tuple[text_type, text_type]: represents an inclusive range, the first item is the start
-                                 collating element, the second is the end. Only single-character
-                                 collating elements are supported.
-
-    """
-    def __init__(self, matching, items):
-        self.matching = matching
-        self.items = items
-
-
-# Create a node
-
-def _create_bracket_expression(matching, items):
-    return u'bracket_expression', matching, items
-
-
-def _create_be_collating_element(sequence):
-    return u'collating_element', sequence
-
-
-def _create_be_equivalence_class(representant):
-    return u'equivalence_class', representant
-
-
-def _create_be_character_class(name):
-    return u'character_class', name
-
-
-def _create_be_range(start, end):
-    return u'range', start, end
-
-
-def _create_be_unmatched_range():
-    return u'_unmatched_range',
-
-
-# Test a node
-
-def _is_bracket_expression(node):
-    return node[0] == u'bracket_expression'
-
-
-def _is_be_collating_element(item):
-    return item[0] == u'collating_element'
-
-
-def _is_be_equivalence_class(item):
-    return item[0] == u'equivalence_class'
-
-
-def _is_be_character_class(item):
-    return item[0] == u'character_class'
-
-
-def _is_be_range(item):
-    return item[0] == u'range'
-
-
-def _is_be_unmatched_range(item):
-    return item[0] == u'_unmatched_range'
-
-
-# Read a node
-def _read_bracket_expression(node):
-    return node[1], node[2]
-
-
-def _read_be_collating_element(item):
-    return item[1]
-
-
-def _read_be_equivalence_class(item):
-    return item[1]
-
-
-def _read_be_character_class(item):
-    return item[1]
-
-
-def _read_be_range(item):
-    return item[1], item[2]
-
-
-def _parse_bracket_expression(pattern, start=0, no_escape=False):
-    u"""
-
-    :type pattern: text_type
-    :param pattern:
-    :param start:
-    :return:
-    """
-    i = start
-
-    if pattern[i:i+len(_BE_OPEN)] != _BE_OPEN:
-        raise ValueError(u'Expected {}'.format(repr(_BE_OPEN)))
-    i += len(_BE_OPEN)
-
-    # fnmatch builds on top of POSIX, but uses `!` while POSIX uses `^`
-    if pattern[i:i+len(_BE_NON_MATCHING)] == _BE_NON_MATCHING:
-        matching = False
-        i += len(_BE_NON_MATCHING)
-    elif pattern[i:i+len(_BE_NON_MATCHING2)] == _BE_NON_MATCHING2:
-        matching = False
-        i += len(_BE_NON_MATCHING2)
-    else:
-        matching = True
-
-    # We iterate other the items twice, first we get the tokens and parse most of it except for
-    # ranges. Then, we resolve ranges by joining collating elements separated by an empty range
-    # marker
-
-    # Items in this bracket expression
-    items = []
-
-    # First pass: tokenize
-    while len(items) == 0 or pattern[i:i + len(_BE_CLOSE)] != _BE_CLOSE:
-        if not no_escape and pattern[i:i+len(_ESCAPE)] == _ESCAPE:  # Literal escape \a
-            i += len(_ESCAPE)
-            if i >= len(pattern):
-                raise ValueError(u'Invalid pattern, incomplete escape sequence')
-            items.append(_create_be_collating_element(pattern[i:i + 1]))
-            i += 1
-        elif pattern[i:i+len(_BE_CS_OPEN)] == _BE_CS_OPEN:  # Collating symbol [.abc.]
-            cs, cs_len = _parse_be_collating_symbol(pattern, i)
-            items.append(_create_be_collating_element(cs))
-            i += cs_len
-        elif pattern[i:i+len(_BE_ECE_OPEN)] == _BE_ECE_OPEN:  # Equivalence class expression [=abc=]
-            # Currently, equivalence classes are a synonym for collating symbols because we do not
-            # support equivalence classes. The difference is that we have to prevent them from
-            # ending ranges to eventually add support for equivalence classes in the future
-            ec_repr, ece_len = _parse_be_equivalence_class_expression(pattern, i)
-            items.append(_create_be_equivalence_class(ec_repr))
-            i += ece_len
-        elif pattern[i:i+len(_BE_CCE_OPEN)] == _BE_CCE_OPEN:  # Character class expression [:alpha:]
-            cc_name, cce_len = _parse_be_character_class_expression(pattern, i)
-            items.append(_create_be_character_class(cc_name))
-            i += cce_len
-        elif pattern[i:i + len(_BE_RANGE)] == _BE_RANGE:  # Range a-c
-            items.append(_create_be_unmatched_range())
-            i += len(_BE_RANGE)
-        else:  # Single-character collating element
-            items.append(_create_be_collating_element(pattern[i:i+1]))
-            i += 1
-
-        if i >= len(pattern):
-            raise ValueError(u'InvalidPattern, end of bracket expression not found')
-    i += len(_BE_CLOSE)
-
-    # Second pass: resolve ranges
-    items_with_ranges = []
-    j = 0
-    while j < len(items):
-        item = items[j]
-        if not _is_be_unmatched_range(item):
-            items_with_ranges.append(item)
-        else:
-            # From here, the current item is an unmatched range, we try to get the previous and next
-            # item if they are collating elements
-            if j == 0:
-                prev_elem = None
-            else:
-                prev_elem = items_with_ranges[-1]
-                if not _is_be_collating_element(prev_elem):
-                    prev_elem = None
-            if j == len(items) - 1:
-                next_elem = None
-            else:
-                next_elem = items[j + 1]
-                # case [a--], [---] or [[.a.]--]
-                if prev_elem is not None and _is_be_unmatched_range(next_elem):
-                    next_elem = _create_be_collating_element(_BE_RANGE)
-                elif not _is_be_collating_element(next_elem):
-                    next_elem = None
-
-            # Unmatched dash between two collating elements
-            if prev_elem is not None and next_elem is not None:
-                # Note that we allow ranges between multi-character collating elements
-                range_start = _read_be_collating_element(prev_elem)
-                range_end = _read_be_collating_element(next_elem)
-                # Equivalent to .pop then .append
-                items_with_ranges[-1] = _create_be_range(range_start, range_end)
-                j += 1  # Skip the next item (corresponds to the end of the range)
-            # Add the dash as a collating element
-            else:
-                items_with_ranges.append(_create_be_collating_element(_BE_RANGE))
-                _create_be_collating_element(_BE_RANGE)
-        j += 1
-
-    return _create_bracket_expression(matching, items_with_ranges), i - start
-
-
-def _parse_be_collating_symbol(pattern, start=0):
-    # POSIX allows to define local-dependent digraphs and other groups of characters that
-    # should be treated as a single character. We do not support it because this is a local
-    # dependant behavior. For example, if a locale defines the digraph 'ch' as a
-    # collating symbol, both expressions should match the text 'echo':
-    # e[[.ch.]]o
-    # e?o
-    # Since translation to the python regex pattern syntax for multi-character collating
-    # symbols is not well defined yet, we only support single character symbols and let them
-    # match themselves. An idea would be to translate e[a[.ch.]b]e to e(?:[ab]|ch)o but this
-    # does not solve the translation of e?o unless we know all the collating symbols, this
-    # would give something like e(?:.|ch|ae|symb)o where 'ch', 'ae' and 'symb' are all the
-    # collating symbols of the current locale.
-
-    i = start
-    if pattern[i:i + len(_BE_CS_OPEN)] != _BE_CS_OPEN:
-        raise ValueError(u'Expected {}'.format(repr(_BE_CS_OPEN)))
-    i += len(_BE_CS_OPEN)
-
-    ce_start = i  # Start of collating element
-
-    while pattern[i:i + len(_BE_CS_CLOSE)] != _BE_CS_CLOSE:
-        i += 1
-        if i >= len(pattern):
-            raise ValueError(u'Invalid pattern, end of collating symbol not found')
-
-    ce_end = i  # End of collating element
-    i += len(_BE_CS_CLOSE)
-
-    return pattern[ce_start:ce_end], i - start
-
-
-def _parse_be_equivalence_class_expression(pattern, start=0):
-    # POSIX allows to define local dependant equivalences between collating symbols (see above).
-    # For example, 'e', 'é', 'è' and 'ê' are members of the same equivalence class in the french
-    # locale so the pattern [[=e=]][[=e=]][[=e=]][[=e=]] matches the text 'eéèê'.
-    # We do not support equivalence classes, a equivalence class expression only matches itself.
-    # For the same reason as collating symbols, we do not support multi-character sequences.
-
-    i = start
-
-    if pattern[i:i + len(_BE_ECE_OPEN)] != _BE_ECE_OPEN:
-        raise ValueError(u'Expected {}'.format(repr(_BE_ECE_OPEN)))
-    i += len(_BE_ECE_OPEN)
-
-    elem_start = i  # Start of collating element
-
-    while pattern[i:i + len(_BE_ECE_CLOSE)] != _BE_ECE_CLOSE:
-        i += 1
-        if i >= len(pattern):
-            raise ValueError(u'Invalid pattern, end of equivalence class expression not found')
-
-    elem_end = i  # End of collating element
-    i += len(_BE_ECE_CLOSE)
-
-    return pattern[elem_start:elem_end], i - start
-
-
-def _parse_be_character_class_expression(pattern, start=0):
-    # [:alpha:]
-
-    i = start
-
-    if pattern[i:i + len(_BE_CCE_OPEN)] != _BE_CCE_OPEN:
-        raise ValueError(u'Expected {}'.format(repr(_BE_CCE_OPEN)))
-    i += len(_BE_CCE_OPEN)
-
-    ce_start = i  # Start of collating element
-
-    while pattern[i:i + len(_BE_CCE_CLOSE)] != _BE_CCE_CLOSE:
-        i += 1
-        if i >= len(pattern):
-            raise ValueError(u'Invalid pattern, end of character class expression not found')
-
-    ce_end = i  # End of collating element
-    i += len(_BE_CCE_CLOSE)
-
-    return pattern[ce_start:ce_end], i - start
+_BINARY_SLASH = b'/'
 
 
 def translate(pattern, no_escape=False, path_name=True, wild_star=True, period=False,
@@ -356,8 +43,8 @@ def translate(pattern, no_escape=False, path_name=True, wild_star=True, period=F
 
     Note that the EXTMATCH (ksh extended glob patterns) option is not available
 
-    :type pattern: text_type
-    :param pattern: A wildmatch pattern
+    :type pattern: text_type | binary_type
+    :param pattern: A wildmatch pattern, a bytes pattern is translated to a bytes regex
     :type no_escape: bool
     :param no_escape: Disable backslash escaping
     :type path_name: bool
@@ -385,218 +72,60 @@ def translate(pattern, no_escape=False, path_name=True, wild_star=True, period=F
     if wild_star:
         path_name = True
 
-    if case_fold:
-        raise NotImplementedError(u'case_fold is not supported by wildmatch.translate')
-
     if period:
         raise NotImplementedError(u'period is not supported by wildmatch.translate')
 
-    result = []
-
-    i = 0
-
-    # head_wild_star = False  # Wildstar at the start of the string
-    tail_wild_star = False  # Wildstar at the end of the string
-
-    while i < len(pattern):
-        # Literal escape \
-        if not no_escape and pattern[i:i+len(_ESCAPE)] == _ESCAPE:
-            i += len(_ESCAPE)
-            if i >= len(pattern):
-                raise ValueError(u'Invalid pattern, incomplete escape sequence')
-            result.append(re.escape(pattern[i:i + 1]))
-            i += 1
-
-        # Bracket expression [a]
-        elif pattern[i:i+len(_BE_OPEN)] == _BE_OPEN:
-            be, be_len = _parse_bracket_expression(pattern, i, no_escape=no_escape)
-            translated_be = _py_pattern_from_bracket_expression(be, path_name=path_name)
-            result.append(translated_be)
-            i += be_len
-
-        # Wildstar ** (matched before asterisk)
-        elif wild_star and pattern[i:i+len(_WILD_STAR)] == _WILD_STAR:
-            if i == 0:
-                # Uncomment the following line to detect wild stars at start of pattern
-                # head_wild_star = True
-                pass
-            else:
-                if pattern[i - 1] != _SLASH:
-                    raise ValueError(u'Invalid pattern: wild star ** can only start pattern or '
-                                     u'follow a slash')
-            i += len(_WILD_STAR)
-            while True:  # Consume stars, example: foo/**/****/***/bar is equivalent to foo/**/bar
-                if i == len(pattern):
-                    tail_wild_star = True
-                    break
-                if pattern[i:i+len(_ASTERISK)] == _ASTERISK:
-                    i += len(_ASTERISK)
-                    continue
-                elif pattern[i:i+len(_SLASH)] == _SLASH:
-                    if pattern[i:i + len(_SLASH) + len(_WILD_STAR)] == _SLASH + _WILD_STAR:
-                        i += len(_ASTERISK) + len(_WILD_STAR)
-                        continue
-                    else:
-                        i += len(_SLASH)
-                        break
-                else:
-                    raise ValueError(u'Invalid pattern: wild star ** can only end pattern or '
-                                     u'be followed by a slash')
-
-            if tail_wild_star:  # Pattern like ** or foo/**:
-                result.append(u'.*')
-            else:  # Pattern like **/foo or foo/**/bar, the slash following ** is already consumed
-                result.append(u'(?:.*\\/)?')
-
-        # Asterisk *
-        elif pattern[i:i+len(_ASTERISK)] == _ASTERISK:
-            if path_name:
-                result.append(u'[^/]*')
-            else:
-                result.append(u'.*')
-            i += len(_ASTERISK)
-
-        # Question mark ?
-        elif pattern[i:i + len(_QUESTION_MARK)] == _QUESTION_MARK:
-            if path_name:
-                result.append(u'[^/]')
-            else:
-                result.append(u'.')
-            i += len(_QUESTION_MARK)
-
-        # Literal
-        else:
-            result.append(re.escape(pattern[i:i+1]))
-            i += 1
-
-        if i > len(pattern):
-            raise ValueError(u'InvalidPattern: parse error, index out of bounds')
-
-    pattern = u''.join(result)
-    if closed_regex:
-        pattern = u'\\A' + pattern + u'\\Z'
-    return re.compile(pattern)
-
-
-def _py_pattern_from_bracket_expression(bracket_expression, path_name):
+    pattern, binary = compiler.decode_pattern(pattern)
+    nodes = syntax.parse(pattern, no_escape=no_escape, wild_star=wild_star)
+    return compiler.regex_from_nodes(nodes, path_name=path_name, closed_regex=closed_regex,
+                                     binary=binary, case_fold=case_fold)
+
+
+def classify(pattern, no_escape=False, path_name=True, wild_star=True, dir_suffix=False):
     u"""
-    This does not handle exclusion of separators in the bracket expression when pathname is True
-    :param bracket_expression:
-    :return:
+    Returns the regex-free fast path equivalent to a wildmatch pattern, or `None` if the pattern
+    requires a regular expression.
+
+    :type pattern: text_type
+    :param pattern: A wildmatch pattern
+    :type no_escape: bool
+    :param no_escape: Disable backslash escaping
+    :type path_name: bool
+    :param path_name: Separator (slash) in text cannot be matched by an asterisk, question-mark nor
+                      bracket expression in pattern (only a literal).
+    :type wild_star: bool
+    :param wild_star: A True value forces the `path_name` flag to True. This allows the
+                      double-asterisk `**` to match any (0 to many) number of directories
+    :type dir_suffix: bool
+    :param dir_suffix: Also match the texts starting with a match followed by a slash (gitmatch
+                       directory semantics, equivalent to appending `(?:\\/.*)?` to the regex).
+    :rtype: fastpath.FastPath | None
+    :return: The fast path description, use `fastpath.compile_matcher` to get a matcher.
     """
-    single_chars = set()
-    multi_chars = set()
-    ranges = set()
-    matching, items = _read_bracket_expression(bracket_expression)
-    for item in items:
-        if _is_be_range(item):
-            start_seq, end_seq = _read_be_range(item)
-            if len(start_seq) != 1 or len(end_seq) != 1:
-                raise ValueError(u'Ranges are only supported between single-char collating elems')
-            ranges.add((start_seq, end_seq))
-        elif _is_be_character_class(item):
-            # TODO: handle character classes...
-            # Idea: (?:[single r-an-ge-!]|multi1|multi2|[class1]|[class2])
-            raise ValueError(u'Character classes are not supported')
-        else:
-            if _is_be_collating_element(item):
-                sequence = _read_be_collating_element(item)
-            elif _is_be_equivalence_class(item):
-                sequence = _read_be_equivalence_class(item)
-            else:
-                raise ValueError(u'Unexpected item {}'.format(item))
-
-            if len(sequence) == 0:
-                raise ValueError(u'Empty string is not a valid collating element')
-            elif len(sequence) == 1:
-                single_chars.add(sequence)
-            else:
-                multi_chars.add(sequence)
-
-    if path_name:  # bracket expression cannot match /
-        if not matching:
-            single_chars.add(_SLASH)  # Pretty easy!
-        else:  # Remove slash from single_chars and ranges (we do not check multi_chars)
-            if _SLASH in single_chars:
-                single_chars.remove(_SLASH)
-
-            slash_code_point = ord(_SLASH)
-            cleared_ranges = set()
-            for be_range in ranges:
-                start_seq, end_seq = be_range
-                if len(start_seq) != 1 or len(end_seq) != 1:
-                    raise ValueError(u'Only ranges between single characters are supported in '
-                                     u'bracket expression with the path_name flag')
-                start_code_point = ord(start_seq)
-                end_code_point = ord(end_seq)
-                if start_code_point > end_code_point:
-                    raise ValueError(u'Invalid range, wrong order of bounds: {}'.format(be_range))
-                if slash_code_point < start_code_point or slash_code_point > end_code_point:
-                    cleared_ranges.add(be_range)
-                else:
-                    if start_seq == slash_code_point:
-                        if end_code_point == slash_code_point:  # /-/
-                            continue
-                        else:  # start = slash < end
-                            start_seq = unichr(start_code_point + 1)
-                            cleared_ranges.add((start_seq, end_seq))
-                    else:
-                        if end_code_point == slash_code_point:  # start < slash = end
-                            end_seq = unichr(end_code_point - 1)
-                            cleared_ranges.add((start_seq, end_seq))
-                        else:  # start < slash < end
-                            before_slash = unichr(slash_code_point - 1)
-                            after_slash = unichr(slash_code_point + 1)
-                            cleared_ranges.add((start_seq, before_slash))
-                            cleared_ranges.add((after_slash, end_seq))
-            ranges = cleared_ranges
-
-    if len(single_chars) > 0 or len(ranges) > 0:
-        primary_pattern = [u'['] if matching else [u'[^']
-
-        for char in single_chars:
-            primary_pattern.append(_escape_bracket_expression_character(char))
-
-        for start, end in ranges:
-            primary_pattern.append(_escape_bracket_expression_character(start))
-            primary_pattern.append(u'-')
-            primary_pattern.append(_escape_bracket_expression_character(end))
-
-        primary_pattern.append(u']')
-        primary_pattern = u''.join(primary_pattern)
-    else:
-        primary_pattern = None
-
-    if len(multi_chars) > 0:
-        if not matching:
-            raise ValueError(u'Cannot perform negative match on bracket expression containing '
-                             u'multi-character collating elements')
-        alternate_pattern = u'|'.join(re.escape(seq) for seq in multi_chars)
-    else:
-        alternate_pattern = None
-
-    if alternate_pattern is None:
-        if primary_pattern is None:  # Can happen when removing characters
-            return _PY_IMPOSSIBLE_MATCH
-        else:
-            return primary_pattern
-    else:
-        if primary_pattern is not None:
-            alternate_pattern = primary_pattern + u'|' + alternate_pattern
-        return u'(?:{})'.format(alternate_pattern)
-
-
-def _escape_bracket_expression_character(unsafe_char):
-    if unsafe_char == u'^':
-        return u'\\^'
-    elif unsafe_char == u']':
-        return u'\\]'
-    elif unsafe_char == u'-':
-        return u'\\-'
-    elif unsafe_char == u'\\':
-        return u'\\\\'
-    else:
-        return unsafe_char
+    if wild_star:
+        path_name = True
+    pattern, binary = compiler.decode_pattern(pattern)
+    nodes = syntax.parse(pattern, no_escape=no_escape, wild_star=wild_star)
+    fast_path = compiler.fast_path_from_nodes(nodes, path_name=path_name, dir_suffix=dir_suffix)
+    return compiler.encode_fast_path(fast_path) if binary else fast_path
+
+
+def required_literals(pattern, no_escape=False, wild_star=True):
+    u"""
+    Returns the literal substrings occurring in every text matched by a wildmatch pattern.
+
+    :type pattern: text_type
+    :param pattern: A wildmatch pattern
+    :type no_escape: bool
+    :param no_escape: Disable backslash escaping
+    :type wild_star: bool
+    :param wild_star: Enable the double-asterisk `**` wild star
+    :rtype: typing.Tuple[text_type, ...]
+    """
+    pattern, binary = compiler.decode_pattern(pattern)
+    nodes = syntax.parse(pattern, no_escape=no_escape, wild_star=wild_star)
+    literals = compiler.required_literals_from_nodes(nodes)
+    return compiler.encode_literals(literals) if binary else literals
 
 
 def match(pattern, text, no_escape=False, path_name=True, wild_star=True, period=False,
@@ -632,9 +161,9 @@ def match(pattern, text, no_escape=False, path_name=True, wild_star=True, period
     :return: Result of the match
     """
 
-    regex = translate(pattern, no_escape=no_escape, path_name=path_name, wild_star=wild_star,
-                      period=period, case_fold=case_fold, closed_regex=True)
-    return regex.match(text) is not None
+    compiled = _compile(pattern, no_escape=no_escape, path_name=path_name, wild_star=wild_star,
+                        period=period, case_fold=case_fold)
+    return compiled.match(text)
 
 
 # noinspection PyShadowingBuiltins
@@ -667,17 +196,32 @@ def filter(pattern, texts, no_escape=False, path_name=False, wild_star=False, pe
     :rtype: typing.Iterable[text_type]
     :return: A generator of filtered elements.
     """
-    regex = translate(pattern, no_escape=no_escape, path_name=path_name, wild_star=wild_star,
-                      period=period, case_fold=case_fold, closed_regex=True)
-    return (text for text in texts if regex.match(text) is not None)
+    compiled = _compile(pattern, no_escape=no_escape, path_name=path_name, wild_star=wild_star,
+                        period=period, case_fold=case_fold)
+    return compiled.filter(texts)
+
+
+def _compile(pattern, no_escape, path_name, wild_star, period, case_fold):
+    u"""
+    Returns the `WildmatchPattern` for the supplied pattern and flags, using the shared cache.
+
+    :rtype: WildmatchPattern
+    """
+    # The type distinguishes text and bytes patterns that compare equal on Python 2
+    key = (u'wildmatch', type(pattern), pattern, no_escape, path_name, wild_star, period,
+           case_fold)
+    return cache.get(key, lambda: WildmatchPattern(pattern, no_escape=no_escape,
+                                                   path_name=path_name, wild_star=wild_star,
+                                                   period=period, case_fold=case_fold))
 
 
 class WildmatchPattern(Pattern):
     def __init__(self, pattern, no_escape=False, path_name=True, wild_star=True, period=False,
-                 case_fold=False):
+                 case_fold=False, engine=ENGINE_REGEX, lazy=False):
         u"""
-        :type pattern: text_type
-        :param pattern: A wildmatch pattern
+        :type pattern: text_type | binary_type
+        :param pattern: A wildmatch pattern. A bytes pattern matches bytes texts (for example the
+                        paths returned by `os.listdir(b'.')`), without decoding them.
         :type no_escape: bool
         :param no_escape: Disable backslash escaping
         :type path_name: bool
@@ -694,9 +238,179 @@ class WildmatchPattern(Pattern):
                        - path_name (or wild_star) is True and the previous character is a slash
         :type case_fold: bool
         :param case_fold: Perform a case insensitive match (GNU Extension)
+        :type engine: text_type
+        :param engine: The engine used for the patterns without a fast path: `ENGINE_REGEX`
+                       (default), `ENGINE_NATIVE` to guarantee a linear matching time on
+                       patterns prone to catastrophic backtracking or `ENGINE_SEGMENT` to match
+                       the paths component by component (requires `path_name`, see
+                       `match_segments`).
+        :type lazy: bool
+        :param lazy: Only parse the pattern (raising `ValueError` on syntax errors) and defer
+                     the translation and compilation of its regex until it is needed, see
+                     `is_compiled`. The patterns with a fast path never compile their regex.
+        :rtype: None
+        """
+
+        self.pattern = pattern
+        self.flags = {
+            u'no_escape': no_escape,
+            u'path_name': path_name,
+            u'wild_star': wild_star,
+            u'period': period,
+            u'case_fold': case_fold
+        }
+
+        if period:
+            raise NotImplementedError(u'period is not supported by wildmatch.translate')
+        if engine not in (ENGINE_REGEX, ENGINE_NATIVE, ENGINE_SEGMENT):
+            raise ValueError(u'Unknown engine: {}'.format(repr(engine)))
+        if engine == ENGINE_SEGMENT and not (path_name or wild_star):
+            raise ValueError(u'The segment engine requires the `path_name` flag')
+
+        text_pattern, binary = compiler.decode_pattern(pattern)
+        nodes = syntax.parse(text_pattern, no_escape=no_escape, wild_star=wild_star)
+        syntax.validate(nodes)  # The lazy patterns are not translated yet
+        path_name = path_name or wild_star
+        self.binary = binary
+        self.engine = engine
+        regex_source, regex = None, None
+        if not lazy:
+            regex_source = compiler.regex_source_from_nodes(nodes, path_name=path_name,
+                                                            closed_regex=True, binary=binary,
+                                                            case_fold=case_fold)
+            regex = re.compile(*regex_source)
+        literals = compiler.required_literals_from_nodes(nodes)
+        # Regex-free matcher for the common pattern shapes
+        fast_path = compiler.fast_path_from_nodes(nodes, path_name=path_name)
+        if binary:
+            literals = compiler.encode_literals(literals)
+            fast_path = compiler.encode_fast_path(fast_path)
+        self._init_compiled(nodes, regex_source, fast_path, literals, regex)
+
+    def _init_compiled(self, nodes, regex_source, fast_path, literals, regex=None):
+        u"""
+        Initializes the attributes derived from the parsed pattern (see `__init__` and
+        `__setstate__`).
+
+        :type nodes: typing.Tuple[syntax.Node, ...]
+        :type regex_source: typing.Tuple[text_type | binary_type, int] | None
+        :param regex_source: Source and flags of the closed regex, `None` to translate the nodes
+                             on first use
+        :type fast_path: fastpath.FastPath | None
+        :type literals: typing.Tuple[text_type, ...]
+        :type regex: RegexType | None
+        :param regex: The compiled regex, `None` to compile it on first use
         :rtype: None
         """
+        case_fold = self.flags[u'case_fold']
+        self._nodes = nodes
+        self._regex_source = regex_source
+        self._regex = regex
+        self._open_regex = None  # Unanchored regex, translated on first use
+        # The literals and fast paths are case sensitive
+        self.literals = literals if not case_fold else ()
+        self._fast_path = fast_path  # Also used by the case insensitive matcher
+        self.fast_path = fast_path if not case_fold else None
+        self._segment_matcher = None  # Built on first use, see `_get_segment_matcher`
+        self._match = compiler.compile_matcher(
+            nodes, lambda: self.regex, fast_path,
+            path_name=self.flags[u'path_name'] or self.flags[u'wild_star'], case_fold=case_fold,
+            binary=self.binary, engine=self.engine, lazy=regex is None,
+            get_segment_matcher=self._get_segment_matcher)
+        if self._match is None:
+            self._match = self._compile_and_match
+
+    def _compile_and_match(self, text):
+        u"""
+        Matcher of the lazy patterns without fast path: compiles the regex and replaces itself by
+        the regex matcher.
+
+        :type text: text_type
+        :rtype: bool
+        """
+        self._match = fastpath.regex_matcher(self.regex)
+        return self._match(text)
+
+    def _get_matcher(self):
+        u"""
+        Returns the matcher of this pattern. A lazy pattern compiles its regex now rather than on
+        its first match: the loops over many texts call the returned matcher directly.
+
+        :rtype: typing.Callable[[text_type], bool]
+        """
+        if self._match == self._compile_and_match:
+            self._match = fastpath.regex_matcher(self.regex)
+        return self._match
+
+    @property
+    def regex(self):
+        u"""
+        Closed regex equivalent to this pattern.
+
+        :rtype: RegexType
+        """
+        if self._regex is None:
+            self._regex = re.compile(*self._get_regex_source())
+        return self._regex
+
+    def is_compiled(self):
+        u"""
+        Tests if the regex of this pattern is compiled. It is compiled on first use for the lazy
+        patterns and the patterns restored from a cache.
+
+        :rtype: bool
+        """
+        return self._regex is not None
+
+    def _get_segment_matcher(self):
+        u"""
+        Returns the matcher of the segment engine, built on first use.
+
+        :rtype: segment.SegmentMatcher
+        """
+        if self._segment_matcher is None:
+            program = compiler.segment_program_from_nodes(self._nodes,
+                                                          case_fold=self.flags[u'case_fold'],
+                                                          binary=self.binary)
+            self._segment_matcher = segment.SegmentMatcher(program, binary=self.binary)
+        return self._segment_matcher
+
+    def _get_regex_source(self):
+        u"""
+        Returns the source and flags of the closed regex, translated on first use.
+
+        :rtype: typing.Tuple[text_type | binary_type, int]
+        """
+        if self._regex_source is None:
+            self._regex_source = compiler.regex_source_from_nodes(
+                self._nodes, path_name=self.flags[u'path_name'] or self.flags[u'wild_star'],
+                closed_regex=True, binary=self.binary, case_fold=self.flags[u'case_fold'])
+        return self._regex_source
+
+    def __getstate__(self):
+        u"""
+        Returns the compiled state of this pattern: its flags, its nodes, the source of its regex
+        and its fast path. It only contains builtin values (see `diskcache`).
 
+        :rtype: tuple
+        """
+        fast_path = tuple(self._fast_path) if self._fast_path is not None else None
+        regex_pattern, regex_flags = self._get_regex_source()
+        return (self.pattern, self.flags[u'no_escape'], self.flags[u'path_name'],
+                self.flags[u'wild_star'], self.flags[u'period'], self.flags[u'case_fold'],
+                self.engine, syntax.dump(self._nodes), regex_pattern, regex_flags, fast_path,
+                self.literals)
+
+    def __setstate__(self, state):
+        u"""
+        Restores a pattern from `__getstate__` without parsing nor translating it. The regex is
+        compiled on first use.
+
+        :type state: tuple
+        :rtype: None
+        """
+        (pattern, no_escape, path_name, wild_star, period, case_fold, engine, nodes,
+         regex_pattern, regex_flags, fast_path, literals) = state
         self.pattern = pattern
         self.flags = {
             u'no_escape': no_escape,
@@ -705,7 +419,19 @@ class WildmatchPattern(Pattern):
             u'period': period,
             u'case_fold': case_fold
         }
-        self.regex = translate(pattern, closed_regex=True, **self.flags)
+        self.binary = isinstance(pattern, binary_type)
+        self.engine = engine
+        self._init_compiled(syntax.load(nodes), (regex_pattern, regex_flags),
+                            fastpath.FastPath(*fast_path) if fast_path is not None else None,
+                            tuple(literals))
+
+    def required_literals(self):
+        u"""
+        Returns the literal substrings occurring in every text matched by this pattern.
+
+        :rtype: typing.Tuple[text_type, ...]
+        """
+        return self.literals
 
     def translate(self, closed_regex=True):
         u"""
@@ -714,8 +440,9 @@ class WildmatchPattern(Pattern):
         """
         if closed_regex:
             return self.regex
-        else:
-            return translate(self.pattern, closed_regex=False, **self.flags)
+        if self._open_regex is None:
+            self._open_regex = translate(self.pattern, closed_regex=False, **self.flags)
+        return self._open_regex
 
     def match(self, text):
         u"""
@@ -726,10 +453,76 @@ class WildmatchPattern(Pattern):
         :rtype: bool
         :return: Result of the match
         """
-        return self.regex.match(text) is not None
+        return self._match(text)
 
     __call__ = match
 
+    def may_match_under(self, dir_path):
+        u"""
+        Tests if a path inside the directory `dir_path` may match this pattern, from the
+        components of the pattern (see `Pattern.may_match_under`).
+
+        :type dir_path: text_type
+        :param dir_path: Path of a directory, with or without trailing slash
+        :rtype: bool
+        """
+        matcher = self.subtree_matcher()
+        if matcher is None:
+            return True  # The asterisks match across directories
+        return matcher.may_match_under(segment.directory_segments(dir_path, self.binary))
+
+    def matches_all_under(self, dir_path):
+        u"""
+        Tests if every path inside the directory `dir_path` matches this pattern (see
+        `Pattern.matches_all_under`).
+
+        :type dir_path: text_type
+        :param dir_path: Path of a directory, with or without trailing slash
+        :rtype: bool
+        """
+        matcher = self.subtree_matcher()
+        if matcher is None:
+            return False
+        return matcher.matches_all_under(segment.directory_segments(dir_path, self.binary))
+
+    def subtree_matcher(self):
+        u"""
+        Returns the segment matcher of this pattern, `None` without the `path_name` and
+        `wild_star` flags (see `Pattern.subtree_matcher`).
+
+        :rtype: segment.SegmentMatcher | None
+        """
+        if not (self.flags[u'path_name'] or self.flags[u'wild_star']):
+            return None
+        return self._get_segment_matcher()
+
+    def match_segments(self, segments):
+        u"""
+        Matches a path already split on its slashes, for example by a directory walker. With
+        `ENGINE_SEGMENT`, the components are matched one by one without joining them.
+
+        :type segments: typing.Sequence[text_type]
+        :param segments: Components of the path, for example `['src', 'main.py']` for
+                         `src/main.py`
+        :rtype: bool
+        :return: Result of the match
+        """
+        if self.engine == ENGINE_SEGMENT:
+            return self._get_segment_matcher().match_segments(segments)
+        return self._match((_BINARY_SLASH if self.binary else _SLASH).join(segments))
+
+    def match_many(self, texts):
+        u"""
+        Matches every element of `texts` against this pattern. The fast paths are vectorized for
+        NumPy string arrays.
+
+        :type texts: typing.Sequence[text_type]
+        :param texts: A sized collection of texts to match
+        :rtype: numpy.ndarray | bytearray
+        :return: A boolean mask (see `Pattern.match_many`)
+        """
+        return batch.match_many(self._get_matcher(), texts, self.fast_path)
+
     def filter(self, texts):
         u"""
         Returns a generator yielding the elements of `texts` matching this pattern.
@@ -739,4 +532,6 @@ class WildmatchPattern(Pattern):
         :rtype: typing.Iterable[text_type]
         :return: A generator of filtered elements.
         """
-        return (text for text in texts if self.regex.match(text) is not None)
+        match_ = self._get_matcher()
+        return (text for text in texts if match_(text))
+
@@ -41,16 +41,21 @@ setup(
         u'Topic :: Utilities'
     ],
     keywords=[u'fnmatch', u'wildmatch', u'gitignore'],
-    packages=find_packages(exclude=[u'contrib', u'docs', u'tests', u'tools']),
+    packages=find_packages(exclude=[u'benchmarks', u'contrib', u'docs', u'tests', u'tools']),
     install_requires=[
         u'six>=1.10.0',
         u'typing>=3.5.2',
     ],
     extras_require={
         u'dev': [u'pylint>=1.5.6'],
+        u'numpy': [u'numpy'],
+        u'parallel': [u'futures; python_version < "3.2"'],
         u'test': [],
+        u'walk': [u'scandir; python_version < "3.5"'],
     },
     package_data={},
     data_files=[],
-    entry_points={},
+    entry_points={
+        u'console_scripts': [u'pathmatch = pathmatch.cli:main'],
+    },
 )